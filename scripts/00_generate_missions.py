@@ -3,12 +3,19 @@ import sys
 import os
 import json
 import random
+from typing import Callable, Optional
+
+import numpy as np
 from tqdm import tqdm
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from neo4j import GraphDatabase, Driver
 from src import config
+from src.compressed_graph import get_compressed_graph
+from src.evaluation import create_eval_missions
+from src.graph import Neo4jGraph
+from src.query_cache import QueryCache, start_query_cache
 
 # --- CONFIGURATION ---
 NUM_MISSIONS_TO_GENERATE = 100000  # On peut viser plus haut, c'est rapide
@@ -29,32 +36,33 @@ def get_random_page(driver: Driver) -> str:
         return result.single()["title"]
 
 
-def perform_random_walk(driver: Driver, start_page: str, length: int) -> str:
-    """Effectue une marche aléatoire depuis une page de départ et retourne la page d'arrivée."""
+def perform_random_walk(graph, start_page: str, length: int, cache: Optional[QueryCache] = None) -> str:
+    """
+    Effectue une marche aléatoire depuis une page de départ et retourne la page d'arrivée.
+    `graph` est un Neo4jGraph ou un CompressedGraph (même méthode `neighbors`).
+    """
     current_page = start_page
-    with driver.session(database="neo4j") as session:
-        for _ in range(length):
-            # On cherche un voisin au hasard
-            result = session.run("""
-                MATCH (start:Page {title: $start_page})-[:LINKS_TO]->(neighbor:Page)
-                RETURN neighbor.title AS next_page, rand() as r
-                ORDER BY r
-                LIMIT 1
-            """, start_page=current_page)
-
-            record = result.single()
-            if record:
-                current_page = record["next_page"]
-            else:
-                # Si on est dans une impasse, on arrête la marche
-                break
+    for _ in range(length):
+        # On cherche un voisin au hasard (les listes de voisins des pages très liées viennent du cache)
+        if cache is not None:
+            neighbors = cache.get_or_fetch("neighbors", (current_page,), graph.neighbors)
+        else:
+            neighbors = graph.neighbors(current_page)
+        if not neighbors:
+            # Si on est dans une impasse, on arrête la marche
+            break
+        current_page = random.choice(list(neighbors))
     return current_page
 
 
-def get_shortest_path_distance(driver: Driver, start_page: str, target_page: str) -> int:
+def get_shortest_path_distance(driver: Driver, start_page: str, target_page: str,
+                               cache: Optional[QueryCache] = None) -> int:
     """Calcule la distance réelle la plus courte entre les deux pages."""
     if start_page == target_page:
         return 0
+    if cache is not None:
+        return cache.get_or_fetch("distance_max15", (start_page, target_page),
+                                  lambda s, t: get_shortest_path_distance(driver, s, t))
     with driver.session(database="neo4j") as session:
         result = session.run(
             "MATCH (s:Page {title: $start}), (t:Page {title: $target}) "
@@ -66,58 +74,83 @@ def get_shortest_path_distance(driver: Driver, start_page: str, target_page: str
         return record["dist"] if record else -1  # -1 si aucun chemin n'est trouvé
 
 
-def main():
-    """Script principal pour générer des missions par marche aléatoire."""
-    print("--- Générateur de Missions V2.0 (Marche Aléatoire) ---")
+def generate_missions(random_page: Callable[[], str], random_walk: Callable[[str, int], str],
+                      distance: Callable[[str, str], int]) -> None:
+    """Tire les missions par marche aléatoire et les sauvegarde dans OUTPUT_FILE."""
+    missions = []
+    pbar = tqdm(total=NUM_MISSIONS_TO_GENERATE, desc="Génération de missions")
 
-    auth = None
-    if config.NEO4J_AUTH_ENABLED:
-        auth = (config.NEO4J_USER, config.NEO4J_PASSWORD)
+    while len(missions) < NUM_MISSIONS_TO_GENERATE:
+        start_page = random_page()
+        walk_length = random.randint(MIN_WALK_LENGTH, MAX_WALK_LENGTH)
+        target_page = random_walk(start_page, walk_length)
 
-    with GraphDatabase.driver(config.NEO4J_URI, auth=auth) as driver:
-        driver.verify_connectivity()
-        print("Connexion à Neo4j établie.")
+        # On s'assure que le départ et la cible sont bien différents
+        if start_page == target_page:
+            continue
+
+        # On calcule la distance réelle la plus courte pour la stocker
+        mission_distance = distance(start_page, target_page)
 
-        missions = []
-        pbar = tqdm(total=NUM_MISSIONS_TO_GENERATE, desc="Génération de missions")
+        # On ne garde que les missions valides (chemin existant et pas trop court)
+        if mission_distance >= 2:
+            missions.append({
+                "start": start_page,
+                "target": target_page,
+                "distance": mission_distance
+            })
+            pbar.update(1)
 
-        while len(missions) < NUM_MISSIONS_TO_GENERATE:
-            start_page = get_random_page(driver)
-            walk_length = random.randint(MIN_WALK_LENGTH, MAX_WALK_LENGTH)
-            target_page = perform_random_walk(driver, start_page, walk_length)
+    pbar.close()
 
-            # On s'assure que le départ et la cible sont bien différents
-            if start_page == target_page:
-                continue
+    if not missions:
+        print("\nERREUR: Aucune mission n'a pu être générée.")
+        return
 
-            # On calcule la distance réelle la plus courte pour la stocker
-            distance = get_shortest_path_distance(driver, start_page, target_page)
+    print(f"\nGénération terminée. {len(missions)} missions valides créées.")
 
-            # On ne garde que les missions valides (chemin existant et pas trop court)
-            if distance >= 2:
-                missions.append({
-                    "start": start_page,
-                    "target": target_page,
-                    "distance": distance
-                })
-                pbar.update(1)
+    # On mélange une dernière fois pour une bonne mesure
+    random.shuffle(missions)
 
-        pbar.close()
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        json.dump(missions, f, indent=4, ensure_ascii=False)
 
-        if not missions:
-            print("\nERREUR: Aucune mission n'a pu être générée.")
-            return
+    print(f"✅ Missions sauvegardées avec succès dans '{OUTPUT_FILE}'.")
+    print("Exemple de mission :", missions[0])
+    # Le jeu d'évaluation est réservé tout de suite : aucun entraînement ne verra ces missions.
+    create_eval_missions(source=OUTPUT_FILE)
 
-        print(f"\nGénération terminée. {len(missions)} missions valides créées.")
 
-        # On mélange une dernière fois pour une bonne mesure
-        random.shuffle(missions)
+def main():
+    """Script principal pour générer des missions par marche aléatoire."""
+    print("--- Générateur de Missions V2.0 (Marche Aléatoire) ---")
 
-        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-            json.dump(missions, f, indent=4, ensure_ascii=False)
+    if config.GRAPH_BACKEND == "COMPRESSED":
+        # Graphe compressé local : pas de serveur, les requêtes sont déjà des lectures en mémoire.
+        graph = get_compressed_graph()
+        print(f"Graphe compressé chargé ({len(graph)} pages).")
+        rng = np.random.default_rng()
+        generate_missions(
+            lambda: graph.random_title(rng),
+            lambda start, length: perform_random_walk(graph, start, length),
+            lambda start, target: graph.shortest_path_distance(start, target, max_depth=15) or -1,
+        )
+        return
+
+    auth = None
+    if config.NEO4J_AUTH_ENABLED:
+        auth = (config.NEO4J_USER, config.NEO4J_PASSWORD)
 
-        print(f"✅ Missions sauvegardées avec succès dans '{OUTPUT_FILE}'.")
-        print("Exemple de mission :", missions[0])
+    with GraphDatabase.driver(config.NEO4J_URI, auth=auth) as driver:
+        driver.verify_connectivity()
+        print("Connexion à Neo4j établie.")
+        cache = start_query_cache(driver) if config.QUERY_CACHE_ENABLED else None
+        graph = Neo4jGraph(driver)
+        generate_missions(
+            lambda: get_random_page(driver),
+            lambda start, length: perform_random_walk(graph, start, length, cache),
+            lambda start, target: get_shortest_path_distance(driver, start, target, cache),
+        )
 
 
 if __name__ == "__main__":
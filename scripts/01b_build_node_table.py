@@ -0,0 +1,21 @@
+# scripts/01b_build_node_table.py
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neo4j import GraphDatabase
+from src import config
+from src.node_table import build_node_table
+
+if __name__ == "__main__":
+    print("--- Construction de la table des nœuds (identifiants + embeddings MiniLM) ---")
+    auth = None
+    if config.NEO4J_AUTH_ENABLED:
+        auth = (config.NEO4J_USER, config.NEO4J_PASSWORD)
+
+    with GraphDatabase.driver(config.NEO4J_URI, auth=auth) as driver:
+        driver.verify_connectivity()
+        count = build_node_table(driver, config.NODE_TABLE_PATH)
+
+    print(f"✅ Table de {count} nœuds sauvegardée dans '{config.NODE_TABLE_PATH}'.")
@@ -0,0 +1,21 @@
+# scripts/01c_build_article_store.py
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neo4j import GraphDatabase
+from src import config
+from src.data_importer import build_article_store
+
+if __name__ == "__main__":
+    print("--- Construction du stock d'articles de l'interface (résumés + liens) ---")
+    auth = None
+    if config.NEO4J_AUTH_ENABLED:
+        auth = (config.NEO4J_USER, config.NEO4J_PASSWORD)
+
+    with GraphDatabase.driver(config.NEO4J_URI, auth=auth) as driver:
+        driver.verify_connectivity()
+        count = build_article_store(driver, config.ARTICLE_STORE_PATH)
+
+    print(f"✅ Stock de {count} articles sauvegardé dans '{config.ARTICLE_STORE_PATH}'.")
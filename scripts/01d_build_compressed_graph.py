@@ -0,0 +1,29 @@
+# scripts/01d_build_compressed_graph.py
+import argparse
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import config
+from src.compressed_graph import build_from_dumps, build_from_neo4j
+from src.graph import connect_to_neo4j
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construit le graphe compressé utilisé avec GRAPH_BACKEND = \"COMPRESSED\".")
+    parser.add_argument("--source", choices=["neo4j", "dumps"], default="neo4j",
+                        help="neo4j : le graphe importé (bac à sable) ; dumps : tous les articles du dump.")
+    parser.add_argument("--output", default=config.COMPRESSED_GRAPH_PATH)
+    args = parser.parse_args()
+
+    print(f"--- Construction du graphe compressé (source : {args.source}) ---")
+    if args.source == "dumps":
+        meta = build_from_dumps(args.output)
+    else:
+        driver = connect_to_neo4j()
+        try:
+            meta = build_from_neo4j(driver, args.output)
+        finally:
+            driver.close()
+
+    print(f"✅ Graphe de {meta['pages']} pages et {meta['links']} liens sauvegardé dans '{args.output}'.")
@@ -0,0 +1,22 @@
+# scripts/01e_build_structural_embeddings.py
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neo4j import GraphDatabase
+from src import config
+from src.structure import STRUCTURE_FILE, build_structural_embeddings
+
+if __name__ == "__main__":
+    print(f"--- Construction des embeddings structurels (SVD tronquée, {config.STRUCTURAL_DIM} composantes) ---")
+    auth = None
+    if config.NEO4J_AUTH_ENABLED:
+        auth = (config.NEO4J_USER, config.NEO4J_PASSWORD)
+
+    with GraphDatabase.driver(config.NEO4J_URI, auth=auth) as driver:
+        driver.verify_connectivity()
+        count = build_structural_embeddings(driver, config.NODE_TABLE_PATH, config.STRUCTURAL_DIM)
+
+    print(f"✅ Embeddings structurels de {count} nœuds sauvegardés dans "
+          f"'{os.path.join(config.NODE_TABLE_PATH, STRUCTURE_FILE)}'.")
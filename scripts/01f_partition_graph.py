@@ -0,0 +1,41 @@
+# scripts/01f_partition_graph.py
+import argparse
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import config
+from src.compressed_graph import CompressedGraph, relayout_compressed_graph
+from src.graph import connect_to_neo4j
+from src.partition import partition_from_compressed, partition_from_neo4j
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regroupe les pages en communautés de liens et en partitions équilibrées.")
+    parser.add_argument("--source", choices=["neo4j", "compressed"], default="neo4j",
+                        help="neo4j : le graphe importé (bac à sable) ; compressed : le graphe compressé (01d).")
+    parser.add_argument("--partitions", type=int, default=config.PARTITION_COUNT)
+    parser.add_argument("--relayout", action="store_true",
+                        help="Renumérote le graphe compressé pour que chaque partition y soit contiguë.")
+    args = parser.parse_args()
+
+    print(f"--- Partitionnement du graphe (source : {args.source}, {args.partitions} partitions) ---")
+    if args.source == "compressed":
+        graph = CompressedGraph(config.COMPRESSED_GRAPH_PATH)
+        order, meta = partition_from_compressed(graph, args.partitions)
+        del graph
+        if args.relayout:
+            relayout_compressed_graph(order)
+            print(f"Graphe compressé renuméroté dans '{config.COMPRESSED_GRAPH_PATH}'.")
+    else:
+        if args.relayout:
+            print("ATTENTION: --relayout ne s'applique qu'avec --source compressed, option ignorée.")
+        driver = connect_to_neo4j()
+        try:
+            order, meta = partition_from_neo4j(driver, args.partitions)
+        finally:
+            driver.close()
+
+    print(f"✅ {meta['communities']} communautés réparties en {meta['partitions']} partitions, "
+          f"{meta['edge_locality'] * 100:.1f}% des liens internes. Placement sauvegardé dans '{config.PARTITION_PATH}'.")
+    print("Relancez scripts/01b_build_node_table.py (et 01e) pour ranger la table des nœuds dans cet ordre.")
@@ -1,79 +1,37 @@
 # scripts/02_train_agent.py (Avec Versioning Automatique)
 import sys
 import os
-import re
 import time
 import multiprocessing
+from functools import partial
 
-from stable_baselines3.common.monitor import Monitor
-from stable_baselines3.common.vec_env import SubprocVecEnv
-from stable_baselines3.common.callbacks import CheckpointCallback
+from stable_baselines3.common.callbacks import CallbackList
+from stable_baselines3.common.vec_env import DummyVecEnv
 from sb3_contrib import MaskablePPO
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src import config
-
-
-# --- NOUVELLES FONCTIONS DE VERSIONING ---
-def find_latest_version(path, base_name):
-    """Trouve la dernière version d'un modèle (ex: base_name-3)."""
-    if not os.path.exists(path):
-        return 0, None
-
-    # Regex pour trouver les extensions de version (ex: "-1", "-2", etc.)
-    pattern = re.compile(f"^{re.escape(base_name)}(?:-(\d+))?\.zip$")
-
-    latest_version = 0
-    latest_file = f"{base_name}.zip"  # Défaut si aucune version "-X" n'est trouvée
-    found_base = False
-
-    for f in os.listdir(path):
-        match = pattern.match(f)
-        if match:
-            if match.group(1):  # Si une extension de version est trouvée
-                version = int(match.group(1))
-                if version >= latest_version:
-                    latest_version = version
-                    latest_file = f
-            else:  # Fichier de base sans extension (ex: "modele.zip")
-                found_base = True
-
-    # Si on trouve un fichier de base mais aucune version, le fichier de base est la version 0
-    if found_base and latest_version == 0:
-        return 0, latest_file
-
-    return latest_version, latest_file
-
-
-def get_next_model_name(path, base_name):
-    """Génère le nom pour un tout nouvel entraînement (ex: base_name_3)."""
-    if not os.path.exists(path):
-        return f"{base_name}_1"
-
-    pattern = re.compile(f"^{re.escape(base_name)}_(\d+)(?:-\d+)?\.zip$")
-    max_num = 0
-    for f in os.listdir(path):
-        match = pattern.match(f)
-        if match:
-            num = int(match.group(1))
-            if num > max_num:
-                max_num = num
-    return f"{base_name}_{max_num + 1}"
-
-
-# --- Fonction make_env (inchangée) ---
-def make_env():
-    from src.environment import WikiEnv
-    from sb3_contrib.common.wrappers import ActionMasker
-    env = WikiEnv()
-    env = Monitor(env)
-    return ActionMasker(env, action_mask_fn=lambda e: e.action_mask())
+from src.async_training import AsyncActorLearner
+from src.callbacks import AsyncCheckpointCallback, StatsRecorderCallback
+from src.evaluation import eval_split_id, select_eval_missions
+from src.training import create_model
+from src.environment import load_training_missions
+from src.graph import connect_to_neo4j
+from src.metrics import MetricsCallback, TimedVecEnv, create_worker_metrics
+from src.mission_sampler import create_mission_stats
+from src.profiler import install_profiler
+from src.query_cache import start_query_cache
+from src.vec_env import make_env, build_vec_env
+from src.versioning import find_latest_version, get_next_model_name, find_latest_checkpoint
 
 
 def main():
     print("--- Lancement de l'entraînement de l'Agent Wiki AI (avec Versioning) ---")
 
     os.makedirs(config.MODELS_PATH, exist_ok=True)
+    # Le jeu d'évaluation doit exister avant de créer les environnements : ses missions sont
+    # retirées de l'entraînement (et les indices des statistiques de tirage en dépendent).
+    select_eval_missions()
 
     model_base_name = ""
     model_to_load_path = None
@@ -81,14 +39,25 @@ def main():
     if config.RESUME_TRAINING:
         base_name_to_resume = config.MODEL_NAME_TO_RESUME
         version, filename = find_latest_version(config.MODELS_PATH, base_name_to_resume)
+        final_model_exists = filename is not None and os.path.exists(os.path.join(config.MODELS_PATH, filename))
 
-        if filename is None or not os.path.exists(os.path.join(config.MODELS_PATH, filename)):
-            print(f"ERREUR: Aucun modèle trouvé pour la base '{base_name_to_resume}'. Arrêt.")
-            return
-
-        model_to_load_path = os.path.join(config.MODELS_PATH, filename)
+        if final_model_exists:
+            model_to_load_path = os.path.join(config.MODELS_PATH, filename)
         # Le nouveau nom sera l'ancien avec une version incrémentée
         model_base_name = f"{base_name_to_resume}-{version + 1}"
+
+        if config.RESUME_FROM_CHECKPOINT:
+            # La session interrompue a rangé ses checkpoints sous le nom de son futur modèle final.
+            interrupted_name = model_base_name if final_model_exists else base_name_to_resume
+            checkpoint = find_latest_checkpoint(os.path.join(config.MODELS_PATH, "checkpoints", interrupted_name))
+            if checkpoint is not None:
+                print(f"Reprise de la session interrompue '{interrupted_name}' depuis : {checkpoint}")
+                model_to_load_path = checkpoint
+                model_base_name = interrupted_name
+
+        if model_to_load_path is None:
+            print(f"ERREUR: Aucun modèle trouvé pour la base '{base_name_to_resume}'. Arrêt.")
+            return
     else:
         # On génère un nouveau nom de base
         model_base_name = get_next_model_name(config.MODELS_PATH, "nouveau_modele")
@@ -100,18 +69,65 @@ def main():
     final_model_path = os.path.join(config.MODELS_PATH, f"{model_base_name}.zip")
     checkpoint_model_path = os.path.join(config.MODELS_PATH, "checkpoints", model_base_name)
 
+    # Profilage à la demande du learner et des workers (les workers héritent du dossier).
+    install_profiler(log_dir, role="learner")
+
+    # Cache des requêtes Neo4j partagé par tous les workers de cette machine.
+    query_cache = None
+    if config.QUERY_CACHE_ENABLED and config.GRAPH_BACKEND == "NEO4J" and config.VEC_ENV_TYPE != "REMOTE":
+        driver = connect_to_neo4j()
+        try:
+            query_cache = start_query_cache(driver)
+        finally:
+            driver.close()
+
     # Création de l'environnement
     num_cpu = os.cpu_count()
-    print(f"Création d'un environnement vectorisé avec {num_cpu} processus parallèles...")
-    env_fns = [make_env for _ in range(num_cpu)]
-    env = SubprocVecEnv(env_fns, start_method='spawn')
-
-    # Callback
-    checkpoint_callback = CheckpointCallback(
-        save_freq=50_000,
+    mission_stats = None
+    if config.MISSION_SAMPLING == "PRIORITIZED":
+        # Tableau partagé par tous les workers : chacun y inscrit les résultats de ses missions.
+        mission_stats = create_mission_stats(len(load_training_missions()))
+        print("Tirage prioritaire des missions difficiles activé.")
+    worker_metrics = None
+    if config.METRICS_ENABLED and config.VEC_ENV_TYPE != "REMOTE":
+        # Une ligne de compteurs par worker (pas, temps de pas, requêtes Neo4j...).
+        worker_metrics = create_worker_metrics(num_cpu)
+    env_fns = [partial(make_env, mission_stats, worker_metrics, index) for index in range(num_cpu)]
+    if config.TRAINING_MODE == "ASYNC":
+        # Le learner n'a besoin que des espaces d'observation/action : un seul environnement
+        # sert à construire le modèle, les acteurs créent ensuite les leurs.
+        print(f"Mode ASYNC : {num_cpu} acteurs découplés alimenteront le learner.")
+        env = DummyVecEnv([partial(make_env, mission_stats)])
+    else:
+        if config.VEC_ENV_TYPE == "REMOTE":
+            print(f"Connexion aux serveurs d'environnements : {', '.join(config.REMOTE_ENV_ENDPOINTS)}")
+        else:
+            print(f"Création d'un environnement vectorisé ({config.VEC_ENV_TYPE}) avec {num_cpu} processus parallèles...")
+        env = build_vec_env(env_fns)
+        if config.METRICS_ENABLED:
+            env = TimedVecEnv(env)
+
+    # Callback (en mode ASYNC, le callback est appelé une fois par segment reçu)
+    save_freq = config.CHECKPOINT_SAVE_FREQ
+    if config.TRAINING_MODE == "ASYNC":
+        save_freq = max(save_freq // config.ASYNC_ROLLOUT_LENGTH, 1)
+    checkpoint_callback = AsyncCheckpointCallback(
+        save_freq=save_freq,
         save_path=checkpoint_model_path,
-        name_prefix="checkpoint"
+        name_prefix="checkpoint",
+        keep_last=config.CHECKPOINT_KEEP_LAST,
+        keep_best=config.CHECKPOINT_KEEP_BEST
+    )
+    stats_callback = StatsRecorderCallback(
+        log_dir=os.path.join(log_dir, "episodes"),
+        fmt=config.STATS_FORMAT,
+        flush_every=config.STATS_FLUSH_EPISODES,
+        rotate_every=config.STATS_ROTATE_EPISODES
     )
+    callback_list = [checkpoint_callback, stats_callback]
+    if config.METRICS_ENABLED:
+        callback_list.append(MetricsCallback(worker_metrics, env if isinstance(env, TimedVecEnv) else None))
+    callbacks = CallbackList(callback_list)
 
     # Initialisation ou chargement du modèle
     if config.RESUME_TRAINING:
@@ -121,24 +137,55 @@ def main():
             env=env,
             tensorboard_log=log_dir
         )
+    elif config.IMITATION_WARM_START and os.path.exists(config.IMITATION_MODEL_PATH):
+        print(f"Nouveau modèle {model_base_name} initialisé par imitation : {config.IMITATION_MODEL_PATH}")
+        model = MaskablePPO.load(
+            config.IMITATION_MODEL_PATH,
+            env=env,
+            tensorboard_log=log_dir
+        )
     else:
+        if config.IMITATION_WARM_START:
+            print(f"ATTENTION: '{config.IMITATION_MODEL_PATH}' introuvable, départ d'une politique aléatoire.")
         print(f"Création d'un nouveau modèle : {model_base_name}")
-        model = MaskablePPO("MlpPolicy", env, verbose=1, tensorboard_log=log_dir, device='cpu', n_steps=2048,
-                            batch_size=64, gamma=0.99, learning_rate=0.0003)
+        model = create_model(env, tensorboard_log=log_dir)
+    if getattr(model, "eval_split", None) != eval_split_id():
+        print("ATTENTION: ce modèle a été créé sans le jeu d'évaluation actuel (il a pu en jouer les missions) : "
+              "scripts/04_evaluate.py le refusera.")
+
+    if config.TRAINING_MODE == "ASYNC":
+        env.close()
+        env = None
 
     # Entraînement
     print(f"\n--- Début de l'entraînement jusqu'à {config.TOTAL_TIMESTEPS} timesteps ---")
 
     try:
-        model.learn(total_timesteps=config.TOTAL_TIMESTEPS, callback=checkpoint_callback, progress_bar=True,
-                    reset_num_timesteps=False)
+        if config.TRAINING_MODE == "ASYNC":
+            trainer = AsyncActorLearner(model, env_fns)
+            trainer.learn(total_timesteps=config.TOTAL_TIMESTEPS, callback=callbacks)
+        else:
+            model.learn(total_timesteps=config.TOTAL_TIMESTEPS, callback=callbacks, progress_bar=True,
+                        reset_num_timesteps=False)
     except KeyboardInterrupt:
         print("\nEntraînement interrompu.")
     finally:
+        # Termine l'écriture des checkpoints et statistiques en attente (y compris après une interruption).
+        callbacks.on_training_end()
         print(f"Sauvegarde du modèle final dans : {final_model_path}")
         model.save(final_model_path)
-        print("Fermeture des environnements...")
-        env.close()
+        if env is not None:
+            print("Fermeture des environnements...")
+            env.close()
+        if mission_stats is not None:
+            mission_stats.close()
+        if worker_metrics is not None:
+            worker_metrics.close()
+        if query_cache is not None:
+            stats = query_cache.stats()
+            lookups = max(stats["hits"] + stats["misses"], 1)
+            print(f"Cache des requêtes Neo4j : {stats['hits'] / lookups:.1%} de requêtes évitées "
+                  f"({stats['entries']} entrées, {stats['bytes'] / 2 ** 20:.0f} Mo).")
 
     print("\n✅ Entraînenent terminé !")
 
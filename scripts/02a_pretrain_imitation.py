@@ -0,0 +1,65 @@
+# scripts/02a_pretrain_imitation.py (Pré-entraînement par clonage des plus courts chemins)
+import sys
+import os
+import json
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from src import config
+from src.environment import WikiEnv
+from src.evaluation import select_eval_missions
+from src.imitation import (generate_demonstrations, save_demonstrations, load_demonstrations, behavior_clone,
+                           demonstration_context, load_demonstration_context)
+from src.training import create_model
+from src.vec_env import make_env
+
+
+def main():
+    print("--- Pré-entraînement par imitation (plus courts chemins) ---")
+    os.makedirs(config.MODELS_PATH, exist_ok=True)
+    # Réservé avant les démonstrations : l'expert ne joue jamais les missions d'évaluation.
+    select_eval_missions()
+
+    env = WikiEnv()
+    context = demonstration_context(env)
+    demonstrations = None
+    if os.path.exists(config.DEMONSTRATIONS_FILE):
+        if load_demonstration_context(config.DEMONSTRATIONS_FILE) == context:
+            print(f"Chargement des démonstrations existantes : {config.DEMONSTRATIONS_FILE}")
+            demonstrations = load_demonstrations(config.DEMONSTRATIONS_FILE)
+        else:
+            # Autre mode d'observation, autres embeddings, autre graphe ou autre jeu d'évaluation.
+            print(f"'{config.DEMONSTRATIONS_FILE}' a été généré dans un autre contexte : nouvelles démonstrations.")
+    if demonstrations is None:
+        # WikiEnv a déjà retiré les missions d'évaluation : l'expert ne les voit jamais.
+        missions = random.sample(env.missions, min(config.IMITATION_NUM_MISSIONS, len(env.missions)))
+        demonstrations = generate_demonstrations(env, missions)
+        save_demonstrations(config.DEMONSTRATIONS_FILE, demonstrations, context)
+        print(f"✅ Démonstrations sauvegardées dans '{config.DEMONSTRATIONS_FILE}'.")
+    env.close()
+
+    if len(demonstrations["actions"]) == 0:
+        print("ERREUR: Aucune démonstration disponible. Arrêt.")
+        return
+
+    # Le modèle est construit exactement comme dans 02_train_agent.py.
+    env = DummyVecEnv([make_env])
+    model = create_model(env, verbose=0)
+    env.close()
+
+    print(f"Clonage de {len(demonstrations['actions'])} décisions sur {config.IMITATION_EPOCHS} époques...")
+    accuracies = behavior_clone(model, demonstrations)
+
+    model.save(config.IMITATION_MODEL_PATH)
+    with open(config.IMITATION_MODEL_PATH + ".json", "w", encoding="utf-8") as f:
+        json.dump({"samples": int(len(demonstrations["actions"])), "accuracy": accuracies[-1],
+                   "observation_mode": config.OBSERVATION_MODE}, f, indent=4)
+    print(f"✅ Modèle pré-entraîné sauvegardé dans '{config.IMITATION_MODEL_PATH}'.")
+    print("Mettre IMITATION_WARM_START = True dans src/config.py pour que 02_train_agent.py en parte.")
+
+
+if __name__ == "__main__":
+    main()
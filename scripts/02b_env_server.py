@@ -0,0 +1,35 @@
+# scripts/02b_env_server.py (Serveur d'environnements pour l'entraînement distribué)
+import sys
+import os
+import argparse
+import multiprocessing
+from functools import partial
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import config
+from src.remote_env import EnvServer
+from src.vec_env import make_env
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Héberge plusieurs WikiEnv pour un learner distant.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument("--num-envs", type=int, default=config.REMOTE_SERVER_NUM_ENVS)
+    parser.add_argument("--vec-env", default="SHARED_MEMORY", choices=["SUBPROC", "SHARED_MEMORY"])
+    parser.add_argument("--worker-offset", type=int, default=0,
+                        help="Index du premier worker (missions locales : un serveur par groupe de partitions).")
+    args = parser.parse_args()
+
+    env_fns = [partial(make_env, None, None, args.worker_offset + i) for i in range(args.num_envs)]
+    server = EnvServer(args.host, args.port, env_fns, vec_env_type=args.vec_env)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nArrêt du serveur.")
+
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method('spawn', force=True)
+    main()
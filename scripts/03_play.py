@@ -16,8 +16,9 @@ from textual.screen import ModalScreen
 # --- Imports de notre projet ---
 # On les importe ici pour le bloc try/except
 try:
-    from sb3_contrib import MaskablePPO
+    from src.inference import load_policy, observation_mode_of, structural_features_of
     from src.environment import WikiEnv
+    from src.prefetch import prefetch_likely_moves
     from src import config
 except Exception as e:
     print("ERREUR CRITIQUE PENDANT L'IMPORTATION DES MODULES DU PROJET:")
@@ -29,6 +30,8 @@ except Exception as e:
 
 # --- CONFIGURATION DU JEU ---
 MODEL_PATH = os.path.join(config.MODELS_PATH, "wiki_ppo_final.zip")
+# Si la politique a été exportée (scripts/05_export_policy.py), on l'utilise : chargement et décisions plus rapides.
+EXPORTED_POLICY_PATH = os.path.join(config.EXPORTED_MODELS_PATH, "wiki_ppo_final.pt")
 MAX_CLICKS = 20
 
 
@@ -59,8 +62,9 @@ class WikiApp(App):
         # Ce bloc va attraper toute erreur qui se produit pendant le chargement
         try:
             print("Chargement du modèle et de l'environnement (cela peut prendre un moment)...")
-            self.env = WikiEnv()
-            self.model = MaskablePPO.load(MODEL_PATH)
+            self.model = load_policy(EXPORTED_POLICY_PATH if os.path.exists(EXPORTED_POLICY_PATH) else MODEL_PATH)
+            self.env = WikiEnv(observation_mode=observation_mode_of(self.model), prefetch=True,
+                               structural_features=structural_features_of(self.model))
             print("Prêt ! Le jeu va démarrer automatiquement.")
 
             self.obs = None
@@ -111,6 +115,7 @@ class WikiApp(App):
         table.add_column("Page Voisine")
 
         self.update_ui()
+        prefetch_likely_moves(self.env, self.model, self.obs)
         self.set_timer(1.0, self.run_ai_turn)
 
     def run_ai_turn(self):
@@ -128,6 +133,8 @@ class WikiApp(App):
             return
 
         self.update_ui()
+        # Les requêtes du prochain clic tournent pendant la pause d'affichage.
+        prefetch_likely_moves(self.env, self.model, self.obs)
         self.set_timer(1.0, self.run_ai_turn)
 
     def update_ui(self):
@@ -7,8 +7,9 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(ROOT_DIR)
 
 try:
-    from sb3_contrib import MaskablePPO
+    from src.inference import load_policy, observation_mode_of, structural_features_of
     from src.environment import WikiEnv
+    from src.prefetch import prefetch_likely_moves
     from src import config
 except Exception as e:
     print(f"ERREUR CRITIQUE PENDANT L'IMPORTATION : {e}")
@@ -16,6 +17,8 @@ except Exception as e:
 
 # --- CONFIGURATION DU JEU ---
 MODEL_PATH = os.path.join(config.MODELS_PATH, "wiki_ppo_final.zip")
+# Si la politique a été exportée (scripts/05_export_policy.py), on l'utilise : chargement et décisions plus rapides.
+EXPORTED_POLICY_PATH = os.path.join(config.EXPORTED_MODELS_PATH, "wiki_ppo_final.pt")
 MAX_CLICKS = 20
 
 # --- Couleurs pour le terminal ---
@@ -38,8 +41,9 @@ def main():
     # --- 1. CHARGEMENT ---
     try:
         print("Chargement de l'environnement et du modèle IA (cela peut prendre un moment)...")
-        env = WikiEnv()
-        model = MaskablePPO.load(MODEL_PATH)
+        model = load_policy(EXPORTED_POLICY_PATH if os.path.exists(EXPORTED_POLICY_PATH) else MODEL_PATH)
+        env = WikiEnv(observation_mode=observation_mode_of(model), prefetch=True,
+                      structural_features=structural_features_of(model))
         print(f"{GREEN}Chargement terminé !{RESET}")
         time.sleep(2)
     except Exception as e:
@@ -92,6 +96,9 @@ def main():
 
         print(f"{BLUE}L'IA réfléchit... et choisit de cliquer sur : {BOLD}{chosen_link}{RESET}")
 
+        # Pendant que le joueur lit, on prépare le prochain pas (voisins de la page choisie).
+        env.prefetch([chosen_link])
+
         # Attente de l'utilisateur
         try:
             input("\nAppuyez sur Entrée pour continuer...")
@@ -101,6 +108,9 @@ def main():
 
         # L'environnement exécute l'action
         obs, _, terminated, truncated, info = env.step(action_index)
+        if not (terminated or truncated):
+            # Alternatives probables depuis la nouvelle page, préparées avant la décision suivante.
+            prefetch_likely_moves(env, model, obs)
 
         # Vérification de la fin de partie
         if terminated or truncated or env.current_step >= MAX_CLICKS:
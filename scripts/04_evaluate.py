@@ -0,0 +1,76 @@
+# scripts/04_evaluate.py (Évaluation headless et comparaison de modèles)
+import sys
+import os
+import re
+import json
+import argparse
+import multiprocessing
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import config
+from src.evaluation import select_eval_missions, evaluate_model, trained_without_eval_missions
+from src.versioning import resolve_model_path
+
+
+def list_model_bases(path):
+    """Liste les noms de base des modèles présents dans `models/` (sans les suffixes de version)."""
+    if not os.path.exists(path):
+        return []
+    bases = {re.sub(r"-\d+$", "", f[:-4]) for f in os.listdir(path) if f.endswith(".zip")}
+    return sorted(bases)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Évalue un ou plusieurs modèles sur les missions réservées.")
+    parser.add_argument("models", nargs="*",
+                        help="Noms de base (dernière version utilisée) ou chemins .zip. Par défaut : tous les modèles.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--games-per-worker", type=int, default=config.EVAL_GAMES_PER_WORKER)
+    parser.add_argument("--output", help="Fichier JSON où enregistrer les résultats.")
+    parser.add_argument("--allow-contaminated", action="store_true",
+                        help="Évalue aussi les modèles créés sans le jeu réservé actuel (résultats marqués).")
+    args = parser.parse_args()
+
+    missions = select_eval_missions()
+    names = args.models or list_model_bases(config.MODELS_PATH)
+    if not names:
+        print(f"ERREUR: Aucun modèle trouvé dans '{config.MODELS_PATH}'.")
+        return
+
+    print(f"--- Évaluation de {len(names)} modèle(s) sur {len(missions)} missions ---")
+    report = {}
+    for name in names:
+        model_path = resolve_model_path(config.MODELS_PATH, name)
+        if model_path is None:
+            print(f"Modèle introuvable : {name}")
+            continue
+        held_out = trained_without_eval_missions(model_path)
+        if not held_out:
+            if not args.allow_contaminated:
+                print(f"REFUSÉ: {model_path} a été créé sans le jeu d'évaluation actuel et a pu s'entraîner sur "
+                      f"ses missions (--allow-contaminated pour l'évaluer quand même).")
+                continue
+            print(f"ATTENTION: {model_path} a pu s'entraîner sur les missions d'évaluation, résultat non fiable.")
+        print(f"Évaluation de {model_path}...")
+        metrics = evaluate_model(model_path, missions, args.workers, args.games_per_worker)
+        report[os.path.basename(model_path)] = {**metrics, "held_out": held_out}
+
+    print(f"\n{'Modèle':<35} {'Réussite':>9} {'Clics':>7} {'Clics (ok)':>11} {'Écart opt.':>11} {'Missions/s':>11}")
+    for model_name, metrics in report.items():
+        label = model_name if metrics["held_out"] else f"{model_name} (*)"
+        print(f"{label:<35} {metrics['success_rate'] * 100:>8.2f}% {metrics['mean_clicks']:>7.2f} "
+              f"{metrics['mean_clicks_success']:>11.2f} {metrics['optimality_gap']:>11.2f} "
+              f"{metrics['missions_per_sec']:>11.1f}")
+    if not all(metrics["held_out"] for metrics in report.values()):
+        print("(*) Modèle créé sans le jeu d'évaluation actuel : ses missions ont pu servir à l'entraînement.")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        print(f"\n✅ Résultats sauvegardés dans '{args.output}'.")
+
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method('spawn', force=True)
+    main()
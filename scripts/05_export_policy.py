@@ -0,0 +1,42 @@
+# scripts/05_export_policy.py (Export de la politique pour le jeu et l'agent)
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import config
+from src.inference import export_policy, compare_with_model
+from src.versioning import resolve_model_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporte une politique MaskablePPO en TorchScript ou ONNX.")
+    parser.add_argument("model", help="Nom de base (dernière version utilisée) ou chemin .zip.")
+    parser.add_argument("--format", choices=["torchscript", "onnx"], default="torchscript")
+    parser.add_argument("--quantize", action="store_true", help="Quantification dynamique int8 des couches linéaires.")
+    parser.add_argument("--output", help="Chemin de l'artefact (par défaut : models/exported/<modèle>.pt|.onnx).")
+    args = parser.parse_args()
+
+    model_path = resolve_model_path(config.MODELS_PATH, args.model)
+    if model_path is None:
+        print(f"ERREUR: Modèle introuvable : {args.model}")
+        return
+
+    extension = ".onnx" if args.format == "onnx" else ".pt"
+    model_name = os.path.splitext(os.path.basename(model_path))[0]
+    output_path = args.output or os.path.join(config.EXPORTED_MODELS_PATH, model_name + extension)
+
+    print(f"Export de {model_path} ({args.format}{', int8' if args.quantize else ''})...")
+    export_policy(model_path, output_path, fmt=args.format, quantize=args.quantize)
+    print(f"✅ Politique exportée dans '{output_path}'.")
+
+    print("Vérification contre le modèle d'origine...")
+    report = compare_with_model(model_path, output_path)
+    print(f"  Actions identiques      : {report['agreement'] * 100:.2f}%")
+    print(f"  Chargement (SB3 / export) : {report['model_load_s']:.2f}s / {report['exported_load_s']:.2f}s")
+    print(f"  Décision (SB3 / export)   : {report['model_decision_ms']:.3f}ms / {report['exported_decision_ms']:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# scripts/06_pathfinding_server.py (Service HTTP de recherche de chemins)
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import config
+from src.pathfinding_service import PathfindingService, serve
+from src.versioning import resolve_model_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sert la politique entraînée pour de nombreuses missions à la fois.")
+    parser.add_argument("model", help="Nom de base, chemin .zip ou politique exportée (.pt / .onnx).")
+    parser.add_argument("--host", default=config.PATHFINDING_HOST)
+    parser.add_argument("--port", type=int, default=config.PATHFINDING_PORT)
+    parser.add_argument("--max-batch", type=int, default=config.PATHFINDING_MAX_BATCH)
+    args = parser.parse_args()
+
+    model_path = args.model if os.path.exists(args.model) else resolve_model_path(config.MODELS_PATH, args.model)
+    if model_path is None:
+        print(f"ERREUR: Modèle introuvable : {args.model}")
+        return
+
+    print(f"Chargement du modèle {model_path}...")
+    service = PathfindingService(model_path, max_batch=args.max_batch)
+    try:
+        serve(service, args.host, args.port)
+    except KeyboardInterrupt:
+        print("\nArrêt du service.")
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
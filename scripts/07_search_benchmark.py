@@ -0,0 +1,74 @@
+# scripts/07_search_benchmark.py (Recherche guidée contre parcours en largeur)
+import sys
+import os
+import json
+import argparse
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import config
+from src.compressed_graph import get_compressed_graph
+from src.evaluation import select_eval_missions
+from src.graph import Neo4jGraph
+from src.inference import load_policy
+from src.search import GuidedSearch, bfs_search
+from src.versioning import resolve_model_path
+
+
+def summarize(results, missions):
+    successes = [(r, m) for r, m in zip(results, missions) if r["success"]]
+    gaps = [r["clicks"] - m["distance"] for r, m in successes if m.get("distance")]
+    return {
+        "success_rate": len(successes) / len(results),
+        "mean_expansions": float(np.mean([r["expansions"] for r in results])),
+        "mean_bound_expansions": float(np.mean([r.get("bound_expansions", 0) for r in results])),
+        "mean_latency_ms": float(np.mean([r["latency_s"] for r in results])) * 1000,
+        "mean_clicks": float(np.mean([r["clicks"] for r, _ in successes])) if successes else 0.0,
+        "optimality_gap": float(np.mean(gaps)) if gaps else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare la recherche guidée par la politique au parcours en largeur.")
+    parser.add_argument("model", help="Nom de base, chemin .zip ou politique exportée (.pt / .onnx).")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[25, 100, config.SEARCH_EXPANSION_BUDGET, 1000])
+    parser.add_argument("--bound-weight", type=float, default=config.SEARCH_BOUND_WEIGHT)
+    parser.add_argument("--missions", type=int, default=200, help="Nombre de missions d'évaluation utilisées.")
+    parser.add_argument("--output", help="Fichier JSON où enregistrer les résultats.")
+    args = parser.parse_args()
+
+    model_path = args.model if os.path.exists(args.model) else resolve_model_path(config.MODELS_PATH, args.model)
+    if model_path is None:
+        print(f"ERREUR: Modèle introuvable : {args.model}")
+        return
+
+    missions = select_eval_missions()[:args.missions]
+    graph = get_compressed_graph() if config.GRAPH_BACKEND == "COMPRESSED" else Neo4jGraph()
+    policy = load_policy(model_path)
+
+    report = {}
+    print(f"--- {len(missions)} missions, budgets : {args.budgets} ---")
+    for budget in args.budgets:
+        # Un chercheur par budget : chaque budget paie le parcours inverse de la borne (pas de cache partagé).
+        searcher = GuidedSearch(policy, graph, bound_weight=args.bound_weight)
+        guided = [searcher.search(m["start"], m["target"], budget) for m in missions]
+        bfs = [bfs_search(graph, m["start"], m["target"], budget) for m in missions]
+        report[budget] = {"guided": summarize(guided, missions), "bfs": summarize(bfs, missions)}
+    graph.close()
+
+    print(f"\n{'Budget':>7} {'Méthode':<8} {'Réussite':>9} {'Expansions':>11} {'Latence':>10} {'Clics':>7} {'Écart opt.':>11}")
+    for budget, methods in report.items():
+        for method, metrics in methods.items():
+            print(f"{budget:>7} {method:<8} {metrics['success_rate'] * 100:>8.2f}% {metrics['mean_expansions']:>11.1f} "
+                  f"{metrics['mean_latency_ms']:>8.1f}ms {metrics['mean_clicks']:>7.2f} {metrics['optimality_gap']:>11.2f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        print(f"\n✅ Résultats sauvegardés dans '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# scripts/08_sweep_hyperparameters.py (Balayage d'hyperparamètres PPO par successive halving)
+import sys
+import os
+import argparse
+import multiprocessing
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import config
+from src.graph import connect_to_neo4j
+from src.query_cache import start_query_cache
+from src.sweep import run_sweep
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lance de nombreux entraînements courts en parallèle et "
+                                                 "élimine les moins bons à chaque palier (successive halving).")
+    parser.add_argument("--trials", type=int, default=config.SWEEP_TRIALS)
+    parser.add_argument("--eta", type=int, default=config.SWEEP_ETA)
+    parser.add_argument("--min-timesteps", type=int, default=config.SWEEP_MIN_TIMESTEPS)
+    parser.add_argument("--rungs", type=int, default=config.SWEEP_RUNGS)
+    parser.add_argument("--cores-per-trial", type=int, default=config.SWEEP_CORES_PER_TRIAL)
+    parser.add_argument("--envs-per-trial", type=int, default=config.SWEEP_ENVS_PER_TRIAL)
+    parser.add_argument("--eval-missions", type=int, default=config.SWEEP_EVAL_MISSIONS)
+    parser.add_argument("--seed", type=int, default=config.SWEEP_SEED)
+    args = parser.parse_args()
+
+    print("--- Balayage d'hyperparamètres PPO ---")
+    # Tous les essais interrogent le même graphe : un seul cache de requêtes pour toute la machine.
+    if config.QUERY_CACHE_ENABLED and config.GRAPH_BACKEND == "NEO4J":
+        driver = connect_to_neo4j()
+        try:
+            start_query_cache(driver)
+        finally:
+            driver.close()
+
+    leaderboard = run_sweep(trials=args.trials, eta=args.eta, min_timesteps=args.min_timesteps, rungs=args.rungs,
+                            cores_per_trial=args.cores_per_trial, envs_per_trial=args.envs_per_trial,
+                            eval_missions=args.eval_missions, seed=args.seed)
+    print(f"\n✅ Balayage terminé ({len(leaderboard)} essais).")
+
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method('spawn', force=True)
+    main()
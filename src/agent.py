@@ -1,109 +1,121 @@
-# ia.py (Version finale pour le modèle OFFLINE)
-import torch
+# src/agent.py (Agent de jeu : reproduit l'observation de WikiEnv hors entraînement)
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from stable_baselines3 import PPO
 from neo4j import GraphDatabase
 
-# On importe la constante de notre nouvel environnement
-from environment_offline import MAX_LINKS_TO_CONSIDER
+from . import config
+from .environment import VECTOR_SIZE, get_encoder, order_actions
+from .inference import action_probabilities, load_policy, observation_mode_of, structural_features_of
+from .node_table import NodeTable
+from .prefetch import Prefetcher, top_k_candidates
+from .structure import StructuralFeatures
 
 
 class Agent:
     """
     L'agent IA qui utilise le modèle entraîné sur la base Neo4j.
-    Il doit reproduire la logique de l'environnement pour construire son observation.
+    Il reproduit la logique de WikiEnv (ordre des actions, anti-cycle, observation)
+    pour choisir ses clics. Accepte un modèle .zip ou une politique exportée (.pt / .onnx).
     """
 
-    def __init__(self, model_path: str, target_page: str):
+    def __init__(self, model_path: str, target_page: str, max_actions: int = 100):
         self.target_page = target_page
+        self.max_actions = max_actions
+        self.path: list[str] = []
 
         # 1. Connexion à la base de données Neo4j
         print("🤖 L'agent se connecte à Neo4j...")
-        self.driver = GraphDatabase.driver("bolt://localhost:7687", auth=None)
+        auth = (config.NEO4J_USER, config.NEO4J_PASSWORD) if config.NEO4J_AUTH_ENABLED else None
+        self.driver = GraphDatabase.driver(config.NEO4J_URI, auth=auth)
 
         # 2. Chargement du cerveau entraîné
         print(f"🤖 Chargement du modèle depuis '{model_path}'...")
-        self.model = PPO.load(model_path, device='cpu')
+        self.model = load_policy(model_path)
+        self.observation_mode = observation_mode_of(self.model)
         print("✅ Modèle chargé.")
 
-        # 3. Chargement du modèle sémantique
-        self.semantic_model = SentenceTransformer('all-MiniLM-L6-v2', device='cpu')
-        self.embedding_dim = self.semantic_model.get_sentence_embedding_dimension()
-
-        # On pré-calcule le vecteur de la cible
-        self.target_embedding = self.semantic_model.encode(self.target_page)
-
-    def _get_candidate_links(self, page_title, target_title):
-        """
-        REPRODUIT LA LOGIQUE DE L'ENVIRONNEMENT :
-        Récupère les liens sortants, les trie par popularité (inDegree),
-        et applique la règle du "Golden Ticket".
-        """
+        # 3. Représentation des pages, identique à celle de l'entraînement
+        self.structure = None
+        if self.observation_mode == "INDEX":
+            self.node_table = NodeTable(config.NODE_TABLE_PATH)
+        else:
+            self.semantic_model = get_encoder()
+            if structural_features_of(self.model):
+                self.structure = StructuralFeatures(config.NODE_TABLE_PATH)
+            # On pré-calcule le vecteur de la cible
+            self.target_embedding = self.semantic_model.encode(self.target_page, convert_to_numpy=True)
+
+        # 4. Les voisins et vecteurs des prochains clics probables sont chargés en arrière-plan.
+        self.prefetcher = Prefetcher({
+            "neighbors": self._query_neighbors,
+            "embedding": lambda title: self.semantic_model.encode(title, convert_to_numpy=True),
+        })
+
+    def _query_neighbors(self, page_title: str) -> dict[str, float]:
         with self.driver.session(database="neo4j") as session:
-            query = """
-            MATCH (a:Page {title: $title})-[:LINKS_TO]->(b:Page)
-            RETURN b.title AS target_title, b.inDegree AS popularity
-            """
-            results = session.run(query, title=page_title)
-            all_links = [{"title": r["target_title"], "pop": r.get("popularity", 0)} for r in results]
-
-        all_links.sort(key=lambda x: x["pop"], reverse=True)
-        top_popular_titles = [link["title"] for link in all_links[:MAX_LINKS_TO_CONSIDER]]
-
-        all_link_titles = {link["title"] for link in all_links}
-        if target_title in all_link_titles and target_title not in top_popular_titles:
-            if len(top_popular_titles) == MAX_LINKS_TO_CONSIDER:
-                top_popular_titles[-1] = target_title
-            else:
-                top_popular_titles.append(target_title)
-
-        return top_popular_titles
+            result = session.run(
+                "MATCH (p:Page {title: $title})-[:LINKS_TO]->(next:Page) "
+                "RETURN next.title AS nextPage, next.score AS score",
+                title=page_title
+            )
+            return {record["nextPage"]: record["score"] for record in result}
+
+    def _get_candidate_links(self, page_title: str) -> list[str]:
+        """REPRODUIT LA LOGIQUE DE L'ENVIRONNEMENT (voir `order_actions`)."""
+        neighbors = self.prefetcher.get("neighbors", page_title)
+        return order_actions(neighbors, self.target_page, set(self.path), self.max_actions)
+
+    def _prefetch(self, titles: list[str]) -> None:
+        for title in titles:
+            self.prefetcher.prefetch("neighbors", title)
+            if self.observation_mode == "VECTOR":
+                self.prefetcher.prefetch("embedding", title)
+
+    def _build_observation(self, current_page_title: str) -> np.ndarray:
+        previous_page_title = self.path[-2] if len(self.path) >= 2 else None
+        if self.observation_mode == "INDEX":
+            return np.array([
+                self.node_table.id_of(current_page_title),
+                self.node_table.id_of(self.target_page),
+                self.node_table.id_of(previous_page_title),
+            ], dtype=np.int32)
+        current_embedding = self.prefetcher.get("embedding", current_page_title)
+        previous_embedding = (np.zeros(VECTOR_SIZE, dtype=np.float32) if previous_page_title is None
+                              else self.prefetcher.get("embedding", previous_page_title))
+        observation = np.concatenate([current_embedding, self.target_embedding, previous_embedding])
+        if self.structure is not None:
+            observation = np.concatenate([
+                observation, self.structure.of([current_page_title, self.target_page, previous_page_title])])
+        return observation.astype(np.float32)
 
     def choose_next_link(self, current_page_title: str) -> str | None:
         """
         Construit l'observation et utilise le modèle pour choisir le meilleur lien.
-        NOTE: n'a plus besoin du 'path' ou de 'available_links' en argument.
+        L'agent mémorise lui-même le chemin parcouru (pour l'anti-cycle et la page précédente).
         """
-        # 1. Construire l'observation EXACTEMENT comme dans l'environnement
-        current_embedding = self.semantic_model.encode(current_page_title)
-
-        candidate_links = self._get_candidate_links(current_page_title, self.target_page)
+        if not self.path or self.path[-1] != current_page_title:
+            self.path.append(current_page_title)
 
+        candidate_links = self._get_candidate_links(current_page_title)
         if not candidate_links:
             print("🤖 Impasse : Aucun lien candidat trouvé.")
             return None
 
-        link_embeddings = self.semantic_model.encode(candidate_links)
-
-        # Padding
-        num_links = len(link_embeddings)
-        padding_size = MAX_LINKS_TO_CONSIDER - num_links
-        padding = np.zeros((padding_size, self.embedding_dim))
-
-        if num_links > 0:
-            final_link_vecs = np.vstack([link_embeddings, padding])
-        else:  # Ne devrait jamais arriver si on a des candidats
-            final_link_vecs = padding
+        observation = self._build_observation(current_page_title)
+        action_mask = np.zeros(self.max_actions, dtype=bool)
+        action_mask[:len(candidate_links)] = True
 
-        observation = np.concatenate([self.target_embedding, current_embedding, final_link_vecs.flatten()]).astype(
-            np.float32)
-
-        # 2. Demander au modèle de prédire la meilleure action
-        action, _ = self.model.predict(observation, deterministic=True)
-        action = int(action)
-
-        # 3. Traduire l'action en un nom de lien
-        if action >= len(candidate_links):
-            print(f"🤖 Le modèle a prédit une action invalide ({action}), on prend la meilleure option.")
-            chosen_link = candidate_links[0]
-        else:
-            chosen_link = candidate_links[action]
+        probabilities = action_probabilities(self.model, observation[None], action_mask[None])[0]
+        action = int(np.argmax(probabilities))
+        chosen_link = candidate_links[action]
+        # Le clic est validé par l'appelant : on prépare déjà les pages probables suivantes.
+        self._prefetch(top_k_candidates(probabilities, candidate_links))
 
         print(f"🤖 L'IA a choisi l'action n°{action} -> '{chosen_link}'")
         return chosen_link
 
     def __del__(self):
         """S'assure que la connexion à la base de données est bien fermée."""
+        if hasattr(self, 'prefetcher'):
+            self.prefetcher.close()
         if hasattr(self, 'driver'):
-            self.driver.close()
\ No newline at end of file
+            self.driver.close()
@@ -0,0 +1,160 @@
+# src/api.py (Accès aux articles pour l'interface : stock local, Wikipédia en direct, ou HTTP)
+import json
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from . import config
+from .article_store import ArticleStore
+
+
+class Article:
+    """Article affiché par l'interface : titre, résumé et liens sortants."""
+
+    def __init__(self, title: str, summary: str, links: List[str]):
+        self.title = title
+        self.summary = summary
+        self.links = links
+
+
+class ArticleService:
+    """Interface commune des sources d'articles utilisées par l'interface Textual."""
+
+    def get_page(self, title: str) -> Optional[Article]:
+        raise NotImplementedError
+
+    def get_page_summary(self, page: Article) -> str:
+        return page.summary
+
+    def get_page_links(self, page: Article) -> List[str]:
+        return page.links
+
+    def close(self) -> None:
+        pass
+
+
+class LocalArticleService(ArticleService):
+    """Articles lus dans le stock local construit par scripts/01c_build_article_store.py (hors-ligne)."""
+
+    def __init__(self, path: str = config.ARTICLE_STORE_PATH):
+        self.store = ArticleStore(path)
+
+    def get_page(self, title: str) -> Optional[Article]:
+        record = self.store.get(title)
+        if record is None:
+            return None
+        return Article(title, record["summary"], record["links"])
+
+    def close(self) -> None:
+        self.store.close()
+
+
+class WikipediaService(ArticleService):
+    """Articles demandés en direct à Wikipédia (réseau requis)."""
+
+    def __init__(self, language: str = 'fr'):
+        import wikipediaapi
+        self.wiki = wikipediaapi.Wikipedia(user_agent="WikiAI", language=language)
+
+    def get_page(self, title: str) -> Optional[Article]:
+        page = self.wiki.page(title.replace("_", " "))
+        if not page.exists():
+            return None
+        return Article(title, page.summary, [link.replace(" ", "_") for link in page.links])
+
+
+class HttpArticleService(ArticleService):
+    """Articles demandés à un serveur HTTP (voir `serve_articles`), par exemple pour les tests."""
+
+    def __init__(self, base_url: str = config.ARTICLE_SERVICE_URL, timeout: float = 5.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def get_page(self, title: str) -> Optional[Article]:
+        url = f"{self.base_url}/pages/{urllib.parse.quote(title, safe='')}"
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                record = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+        return Article(title, record["summary"], record["links"])
+
+
+def serve_articles(service: ArticleService, host: str = "localhost", port: int = 8081) -> ThreadingHTTPServer:
+    """
+    Démarre (dans un thread) un serveur HTTP qui expose `service` en GET /pages/<titre>.
+    Sert de remplaçant à Wikipédia pour `HttpArticleService`.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            prefix = "/pages/"
+            page = None
+            if self.path.startswith(prefix):
+                page = service.get_page(urllib.parse.unquote(self.path[len(prefix):]))
+            if page is None:
+                self.send_error(404)
+                return
+            body = json.dumps({"summary": page.summary, "links": page.links}, ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class AsyncArticleLoader:
+    """
+    Charge les articles dans un pool de threads pour que l'interface ne bloque jamais.
+    Les articles déjà chargés sont gardés dans un petit cache.
+    """
+
+    def __init__(self, service: ArticleService, max_workers: int = 2, cache_size: int = 256):
+        self.service = service
+        self.cache_size = cache_size
+        self._cache: Dict[str, Optional[Article]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="articles")
+
+    def _load(self, title: str) -> Optional[Article]:
+        with self._lock:
+            if title in self._cache:
+                return self._cache[title]
+        page = self.service.get_page(title)
+        with self._lock:
+            if len(self._cache) >= self.cache_size:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[title] = page
+        return page
+
+    def load(self, title: str) -> "Future[Optional[Article]]":
+        return self._executor.submit(self._load, title)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.service.close()
+
+
+def get_article_service(source: Optional[str] = None) -> ArticleService:
+    """Source d'articles choisie par `config.ARTICLE_SOURCE`."""
+    source = source or config.ARTICLE_SOURCE
+    if source == "LOCAL":
+        return LocalArticleService()
+    if source == "WIKIPEDIA":
+        return WikipediaService(language='fr')
+    if source == "HTTP":
+        return HttpArticleService()
+    raise ValueError(f"Source d'articles inconnue: {source}")
@@ -0,0 +1,63 @@
+# src/article_store.py (Stock local des articles : résumés et liens, compressés et indexés)
+import json
+import mmap
+import os
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import config
+
+DATA_FILE = "articles.dat"
+INDEX_FILE = "articles.idx.json"
+
+
+def write_article_store(articles: Iterable[Tuple[str, str, List[str]]], path: str = config.ARTICLE_STORE_PATH) -> int:
+    """
+    Écrit les articles (titre, résumé, liens) dans un fichier de blocs compressés (zlib)
+    mis bout à bout, et un index titre -> (position, taille) qui permet d'en relire un
+    seul sans décompresser le reste.
+    """
+    os.makedirs(path, exist_ok=True)
+    index: Dict[str, Tuple[int, int]] = {}
+    offset = 0
+    with open(os.path.join(path, DATA_FILE + ".tmp"), "wb") as f:
+        for title, summary, links in articles:
+            block = zlib.compress(json.dumps({"summary": summary, "links": links},
+                                             ensure_ascii=False).encode("utf-8"))
+            f.write(block)
+            index[title] = (offset, len(block))
+            offset += len(block)
+    with open(os.path.join(path, INDEX_FILE + ".tmp"), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    # Les deux fichiers ne remplacent les anciens qu'une fois complets.
+    os.replace(os.path.join(path, DATA_FILE + ".tmp"), os.path.join(path, DATA_FILE))
+    os.replace(os.path.join(path, INDEX_FILE + ".tmp"), os.path.join(path, INDEX_FILE))
+    return len(index)
+
+
+class ArticleStore:
+    """Lecture du stock d'articles : l'index est en mémoire, les données sont mappées depuis le disque."""
+
+    def __init__(self, path: str = config.ARTICLE_STORE_PATH):
+        with open(os.path.join(path, INDEX_FILE), "r", encoding="utf-8") as f:
+            self.index: Dict[str, List[int]] = json.load(f)
+        self._file = open(os.path.join(path, DATA_FILE), "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.index else b""
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, title: str) -> bool:
+        return title in self.index
+
+    def get(self, title: str) -> Optional[Dict]:
+        entry = self.index.get(title)
+        if entry is None:
+            return None
+        offset, size = entry
+        return json.loads(zlib.decompress(self._data[offset:offset + size]))
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
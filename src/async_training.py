@@ -0,0 +1,335 @@
+# src/async_training.py (Mode d'entraînement Acteurs / Learner découplés)
+import queue
+import time
+import traceback
+import multiprocessing
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import torch as th
+from torch.nn import functional as F
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.utils import configure_logger, safe_mean
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper
+from sb3_contrib import MaskablePPO
+
+from . import config
+
+
+def _policy_weights(policy) -> Dict[str, np.ndarray]:
+    """Copie les poids de la politique en tableaux numpy (sérialisation légère entre processus)."""
+    return {name: tensor.detach().cpu().numpy().copy() for name, tensor in policy.state_dict().items()}
+
+
+def _actor_worker(actor_id: int, env_fn_wrapper: CloudpickleWrapper, policy_class, policy_kwargs: dict,
+                  initial_weights: Dict[str, np.ndarray], rollout_queue, weights_queue, stop_event,
+                  rollout_length: int) -> None:
+    """
+    Boucle d'un acteur : joue en continu avec la dernière copie de la politique reçue
+    et pousse des segments de trajectoire de taille fixe dans la file bornée du learner.
+    """
+    th.set_num_threads(1)
+    env = env_fn_wrapper.var()
+    try:
+        policy = policy_class(env.observation_space, env.action_space, lambda _: 0.0, **policy_kwargs)
+        policy.load_state_dict({k: th.as_tensor(v) for k, v in initial_weights.items()})
+        policy.set_training_mode(False)
+        policy_version = 0
+
+        obs, _ = env.reset()
+        mask = env.action_masks()
+        while not stop_event.is_set():
+            # On récupère les poids les plus récents, sans jamais attendre le learner.
+            latest = None
+            while True:
+                try:
+                    latest = weights_queue.get_nowait()
+                except queue.Empty:
+                    break
+            if latest is not None:
+                policy_version, weights = latest
+                policy.load_state_dict({k: th.as_tensor(v) for k, v in weights.items()})
+
+            obs_buf = np.zeros((rollout_length + 1,) + env.observation_space.shape, dtype=np.float32)
+            mask_buf = np.zeros((rollout_length + 1, env.action_space.n), dtype=bool)
+            actions = np.zeros(rollout_length, dtype=np.int64)
+            rewards = np.zeros(rollout_length, dtype=np.float32)
+            dones = np.zeros(rollout_length, dtype=bool)
+            behaviour_log_probs = np.zeros(rollout_length, dtype=np.float32)
+            truncated_obs: Dict[int, np.ndarray] = {}
+            episode_infos: Dict[int, dict] = {}
+
+            for t in range(rollout_length):
+                obs_buf[t] = obs
+                mask_buf[t] = mask
+                with th.no_grad():
+                    obs_tensor = th.as_tensor(obs_buf[t:t + 1])
+                    distribution = policy.get_distribution(obs_tensor, action_masks=mask_buf[t:t + 1])
+                    action = distribution.get_actions()
+                    behaviour_log_probs[t] = distribution.log_prob(action).item()
+                actions[t] = int(action.item())
+
+                obs, reward, terminated, truncated, info = env.step(actions[t])
+                rewards[t] = reward
+                dones[t] = terminated or truncated
+                if dones[t]:
+                    # Une troncature (limite de clics) n'est pas une vraie fin : le learner
+                    # bootstrappe avec la valeur de la dernière observation.
+                    if truncated and not terminated:
+                        truncated_obs[t] = np.asarray(obs, dtype=np.float32)
+                    info.pop("action_mask", None)
+                    episode_infos[t] = info
+                    obs, _ = env.reset()
+                mask = env.action_masks()
+
+            obs_buf[rollout_length] = obs
+            mask_buf[rollout_length] = mask
+            segment = {
+                "actor_id": actor_id,
+                "policy_version": policy_version,
+                "obs": obs_buf,
+                "masks": mask_buf,
+                "actions": actions,
+                "rewards": rewards,
+                "dones": dones,
+                "behaviour_log_probs": behaviour_log_probs,
+                "truncated_obs": truncated_obs,
+                "episode_infos": episode_infos,
+            }
+            # File bornée : si le learner prend du retard, l'acteur patiente (sans bloquer l'arrêt).
+            while not stop_event.is_set():
+                try:
+                    rollout_queue.put(segment, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+    except Exception:
+        rollout_queue.put({"actor_id": actor_id, "error": traceback.format_exc()})
+    finally:
+        env.close()
+
+
+class AsyncActorLearner:
+    """
+    Entraînement découplé : les acteurs collectent des trajectoires avec une copie récente
+    de la politique et le learner applique des mises à jour corrigées par importance (V-trace)
+    dès qu'un lot de segments est disponible, puis diffuse les nouveaux poids.
+    Les acteurs lents ne bloquent plus les autres, et la collecte continue pendant le calcul du gradient.
+    """
+
+    def __init__(self, model: MaskablePPO, env_fns: List[Callable],
+                 rollout_length: int = config.ASYNC_ROLLOUT_LENGTH,
+                 queue_size: int = config.ASYNC_QUEUE_SIZE,
+                 batch_segments: int = config.ASYNC_BATCH_SEGMENTS,
+                 rho_clip: float = config.ASYNC_RHO_CLIP,
+                 c_clip: float = config.ASYNC_C_CLIP,
+                 log_interval: int = 10):
+        self.model = model
+        self.policy = model.policy
+        self.env_fns = env_fns
+        self.rollout_length = rollout_length
+        self.queue_size = queue_size
+        self.batch_segments = min(batch_segments, max(queue_size, 1))
+        self.rho_clip = rho_clip
+        self.c_clip = c_clip
+        self.log_interval = log_interval
+
+        self.ctx = multiprocessing.get_context("spawn")
+        self.rollout_queue = None
+        self.weights_queues = []
+        self.stop_event = None
+        self.processes: List[multiprocessing.Process] = []
+        self.policy_version = 0
+
+    # --- Gestion des acteurs ---
+    def _start_actors(self) -> None:
+        self.rollout_queue = self.ctx.Queue(maxsize=self.queue_size)
+        self.stop_event = self.ctx.Event()
+        initial_weights = _policy_weights(self.policy)
+        for actor_id, env_fn in enumerate(self.env_fns):
+            weights_queue = self.ctx.Queue(maxsize=1)
+            process = self.ctx.Process(
+                target=_actor_worker,
+                args=(actor_id, CloudpickleWrapper(env_fn), self.model.policy_class, self.model.policy_kwargs,
+                      initial_weights, self.rollout_queue, weights_queue, self.stop_event, self.rollout_length),
+                daemon=True,
+            )
+            process.start()
+            self.weights_queues.append(weights_queue)
+            self.processes.append(process)
+
+    def _broadcast_weights(self) -> None:
+        """Remplace (sans attendre) la copie de poids en attente de chaque acteur."""
+        weights = _policy_weights(self.policy)
+        for weights_queue in self.weights_queues:
+            try:
+                weights_queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                weights_queue.put_nowait((self.policy_version, weights))
+            except queue.Full:
+                pass
+
+    def _stop_actors(self) -> None:
+        if self.stop_event is None:
+            return
+        self.stop_event.set()
+        # On vide la file pour débloquer les acteurs en attente d'un put().
+        deadline = time.monotonic() + 10.0
+        while any(p.is_alive() for p in self.processes) and time.monotonic() < deadline:
+            try:
+                self.rollout_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        for process in self.processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        self.weights_queues = []
+
+    def _next_segment(self) -> dict:
+        while True:
+            try:
+                segment = self.rollout_queue.get(timeout=1.0)
+            except queue.Empty:
+                if not any(p.is_alive() for p in self.processes):
+                    raise RuntimeError("Tous les acteurs se sont arrêtés.")
+                continue
+            if "error" in segment:
+                raise RuntimeError(f"L'acteur {segment['actor_id']} a planté :\n{segment['error']}")
+            return segment
+
+    # --- Mise à jour du learner ---
+    def _train_on_segments(self, segments: List[dict]) -> Dict[str, float]:
+        device = self.policy.device
+        gamma = self.model.gamma
+        batch, horizon = len(segments), self.rollout_length
+
+        obs = th.as_tensor(np.stack([s["obs"] for s in segments]), device=device)
+        masks = np.stack([s["masks"] for s in segments])
+        actions = th.as_tensor(np.stack([s["actions"] for s in segments]), device=device)
+        rewards = th.as_tensor(np.stack([s["rewards"] for s in segments]), device=device)
+        dones = th.as_tensor(np.stack([s["dones"] for s in segments]), device=device, dtype=th.float32)
+        behaviour_log_probs = th.as_tensor(np.stack([s["behaviour_log_probs"] for s in segments]), device=device)
+
+        flat_obs = obs[:, :horizon].reshape((batch * horizon,) + obs.shape[2:])
+        flat_masks = masks[:, :horizon].reshape(batch * horizon, -1)
+        values, log_probs, entropy = self.policy.evaluate_actions(flat_obs, actions.reshape(-1),
+                                                                  action_masks=flat_masks)
+        values = values.reshape(batch, horizon)
+        log_probs = log_probs.reshape(batch, horizon)
+
+        with th.no_grad():
+            bootstrap_values = self.policy.predict_values(obs[:, horizon]).reshape(batch)
+            # Bootstrap des épisodes tronqués (même convention que SB3 avec `terminal_observation`).
+            for b, segment in enumerate(segments):
+                for t, terminal_obs in segment["truncated_obs"].items():
+                    terminal_value = self.policy.predict_values(th.as_tensor(terminal_obs[None], device=device))
+                    rewards[b, t] += gamma * terminal_value.item()
+
+            # Cibles V-trace (IMPALA), calculées à rebours sur chaque segment.
+            log_rhos = log_probs.detach() - behaviour_log_probs
+            rhos = th.exp(log_rhos)
+            clipped_rhos = th.clamp(rhos, max=self.rho_clip)
+            clipped_cs = th.clamp(rhos, max=self.c_clip)
+            detached_values = values.detach()
+            next_values = th.cat([detached_values[:, 1:], bootstrap_values[:, None]], dim=1)
+            discounts = gamma * (1.0 - dones)
+            deltas = clipped_rhos * (rewards + discounts * next_values - detached_values)
+
+            vs_minus_v = th.zeros(batch, device=device)
+            vs = th.zeros_like(detached_values)
+            for t in reversed(range(horizon)):
+                vs_minus_v = deltas[:, t] + discounts[:, t] * clipped_cs[:, t] * vs_minus_v
+                vs[:, t] = detached_values[:, t] + vs_minus_v
+            next_vs = th.cat([vs[:, 1:], bootstrap_values[:, None]], dim=1)
+            pg_advantages = clipped_rhos * (rewards + discounts * next_vs - detached_values)
+
+        policy_loss = -(pg_advantages * log_probs).mean()
+        value_loss = F.mse_loss(values, vs)
+        entropy_loss = -th.mean(entropy)
+        loss = policy_loss + self.model.vf_coef * value_loss + self.model.ent_coef * entropy_loss
+
+        self.policy.optimizer.zero_grad()
+        loss.backward()
+        th.nn.utils.clip_grad_norm_(self.policy.parameters(), self.model.max_grad_norm)
+        self.policy.optimizer.step()
+
+        return {
+            "train/policy_loss": policy_loss.item(),
+            "train/value_loss": value_loss.item(),
+            "train/entropy_loss": entropy_loss.item(),
+            "train/loss": loss.item(),
+            "train/mean_importance_ratio": rhos.mean().item(),
+        }
+
+    def learn(self, total_timesteps: int, callback: Optional[BaseCallback] = None,
+              tb_log_name: str = "AsyncActorLearner") -> MaskablePPO:
+        """Entraîne `total_timesteps` pas supplémentaires (comme `learn(..., reset_num_timesteps=False)`)."""
+        model = self.model
+        model.start_time = time.time_ns()
+        if model.ep_info_buffer is None:
+            model.ep_info_buffer = deque(maxlen=model._stats_window_size)
+            model.ep_success_buffer = deque(maxlen=model._stats_window_size)
+        model._num_timesteps_at_start = model.num_timesteps
+        model._total_timesteps = model.num_timesteps + total_timesteps
+        if not model._custom_logger:
+            model.set_logger(configure_logger(model.verbose, model.tensorboard_log, tb_log_name, False))
+        if callback is not None:
+            callback = model._init_callback(callback)
+            callback.on_training_start(locals(), globals())
+
+        self.policy.set_training_mode(True)
+        self._start_actors()
+        print(f"{len(self.processes)} acteurs démarrés (segments de {self.rollout_length} pas, "
+              f"file bornée à {self.queue_size} segments).")
+        iteration = 0
+        try:
+            while model.num_timesteps < model._total_timesteps:
+                segments = []
+                policy_lags = []
+                if callback is not None:
+                    callback.on_rollout_start()
+                while len(segments) < self.batch_segments:
+                    segment = self._next_segment()
+                    segments.append(segment)
+                    policy_lags.append(self.policy_version - segment["policy_version"])
+                    model.num_timesteps += self.rollout_length
+
+                    infos = [segment["episode_infos"].get(t, {}) for t in range(self.rollout_length)]
+                    model._update_info_buffer(infos, segment["dones"])
+                    if callback is not None:
+                        callback.update_locals({"dones": segment["dones"], "infos": infos})
+                        if not callback.on_step():
+                            return model
+                if callback is not None:
+                    callback.on_rollout_end()
+
+                model._update_current_progress_remaining(model.num_timesteps, model._total_timesteps)
+                model._update_learning_rate(self.policy.optimizer)
+                metrics = self._train_on_segments(segments)
+                self.policy_version += 1
+                self._broadcast_weights()
+                iteration += 1
+
+                if iteration % self.log_interval == 0:
+                    elapsed = max((time.time_ns() - model.start_time) / 1e9, 1e-9)
+                    for key, value in metrics.items():
+                        model.logger.record(key, value)
+                    model.logger.record("async/policy_lag", safe_mean(policy_lags))
+                    model.logger.record("async/queue_size", self.rollout_queue.qsize())
+                    if len(model.ep_info_buffer) > 0:
+                        model.logger.record("rollout/ep_rew_mean", safe_mean([e["r"] for e in model.ep_info_buffer]))
+                        model.logger.record("rollout/ep_len_mean", safe_mean([e["l"] for e in model.ep_info_buffer]))
+                    model.logger.record("time/fps", int((model.num_timesteps - model._num_timesteps_at_start) / elapsed))
+                    model.logger.record("time/iterations", iteration, exclude="tensorboard")
+                    model.logger.record("time/total_timesteps", model.num_timesteps, exclude="tensorboard")
+                    model.logger.dump(step=model.num_timesteps)
+        finally:
+            self._stop_actors()
+            if callback is not None:
+                callback.on_training_end()
+        return model
@@ -1,53 +1,254 @@
 # callbacks.py
+import copy
 import json
+import os
+import queue
+import threading
+from typing import Optional
+
 from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.save_util import recursive_getattr, save_to_zip_file
+from stable_baselines3.common.utils import safe_mean
 
 
 class StatsRecorderCallback(BaseCallback):
     """
-    Un callback pour enregistrer les statistiques de chaque épisode
-    dans un fichier JSON Lines.
+    Un callback pour enregistrer les statistiques de chaque épisode terminé, dans tous les
+    environnements du VecEnv.
+
+    La boucle d'entraînement se contente d'ajouter une ligne dans un tampon en mémoire ; les
+    lignes sont écrites par lots par un thread d'arrière-plan, dans des fichiers JSON Lines
+    (ou Parquet, avec pyarrow) renouvelés tous les `rotate_every` épisodes.
     """
 
-    def __init__(self, log_path="training_stats.jsonl", verbose=0):
+    def __init__(self, log_dir: str = "training_stats", fmt: str = "JSONL", flush_every: int = 1000,
+                 rotate_every: int = 100_000, verbose=0):
         super(StatsRecorderCallback, self).__init__(verbose)
-        self.log_path = log_path
-        # Ouvre le fichier en mode 'append'
-        self.log_file = open(self.log_path, "a")
+        if fmt not in ("JSONL", "PARQUET"):
+            raise ValueError(f"Format de statistiques inconnu: {fmt}")
+        if fmt == "PARQUET":
+            import pyarrow  # noqa: F401  (dépendance optionnelle, vérifiée dès la création)
+        self.log_dir = log_dir
+        self.fmt = fmt
+        self.flush_every = flush_every
+        self.rotate_every = rotate_every
+        self._buffer = []
+        self._batches = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self.episodes_recorded = 0
+
+    def _init_callback(self) -> None:
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._writer = threading.Thread(target=self._write_loop, name="stats-writer", daemon=True)
+        self._writer.start()
 
     def _on_step(self) -> bool:
-        # Cette méthode est appelée à chaque "pas" de l'environnement.
-        # On vérifie si un épisode vient de se terminer.
-        if self.locals['dones'][0]:
-            # Le dictionnaire 'info' contient les informations de l'environnement.
-            # Le Monitor wrapper y ajoute la clé 'episode' à la fin d'une partie.
-            info = self.locals['infos'][0]
-
-            if "episode" in info:
-                # On a trouvé les stats de fin de partie.
-                episode_stats = info["episode"]
-
-                log_entry = {
-                    # Infos personnalisées que nous avons ajoutées
-                    "start": info.get("start"),
-                    "target": info.get("target"),
-                    "path": info.get("path"),
-                    "success": info.get("path", ["", ""])[-1] == info.get("target"),
-
-                    # Stats fournies par le Monitor wrapper
-                    "reward": episode_stats["r"],
-                    "steps": episode_stats["l"],
-
-                    # Info générale de l'entraînement
-                    "total_timesteps": self.num_timesteps,
-                }
-
-                self.log_file.write(json.dumps(log_entry) + "\n")
-                self.log_file.flush()  # Pour écrire immédiatement sur le disque
+        # Cette méthode est appelée à chaque "pas" de l'environnement (de tous les environnements).
+        for done, info in zip(self.locals['dones'], self.locals['infos']):
+            # Le Monitor wrapper ajoute la clé 'episode' à la fin d'une partie.
+            if not done or "episode" not in info:
+                continue
+            episode_stats = info["episode"]
+            path = info.get("path") or []
+            self._buffer.append({
+                # Infos de la mission ajoutées par WikiEnv
+                "start": info.get("start"),
+                "target": info.get("target"),
+                "distance": info.get("distance"),
+                "path": path,
+                "success": bool(path) and path[-1] == info.get("target"),
+
+                # Stats fournies par le Monitor wrapper
+                "reward": float(episode_stats["r"]),
+                "steps": int(episode_stats["l"]),
 
+                # Info générale de l'entraînement
+                "total_timesteps": self.num_timesteps,
+            })
+
+        if len(self._buffer) >= self.flush_every:
+            self._flush()
         return True  # On retourne True pour continuer l'entraînement
 
-    def __del__(self):
-        # S'assure que le fichier est bien fermé quand l'objet est détruit.
-        if hasattr(self, 'log_file'):
-            self.log_file.close()
\ No newline at end of file
+    def _flush(self) -> None:
+        if self._buffer:
+            self._batches.put(self._buffer)
+            self.episodes_recorded += len(self._buffer)
+            self._buffer = []
+
+    def _file_path(self, part: int) -> str:
+        extension = "parquet" if self.fmt == "PARQUET" else "jsonl"
+        return os.path.join(self.log_dir, f"episodes-{part:05d}.{extension}")
+
+    def _first_free_part(self) -> int:
+        # Une reprise d'entraînement ajoute de nouveaux fichiers sans toucher aux anciens.
+        part = 0
+        while os.path.exists(self._file_path(part)):
+            part += 1
+        return part
+
+    def _write_loop(self) -> None:
+        part = self._first_free_part()
+        rows_in_part = 0
+        handle = None
+        while True:
+            batch = self._batches.get()
+            if batch is None:
+                break
+            try:
+                if handle is None:
+                    handle = self._open(part)
+                self._write(handle, batch)
+                rows_in_part += len(batch)
+                if rows_in_part >= self.rotate_every:
+                    handle.close()
+                    handle, part, rows_in_part = None, part + 1, 0
+            except Exception as e:
+                print(f"ERREUR pendant l'écriture des statistiques : {e}")
+        if handle is not None:
+            handle.close()
+
+    def _open(self, part: int):
+        if self.fmt == "PARQUET":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            schema = pa.schema([("start", pa.string()), ("target", pa.string()), ("distance", pa.int32()),
+                                ("path", pa.list_(pa.string())), ("success", pa.bool_()),
+                                ("reward", pa.float64()), ("steps", pa.int32()), ("total_timesteps", pa.int64())])
+            return pq.ParquetWriter(self._file_path(part), schema)
+        return open(self._file_path(part), "a", encoding="utf-8")
+
+    def _write(self, handle, batch: list) -> None:
+        if self.fmt == "PARQUET":
+            import pyarrow as pa
+            handle.write_table(pa.Table.from_pylist(batch, schema=handle.schema))
+        else:
+            handle.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in batch))
+            handle.flush()
+
+    def _on_training_end(self) -> None:
+        # Les épisodes encore en tampon sont écrits avant de rendre la main.
+        if self._writer is not None:
+            self._flush()
+            self._batches.put(None)
+            self._writer.join()
+            self._writer = None
+
+
+class AsyncCheckpointCallback(BaseCallback):
+    """
+    Sauvegarde périodique non bloquante : les poids et l'état de l'optimiseur sont copiés
+    en mémoire dans la boucle d'entraînement, puis écrits sur disque par un thread d'arrière-plan.
+    Ne conserve que les `keep_last` checkpoints les plus récents et les `keep_best` meilleurs
+    selon la récompense moyenne des derniers épisodes ; les autres sont supprimés.
+
+    Les fichiers gardent le format de `CheckpointCallback` (`checkpoint_<pas>_steps.zip`) et se
+    rechargent avec `MaskablePPO.load`.
+    """
+
+    INDEX_FILE = "checkpoints.json"
+
+    def __init__(self, save_freq: int, save_path: str, name_prefix: str = "checkpoint",
+                 keep_last: int = 3, keep_best: int = 2, verbose: int = 0):
+        super(AsyncCheckpointCallback, self).__init__(verbose)
+        self.save_freq = save_freq
+        self.save_path = save_path
+        self.name_prefix = name_prefix
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+        # Deux instantanés en attente au maximum : au-delà, la boucle attend le disque.
+        self._pending = queue.Queue(maxsize=2)
+        self._writer: Optional[threading.Thread] = None
+        self._index = []
+
+    def _init_callback(self) -> None:
+        os.makedirs(self.save_path, exist_ok=True)
+        index_path = os.path.join(self.save_path, self.INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, "r", encoding="utf-8") as f:
+                self._index = json.load(f)
+        self._writer = threading.Thread(target=self._write_loop, name="checkpoint-writer", daemon=True)
+        self._writer.start()
+
+    def _current_metric(self) -> Optional[float]:
+        if self.model.ep_info_buffer is None or len(self.model.ep_info_buffer) == 0:
+            return None
+        return float(safe_mean([ep_info["r"] for ep_info in self.model.ep_info_buffer]))
+
+    def _snapshot(self) -> dict:
+        """Reproduit la préparation de `BaseAlgorithm.save`, mais sur des copies figées en mémoire."""
+        data = self.model.__dict__.copy()
+        exclude = set(self.model._excluded_save_params())
+        state_dicts_names, torch_variable_names = self.model._get_torch_save_params()
+        for torch_var in state_dicts_names + torch_variable_names:
+            exclude.add(torch_var.split(".")[0])
+        for param_name in exclude:
+            data.pop(param_name, None)
+        data = {key: copy.copy(value) for key, value in data.items()}
+
+        pytorch_variables = {name: copy.deepcopy(recursive_getattr(self.model, name))
+                             for name in torch_variable_names}
+        return {
+            "timesteps": self.num_timesteps,
+            "metric": self._current_metric(),
+            "data": data,
+            "params": copy.deepcopy(self.model.get_parameters()),
+            "pytorch_variables": pytorch_variables,
+        }
+
+    def _on_step(self) -> bool:
+        if self.n_calls % self.save_freq == 0:
+            self._pending.put(self._snapshot())
+        return True
+
+    def _write_loop(self) -> None:
+        while True:
+            snapshot = self._pending.get()
+            if snapshot is None:
+                break
+            try:
+                self._write_snapshot(snapshot)
+            except Exception as e:
+                print(f"ERREUR pendant l'écriture du checkpoint : {e}")
+
+    def _write_snapshot(self, snapshot: dict) -> None:
+        filename = f"{self.name_prefix}_{snapshot['timesteps']}_steps.zip"
+        final_path = os.path.join(self.save_path, filename)
+        tmp_path = final_path + ".tmp"
+        # Écriture dans un fichier temporaire puis renommage : un checkpoint visible est toujours complet.
+        with open(tmp_path, "wb") as f:
+            save_to_zip_file(f, data=snapshot["data"], params=snapshot["params"],
+                             pytorch_variables=snapshot["pytorch_variables"])
+        os.replace(tmp_path, final_path)
+        if self.verbose >= 2:
+            print(f"Checkpoint écrit : {final_path}")
+
+        self._index = [entry for entry in self._index if entry["file"] != filename]
+        self._index.append({"file": filename, "timesteps": snapshot["timesteps"], "metric": snapshot["metric"]})
+        self._apply_retention()
+
+    def _apply_retention(self) -> None:
+        by_recency = sorted(self._index, key=lambda entry: entry["timesteps"], reverse=True)
+        by_metric = sorted([entry for entry in self._index if entry["metric"] is not None],
+                           key=lambda entry: entry["metric"], reverse=True)
+        keep = {entry["file"] for entry in by_recency[:self.keep_last]}
+        keep.update(entry["file"] for entry in by_metric[:self.keep_best])
+
+        for entry in self._index:
+            if entry["file"] not in keep:
+                path = os.path.join(self.save_path, entry["file"])
+                if os.path.exists(path):
+                    os.remove(path)
+        self._index = [entry for entry in self._index if entry["file"] in keep]
+
+        index_path = os.path.join(self.save_path, self.INDEX_FILE)
+        with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self._index, f, indent=4)
+        os.replace(index_path + ".tmp", index_path)
+
+    def _on_training_end(self) -> None:
+        # On attend que les checkpoints en file soient écrits avant de rendre la main.
+        if self._writer is not None:
+            self._pending.put(None)
+            self._writer.join()
+            self._writer = None
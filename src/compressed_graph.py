@@ -0,0 +1,525 @@
+# src/compressed_graph.py (Graphe des liens compressé, lu par mappage mémoire)
+import json
+import os
+import shutil
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+from . import config
+from .external_links import ExternalLinkSorter, LinkFile
+
+TITLES_FILE = "titles.json"
+SCORES_FILE = "scores.npy"
+META_FILE = "meta.json"
+DATA_FILE = "adjacency.bin"
+OFFSETS_FILE = "offsets.npy"
+FORWARD_DIR = "forward"
+REVERSE_DIR = "reverse"
+
+# Un identifiant (< 2^32), une fois l'écart codé en zigzag, tient en 5 octets de varint.
+MAX_VARINT_BYTES = 5
+
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def _unzigzag(values: np.ndarray) -> np.ndarray:
+    values = values.astype(np.int64)
+    return (values >> 1) ^ -(values & 1)
+
+
+def _varint_encode(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode des entiers positifs en varints (7 bits par octet, bit de poids fort = suite)."""
+    values = values.astype(np.uint64)
+    n_bytes = np.ones(len(values), dtype=np.int64)
+    for k in range(1, 10):
+        n_bytes += values >= np.uint64(1 << (7 * k))
+    starts = np.cumsum(n_bytes) - n_bytes
+    out = np.empty(int(n_bytes.sum()), dtype=np.uint8)
+    for k in range(int(n_bytes.max(initial=0))):
+        selected = n_bytes > k
+        low = (values[selected] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (n_bytes[selected] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[selected] + k] = (low | more).astype(np.uint8)
+    return out, n_bytes
+
+
+def _varint_decode(raw: np.ndarray) -> np.ndarray:
+    """Décode une suite complète de varints (le dernier octet lu doit terminer un varint)."""
+    if len(raw) == 0:
+        return np.empty(0, dtype=np.uint64)
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    position = np.arange(len(raw)) - np.repeat(starts, ends - starts + 1)
+    low = (raw & 0x7F).astype(np.uint64) << (7 * position).astype(np.uint64)
+    return np.add.reduceat(low, starts)
+
+
+def _sort_edges(sources: np.ndarray, targets: np.ndarray, n_nodes: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Trie les liens par (source, cible) et supprime les doublons."""
+    keys = sources.astype(np.int64) * n_nodes + targets.astype(np.int64)
+    keys = np.unique(keys)
+    return keys // n_nodes, keys % n_nodes
+
+
+def _edge_chunks(sources: np.ndarray, targets: np.ndarray, n_nodes: int,
+                 chunk_nodes: int = 1 << 18) -> Iterator[Tuple[int, int, np.ndarray, np.ndarray]]:
+    """Découpe des liens en mémoire en tranches (première page, dernière page + 1, sources, cibles)."""
+    sources, targets = _sort_edges(sources, targets, n_nodes)
+    for first in range(0, n_nodes, chunk_nodes):
+        last = min(first + chunk_nodes, n_nodes)
+        e_first, e_last = np.searchsorted(sources, [first, last])
+        yield first, last, sources[e_first:e_last], targets[e_first:e_last]
+
+
+def _file_chunks(links: LinkFile, n_nodes: int) -> Iterator[Tuple[int, int, np.ndarray, np.ndarray]]:
+    """Même découpage pour des liens triés sur disque : un bloc ne coupe jamais les liens d'une page."""
+    first = 0
+    for sources, targets in links.iter_blocks(align_sources=True):
+        last = int(sources[-1]) + 1
+        yield first, last, sources, targets
+        first = last
+    if first < n_nodes:
+        empty = np.zeros(0, dtype=np.int64)
+        yield first, n_nodes, empty, empty
+
+
+def _write_adjacency(path: str, chunks: Iterable[Tuple[int, int, np.ndarray, np.ndarray]], n_nodes: int,
+                     scores: Optional[np.ndarray] = None) -> int:
+    """
+    Écrit les listes de voisins triées par identifiant croissant. Bloc d'une page : son degré,
+    l'écart zigzag entre le premier voisin et la page elle-même, puis les écarts (moins 1)
+    entre voisins successifs, tous en varints. `offsets.npy` donne le début de chaque bloc.
+    `chunks` couvre les pages dans l'ordre, liens triés par (source, cible) et sans doublon.
+
+    Avec `scores` (score de chaque identifiant, quand les identifiants ne suivent pas les
+    scores), chaque bloc est trié par score décroissant et tous les écarts sont codés en zigzag.
+    """
+    os.makedirs(path, exist_ok=True)
+    offsets = np.lib.format.open_memmap(os.path.join(path, OFFSETS_FILE), mode="w+", dtype=np.int64,
+                                        shape=(n_nodes + 1,))
+    written = 0
+    n_links = 0
+    with open(os.path.join(path, DATA_FILE), "wb") as f:
+        for first, last, src, dst in tqdm(chunks, desc="Compression des voisins"):
+            if scores is not None and len(dst):
+                by_score = np.lexsort((dst, -scores[dst], src))
+                src, dst = src[by_score], dst[by_score]
+            degrees = np.bincount(src - first, minlength=last - first)
+            node_starts = np.cumsum(degrees) - degrees
+
+            gaps = np.empty(len(dst), dtype=np.uint64)
+            if len(dst):
+                is_first = np.ones(len(dst), dtype=bool)
+                is_first[1:] = src[1:] != src[:-1]
+                gaps[is_first] = _zigzag(dst[is_first] - src[is_first])
+                follow = np.flatnonzero(~is_first)
+                if scores is not None:
+                    gaps[follow] = _zigzag(dst[follow] - dst[follow - 1])
+                else:
+                    gaps[follow] = (dst[follow] - dst[follow - 1] - 1).astype(np.uint64)
+
+            # Jetons dans l'ordre du fichier : degré de chaque page suivi de ses écarts.
+            tokens = np.empty(len(degrees) + len(dst), dtype=np.uint64)
+            degree_positions = np.arange(len(degrees)) + node_starts
+            tokens[degree_positions] = degrees
+            edge_positions = (src - first) + np.arange(len(dst)) + 1
+            tokens[edge_positions] = gaps
+
+            encoded, n_bytes = _varint_encode(tokens)
+            token_offsets = np.cumsum(n_bytes) - n_bytes
+            offsets[first:last] = written + token_offsets[degree_positions]
+            f.write(encoded.tobytes())
+            written += len(encoded)
+            n_links += len(dst)
+    offsets[n_nodes] = written
+    offsets.flush()
+    return n_links
+
+
+def _layout(scores: np.ndarray, order: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ordre des pages (par défaut, score décroissant) et rang (nouvel identifiant) de chaque page.
+    `order` impose un autre placement, ex. communautés contiguës (voir src/partition.py).
+    """
+    if order is None:
+        order = np.lexsort((np.arange(len(scores)), -scores))
+    rank = np.empty(len(scores), dtype=np.int64)
+    rank[order] = np.arange(len(scores))
+    return np.asarray(order), rank
+
+
+def _write_pages(path: str, titles: List[str], scores: np.ndarray, order: np.ndarray) -> None:
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, TITLES_FILE), "w", encoding="utf-8") as f:
+        json.dump([titles[i] for i in order], f, ensure_ascii=False)
+    np.save(os.path.join(path, SCORES_FILE), scores[order])
+
+
+def _write_meta(path: str, n_nodes: int, n_links: int, reverse: bool, signed_gaps: bool) -> Dict:
+    meta = {"pages": n_nodes, "links": n_links, "reverse": reverse, "score_ordered": True, "signed_gaps": signed_gaps,
+            "version": time.strftime("%Y%m%d-%H%M%S")}
+    with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return meta
+
+
+def write_compressed_graph(path: str, titles: List[str], scores: np.ndarray, sources: np.ndarray,
+                           targets: np.ndarray, reverse: bool = True, order: Optional[np.ndarray] = None) -> Dict:
+    """
+    Écrit un graphe compressé. Les pages sont renumérotées par score décroissant : l'ordre
+    croissant des identifiants est aussi l'ordre des scores, ce qui rend les blocs de voisins
+    à la fois triés par score et compacts une fois codés en écarts.
+    `sources` et `targets` sont des indices dans `titles` ; `order` impose un autre placement
+    (les blocs restent triés par score, au prix d'écarts signés un peu moins compacts).
+    """
+    n_nodes = len(titles)
+    scores = np.asarray(scores, dtype=np.float32)
+    block_scores = None if order is None else scores[np.asarray(order)]
+    order, rank = _layout(scores, order)
+    sources, targets = rank[np.asarray(sources)], rank[np.asarray(targets)]
+
+    _write_pages(path, titles, scores, order)
+    n_links = _write_adjacency(os.path.join(path, FORWARD_DIR), _edge_chunks(sources, targets, n_nodes), n_nodes,
+                               block_scores)
+    if reverse:
+        # Liens inversés : nécessaires aux plus courts chemins bidirectionnels.
+        _write_adjacency(os.path.join(path, REVERSE_DIR), _edge_chunks(targets, sources, n_nodes), n_nodes,
+                         block_scores)
+    return _write_meta(path, n_nodes, n_links, reverse, signed_gaps=block_scores is not None)
+
+
+def write_compressed_graph_external(path: str, titles: List[str], scores: np.ndarray, links: LinkFile,
+                                    reverse: bool = True, order: Optional[np.ndarray] = None) -> Dict:
+    """
+    Variante de `write_compressed_graph` pour des liens triés sur disque (indices dans
+    `titles`) : la renumérotation par score est suivie d'un nouveau tri externe, puis les
+    listes de voisins sont compressées en continu. La mémoire reste bornée par `LINKS_RUN_SIZE`.
+    `links` peut être tout objet offrant `iter_blocks()` (ex. les liens d'un graphe existant).
+    """
+    n_nodes = len(titles)
+    scores = np.asarray(scores, dtype=np.float32)
+    block_scores = None if order is None else scores[np.asarray(order)]
+    order, rank = _layout(scores, order)
+    _write_pages(path, titles, scores, order)
+
+    def write_direction(directory: str, swap: bool) -> int:
+        sorter = ExternalLinkSorter(name=directory)
+        for sources, targets in links.iter_blocks():
+            if swap:
+                sources, targets = targets, sources
+            sorter.add_arrays(rank[sources], rank[targets])
+        renumbered = sorter.finish(os.path.join(config.LINKS_TMP_PATH, f"{directory}.bin"))
+        n_links = _write_adjacency(os.path.join(path, directory), _file_chunks(renumbered, n_nodes), n_nodes,
+                                   block_scores)
+        renumbered.remove()
+        return n_links
+
+    n_links = write_direction(FORWARD_DIR, swap=False)
+    if reverse:
+        write_direction(REVERSE_DIR, swap=True)
+    return _write_meta(path, n_nodes, n_links, reverse, signed_gaps=block_scores is not None)
+
+
+class _Adjacency:
+    """Blocs de voisins mappés en mémoire, décodés à la demande."""
+
+    def __init__(self, path: str, signed_gaps: bool = False):
+        self.signed_gaps = signed_gaps
+        # Vues ndarray simples sur les fichiers mappés : l'indexation d'un np.memmap est plus lente.
+        self.offsets = np.asarray(np.load(os.path.join(path, OFFSETS_FILE), mmap_mode="r"))
+        size = os.path.getsize(os.path.join(path, DATA_FILE))
+        self.data = (np.asarray(np.memmap(os.path.join(path, DATA_FILE), dtype=np.uint8, mode="r")) if size
+                     else np.zeros(0, dtype=np.uint8))
+
+    def neighbors(self, node: int, limit: Optional[int] = None) -> np.ndarray:
+        """Voisins d'une page (par score décroissant) ; avec `limit`, seul le début du bloc est lu."""
+        start, end = int(self.offsets[node]), int(self.offsets[node + 1])
+        if limit is not None:
+            end = min(end, start + MAX_VARINT_BYTES * (limit + 1))
+        raw = np.asarray(self.data[start:end])
+        if end < int(self.offsets[node + 1]):
+            # Bloc tronqué : on s'arrête au dernier varint complet.
+            raw = raw[:np.flatnonzero(raw < 0x80)[-1] + 1]
+        tokens = _varint_decode(raw)[1:]
+        if limit is not None:
+            tokens = tokens[:limit]
+        if len(tokens) == 0:
+            return np.empty(0, dtype=np.int64)
+        increments = _unzigzag(tokens) if self.signed_gaps else tokens.astype(np.int64) + 1
+        increments[0] = node + _unzigzag(tokens[:1])[0]
+        return np.cumsum(increments)
+
+    def neighbors_many(self, nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Voisins de plusieurs pages en une passe : (voisins concaténés, nombre par page)."""
+        nodes = np.asarray(nodes, dtype=np.int64)
+        starts = np.asarray(self.offsets[nodes])
+        lengths = np.asarray(self.offsets[nodes + 1]) - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64), np.zeros(len(nodes), dtype=np.int64)
+        byte_starts = np.cumsum(lengths) - lengths
+        raw = np.asarray(self.data[np.repeat(starts - byte_starts, lengths) + np.arange(total)])
+        tokens = _varint_decode(raw)
+
+        # Nombre de jetons par page (degré compris) : varints terminés dans chaque bloc.
+        ends_cumulative = np.concatenate([[0], np.cumsum(raw < 0x80)])
+        token_counts = ends_cumulative[byte_starts + lengths] - ends_cumulative[byte_starts]
+        token_starts = np.cumsum(token_counts) - token_counts
+        counts = token_counts - 1
+
+        increments = _unzigzag(tokens) if self.signed_gaps else tokens.astype(np.int64) + 1
+        has_edges = counts > 0
+        first_edges = token_starts[has_edges] + 1
+        increments[first_edges] = nodes[has_edges] + _unzigzag(tokens[first_edges])
+        keep = np.ones(len(tokens), dtype=bool)
+        keep[token_starts] = False
+        increments = increments[keep]
+        if len(increments) == 0:
+            return np.empty(0, dtype=np.int64), counts
+        cumulative = np.cumsum(increments)
+        edge_starts = np.cumsum(counts) - counts
+        base = np.where(edge_starts > 0, cumulative[np.maximum(edge_starts - 1, 0)], 0)
+        return cumulative - np.repeat(base, counts), counts
+
+
+_GRAPH: Optional["CompressedGraph"] = None
+
+
+def get_compressed_graph(path: str = config.COMPRESSED_GRAPH_PATH) -> "CompressedGraph":
+    """Charge le graphe compressé une seule fois par processus (partagé par tous les WikiEnv du processus)."""
+    global _GRAPH
+    if _GRAPH is None:
+        _GRAPH = CompressedGraph(path)
+    return _GRAPH
+
+
+class CompressedGraph:
+    """
+    Graphe des liens compressé (voir `write_compressed_graph`), utilisable à la place de Neo4j
+    par WikiEnv et le générateur de missions : mêmes réponses que `Neo4jGraph.neighbors`
+    (titre -> score) et que la requête `shortestPath`, sans serveur ni réseau.
+    """
+
+    def __init__(self, path: str = config.COMPRESSED_GRAPH_PATH):
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(os.path.join(path, TITLES_FILE), "r", encoding="utf-8") as f:
+            self.titles: List[str] = json.load(f)
+        self.title_to_id = {title: i for i, title in enumerate(self.titles)}
+        self.scores = np.asarray(np.load(os.path.join(path, SCORES_FILE), mmap_mode="r"))
+        # Placement par communautés (src/partition.py) : les identifiants ne suivent plus les scores,
+        # les blocs restent triés par score avec des écarts signés.
+        signed_gaps = self.meta.get("signed_gaps", False)
+        self.forward = _Adjacency(os.path.join(path, FORWARD_DIR), signed_gaps)
+        self.reverse = _Adjacency(os.path.join(path, REVERSE_DIR), signed_gaps) if self.meta["reverse"] else None
+        # Anciens placements écrits avant les écarts signés : blocs triés par identifiant.
+        self.score_ordered = self.meta.get("score_ordered", True)
+
+    @property
+    def version(self) -> str:
+        return self.meta["version"]
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def neighbor_ids(self, node: int, limit: Optional[int] = None) -> np.ndarray:
+        if self.score_ordered:
+            return self.forward.neighbors(node, limit)
+        ids = self.forward.neighbors(node)
+        return ids[np.argsort(-self.scores[ids], kind="stable")[:limit]]
+
+    def neighbors(self, title: str, limit: Optional[int] = None) -> Dict[str, float]:
+        """Liens sortants d'une page, avec le score de chaque page liée (par score décroissant)."""
+        node = self.title_to_id.get(title)
+        if node is None:
+            return {}
+        ids = self.neighbor_ids(node, limit)
+        return dict(zip([self.titles[i] for i in ids], np.asarray(self.scores[ids]).tolist()))
+
+    def neighbors_many(self, titles: List[str]) -> Dict[str, Dict[str, float]]:
+        """Même contrat que `Neo4jGraph.neighbors_many` (les pages sans lien sont absentes)."""
+        known = [t for t in set(titles) if t in self.title_to_id]
+        ids, counts = self.forward.neighbors_many(np.array([self.title_to_id[t] for t in known], dtype=np.int64))
+        scores = np.asarray(self.scores[ids]).tolist()
+        result, position = {}, 0
+        for title, count in zip(known, counts.tolist()):
+            if count:
+                result[title] = {self.titles[i]: s for i, s in zip(ids[position:position + count].tolist(),
+                                                                    scores[position:position + count])}
+            position += count
+        return result
+
+    def random_title(self, rng: np.random.Generator) -> str:
+        return self.titles[int(rng.integers(len(self.titles)))]
+
+    def missing(self, titles: List[str]) -> Set[str]:
+        """Même contrat que `Neo4jGraph.missing` : titres absents du graphe."""
+        return {title for title in set(titles) if title not in self.title_to_id}
+
+    def predecessors_within(self, title: str, depth: int,
+                            max_pages: Optional[int] = None) -> Tuple[Dict[str, int], int]:
+        """Même contrat que `Neo4jGraph.predecessors_within`, par parcours des liens inversés."""
+        node = self.title_to_id.get(title)
+        if node is None:
+            return {title: 0}, 0
+        if self.reverse is None:
+            raise ValueError("Ce graphe compressé a été écrit sans les liens inversés (reverse=False).")
+        seen = np.zeros(len(self), dtype=bool)
+        seen[node] = True
+        distances = {title: 0}
+        frontier = np.array([node])
+        expanded = 0
+        for d in range(1, depth + 1):
+            ids, _ = self.reverse.neighbors_many(frontier)
+            expanded += len(frontier)
+            frontier = np.unique(ids)
+            frontier = frontier[~seen[frontier]]
+            if not len(frontier) or (max_pages is not None and len(distances) + len(frontier) > max_pages):
+                break
+            seen[frontier] = True
+            distances.update((self.titles[i], d) for i in frontier.tolist())
+        return distances, expanded
+
+    def close(self) -> None:
+        """Rien à fermer : le graphe mappé est partagé par tout le processus (`get_compressed_graph`)."""
+
+    def _bidirectional_search(self, s: int, t: int, max_depth: Optional[int],
+                              track_path: bool) -> Tuple[Optional[int], Optional[List[int]]]:
+        """
+        Recherche bidirectionnelle : à chaque niveau, la plus petite des deux frontières est
+        étendue, toutes ses pages décodées en une passe. Renvoie (distance, chemin si demandé).
+        """
+        if s == t:
+            return 0, [s]
+        if self.reverse is None:
+            raise ValueError("Ce graphe compressé a été écrit sans les liens inversés (reverse=False).")
+        seen = [np.zeros(len(self), dtype=bool), np.zeros(len(self), dtype=bool)]
+        seen[0][s] = seen[1][t] = True
+        parents = [np.empty(len(self), dtype=np.int64), np.empty(len(self), dtype=np.int64)] if track_path else None
+        frontiers = [np.array([s]), np.array([t])]
+        depths = [0, 0]
+        adjacency = [self.forward, self.reverse]
+        while len(frontiers[0]) and len(frontiers[1]):
+            if max_depth is not None and depths[0] + depths[1] >= max_depth:
+                return None, None
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            ids, counts = adjacency[side].neighbors_many(frontiers[side])
+            ids, first = np.unique(ids, return_index=True)
+            is_new = ~seen[side][ids]
+            new = ids[is_new]
+            depths[side] += 1
+            if track_path:
+                parents[side][new] = np.repeat(frontiers[side], counts)[first[is_new]]
+            meeting = new[seen[1 - side][new]]
+            if len(meeting):
+                if not track_path:
+                    return depths[0] + depths[1], None
+                return depths[0] + depths[1], self._join_paths(int(meeting[0]), side, parents, s, t)
+            seen[side][new] = True
+            frontiers[side] = new
+        return None, None
+
+    @staticmethod
+    def _join_paths(meeting: int, side: int, parents: List[np.ndarray], s: int, t: int) -> List[int]:
+        # La page de rencontre vient d'être atteinte par `side` ; l'autre côté l'avait déjà vue.
+        forward, node = [meeting], meeting
+        while node != s:
+            node = int(parents[0][node])
+            forward.append(node)
+        backward, node = [], meeting
+        while node != t:
+            node = int(parents[1][node])
+            backward.append(node)
+        return forward[::-1] + backward
+
+    def shortest_path_distance(self, start: str, target: str, max_depth: Optional[int] = None) -> Optional[int]:
+        """Longueur du plus court chemin (None s'il n'y en a pas, ou pas en `max_depth` clics)."""
+        if start not in self.title_to_id or target not in self.title_to_id:
+            return None
+        distance, _ = self._bidirectional_search(self.title_to_id[start], self.title_to_id[target], max_depth, False)
+        return distance
+
+    def shortest_path(self, start: str, target: str, max_depth: Optional[int] = None) -> Optional[List[str]]:
+        """Titres des pages d'un plus court chemin (départ et cible compris), ou None."""
+        if start not in self.title_to_id or target not in self.title_to_id:
+            return None
+        _, path = self._bidirectional_search(self.title_to_id[start], self.title_to_id[target], max_depth, True)
+        return [self.titles[i] for i in path] if path is not None else None
+
+
+def build_from_neo4j(driver, path: str = config.COMPRESSED_GRAPH_PATH) -> Dict:
+    """Compresse le graphe actuellement chargé dans Neo4j (le bac à sable)."""
+    with driver.session(database="neo4j") as session:
+        records = list(session.run("MATCH (p:Page) RETURN p.title AS title, p.score AS score"))
+        titles = [r["title"] for r in records]
+        scores = np.array([r["score"] or 0.0 for r in records], dtype=np.float32)
+        ids = {title: i for i, title in enumerate(titles)}
+        sources, targets = [], []
+        result = session.run("MATCH (a:Page)-[:LINKS_TO]->(b:Page) RETURN a.title AS a, b.title AS b")
+        for record in tqdm(result, desc="Lecture des liens"):
+            sources.append(ids[record["a"]])
+            targets.append(ids[record["b"]])
+    return write_compressed_graph(path, titles, scores, np.array(sources, dtype=np.int64),
+                                  np.array(targets, dtype=np.int64))
+
+
+def build_from_dumps(path: str = config.COMPRESSED_GRAPH_PATH) -> Dict:
+    """
+    Compresse le graphe complet des articles du dump (sans sélection en boule de neige).
+    Les liens passent par le tri externe (`LINK_PIPELINE` n'a pas d'effet ici) : le graphe
+    complet de frwiki se construit avec une mémoire bornée pour les liens.
+    """
+    from .data_importer import parse_links_to_disk, parse_pages
+    from .scoring import compute_page_scores_streaming
+
+    page_data = parse_pages(config.PAGE_DUMP_FULL_PATH)
+    page_ids, links = parse_links_to_disk(config.PAGELINKS_DUMP_FULL_PATH, page_data)
+    titles = [page_data[pid]["title"] for pid in page_ids.tolist()]
+    lengths = np.fromiter((page_data[pid]["length"] for pid in page_ids.tolist()), dtype=np.float64,
+                          count=len(page_ids))
+    del page_data
+    scores = compute_page_scores_streaming(links, lengths, config.SCORE_MODE)
+    meta = write_compressed_graph_external(path, titles, scores, links)
+    links.remove()
+    return meta
+
+
+class _GraphEdges:
+    """Liens d'un graphe compressé existant, lus par blocs de pages (même interface que `LinkFile`)."""
+
+    def __init__(self, graph: CompressedGraph, block_nodes: int = 1 << 16):
+        self.graph = graph
+        self.block_nodes = block_nodes
+
+    def iter_blocks(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        for first in range(0, len(self.graph), self.block_nodes):
+            nodes = np.arange(first, min(first + self.block_nodes, len(self.graph)), dtype=np.int64)
+            ids, counts = self.graph.forward.neighbors_many(nodes)
+            yield np.repeat(nodes, counts), ids
+
+
+def relayout_compressed_graph(order: np.ndarray, path: str = config.COMPRESSED_GRAPH_PATH) -> Dict:
+    """
+    Réécrit un graphe compressé avec un autre placement des identifiants (`order` : anciens
+    identifiants dans le nouvel ordre), ex. communautés contiguës. Passe par le tri externe :
+    la mémoire reste bornée même pour le graphe complet.
+    """
+    global _GRAPH
+    graph = CompressedGraph(path)
+    staging = path.rstrip(os.sep) + ".relayout"
+    if os.path.exists(staging):
+        shutil.rmtree(staging)
+    meta = write_compressed_graph_external(staging, graph.titles, graph.scores, _GraphEdges(graph),
+                                           reverse=graph.meta["reverse"], order=order)
+    del graph
+    _GRAPH = None
+    shutil.rmtree(path)
+    os.replace(staging, path)
+    return meta
@@ -12,9 +12,12 @@ DEBUG_LINE_LIMIT = 50000
 WIKI_DUMPS_PATH = "data"
 PAGE_SQL_FILE = "frwiki-latest-page.sql.gz"
 PAGELINKS_SQL_FILE = "frwiki-latest-pagelinks.sql.gz"
+# Résumés des articles (utilisés seulement pour le stock d'articles de l'interface).
+ABSTRACT_XML_FILE = "frwiki-latest-abstract.xml.gz"
 # Chemins complets
 PAGE_DUMP_FULL_PATH = os.path.join(WIKI_DUMPS_PATH, PAGE_SQL_FILE)
 PAGELINKS_DUMP_FULL_PATH = os.path.join(WIKI_DUMPS_PATH, PAGELINKS_SQL_FILE)
+ABSTRACT_DUMP_FULL_PATH = os.path.join(WIKI_DUMPS_PATH, ABSTRACT_XML_FILE)
 
 # Pour les logs d'entraînement et les modèles sauvegardés
 LOGS_PATH = "logs"
@@ -51,14 +54,206 @@ PRUNING_THRESHOLD = 10
 # --- Sous-paramètres pour le mode "FLAT" (non utilisé si mode="SNOWBALL") ---
 NUM_TOP_PAGES_TO_KEEP = 2500
 
+# Score de notoriété des pages (graines de la boule de neige et ordre des actions) :
+# "LINEAR": mélange pondéré des degrés et de la longueur. "PAGERANK": PageRank du graphe complet.
+SCORE_MODE = "LINEAR"
+
 # Poids pour le calcul du score de notoriété (inchangé)
 SCORE_WEIGHT_INDEGREE = 0.4
 SCORE_WEIGHT_OUTDEGREE = 0.5
 SCORE_WEIGHT_PAGELENGTH = 0.1
 
+# --- Sous-paramètres pour le mode "PAGERANK" ---
+PAGERANK_DAMPING = 0.85
+# Arrêt quand la variation L1 des scores entre deux itérations passe sous ce seuil.
+PAGERANK_TOLERANCE = 1e-6
+PAGERANK_MAX_ITERATIONS = 100
+# Nombre de threads du produit matrice-vecteur (None = tous les cœurs).
+PAGERANK_THREADS = None
+
+# --- Pipeline des Liens (import) ---
+# "MEMORY": tous les liens sont gardés en mémoire (dumps de taille modeste).
+# "EXTERNAL": les liens sont triés par runs sur disque puis fusionnés ; la mémoire utilisée
+# par les liens est bornée quelle que soit la taille du dump.
+LINK_PIPELINE = "MEMORY"
+LINKS_TMP_PATH = os.path.join(WIKI_DUMPS_PATH, "links_tmp")
+# Liens par run trié en mémoire (8 octets par lien : 50 M liens ~ 400 Mo).
+LINKS_RUN_SIZE = 50_000_000
+# Liens par bloc lors de la fusion et des passes en continu (par run pendant la fusion).
+LINKS_BLOCK_SIZE = 4_000_000
+
+# --- Source du Graphe pour l'Entraînement ---
+# "NEO4J": requêtes Cypher. "COMPRESSED": graphe compressé local (scripts/01d_build_compressed_graph.py),
+# lu par mappage mémoire, pour entraîner sur le graphe complet de frwiki sans serveur.
+GRAPH_BACKEND = "NEO4J"
+COMPRESSED_GRAPH_PATH = os.path.join(WIKI_DUMPS_PATH, "compressed_graph")
+
+# --- Partitionnement en Communautés (scripts/01f_partition_graph.py) ---
+# Les pages sont regroupées en communautés de liens (propagation d'étiquettes), réparties en
+# PARTITION_COUNT partitions de tailles proches et rangées de façon contiguë (graphe compressé,
+# table des nœuds).
+PARTITION_PATH = os.path.join(WIKI_DUMPS_PATH, "partition")
+PARTITION_COUNT = 8
+PARTITION_ITERATIONS = 20
+# Arrêt de la propagation quand moins de cette part des pages change de communauté.
+PARTITION_TOLERANCE = 0.001
+# Missions locales : chaque worker tire ses missions parmi celles qui partent de sa partition
+# (index du worker modulo PARTITION_COUNT), sauf une part 1 - PARTITION_LOCALITY tirée partout.
+PARTITION_MISSIONS = False
+PARTITION_LOCALITY = 0.9
+
+# --- Configuration des Observations ---
+# "VECTOR": l'environnement envoie les vecteurs MiniLM des pages actuelle, cible et précédente
+# (3 x 384 flottants par pas).
+# "INDEX": l'environnement n'envoie que les 3 identifiants de nœuds ; la politique retrouve
+# les mêmes vecteurs dans une table figée et mappée en mémoire (scripts/01b_build_node_table.py).
+OBSERVATION_MODE = "VECTOR"
+NODE_TABLE_PATH = os.path.join(WIKI_DUMPS_PATH, "node_table")
+
+# Ajoute à l'observation la position des pages (actuelle, cible, précédente) dans le graphe des
+# liens : SVD tronquée de la matrice d'adjacence normalisée, calculée hors ligne
+# (scripts/01e_build_structural_embeddings.py) et lue par mappage mémoire, sans calcul par pas.
+# En mode "INDEX", les vecteurs sont ajoutés dans la politique (l'observation reste 3 identifiants).
+STRUCTURAL_FEATURES = False
+# Composantes de la SVD ; chaque page reçoit 2 x STRUCTURAL_DIM valeurs (rôles source et cible).
+STRUCTURAL_DIM = 16
+
+# --- Enregistrement des Trajectoires ---
+# Mettre à True pour enregistrer toutes les transitions jouées par les environnements
+# d'entraînement (identifiants de pages, actions, masques, récompenses) dans TRAJECTORIES_PATH.
+# Nécessite la table des nœuds (scripts/01b_build_node_table.py).
+RECORD_TRAJECTORIES = False
+TRAJECTORIES_PATH = os.path.join(WIKI_DUMPS_PATH, "trajectories")
+# Nombre de transitions par chunk écrit sur le disque.
+TRAJECTORY_CHUNK_SIZE = 65_536
+
 # --- Configuration de l'Entraînement ---
 TOTAL_TIMESTEPS = 1_500_000
 
+# Hyperparamètres PPO des nouveaux modèles (voir scripts/08_sweep_hyperparameters.py pour les régler).
+PPO_N_STEPS = 2048
+PPO_BATCH_SIZE = 64
+PPO_GAMMA = 0.99
+PPO_LEARNING_RATE = 0.0003
+
+# Tirage des missions à chaque `reset`.
+# "UNIFORM": toutes les missions ont la même probabilité.
+# "PRIORITIZED": les missions échouées ou résolues loin de l'optimal sont tirées plus souvent
+# (statistiques partagées entre tous les workers).
+MISSION_SAMPLING = "UNIFORM"
+
+# --- Sous-paramètres pour le mode "PRIORITIZED" ---
+# Part des tirages faits uniformément, pour revoir aussi les missions déjà maîtrisées.
+PRIORITY_EXPLORATION_FLOOR = 0.1
+# Poids du dernier résultat dans les moyennes mobiles d'échec et de clics en trop.
+PRIORITY_EMA = 0.3
+# Poids des clics en trop (relatifs au plus court chemin) face aux échecs.
+PRIORITY_REGRET_WEIGHT = 0.5
+# Nombre d'épisodes entre deux recalculs de la distribution de tirage (par worker).
+PRIORITY_REFRESH_EPISODES = 32
+
+# Transport entre le learner et les workers en mode "SYNC".
+# "SUBPROC": SubprocVecEnv de SB3 (tout est sérialisé dans des pipes à chaque pas).
+# "SHARED_MEMORY": observations, récompenses et masques écrits dans des tableaux partagés.
+# "REMOTE": environnements hébergés par des serveurs (scripts/02b_env_server.py), éventuellement
+# sur d'autres machines.
+VEC_ENV_TYPE = "SUBPROC"
+
+# --- Sous-paramètres pour le mode "REMOTE" ---
+# Adresses "hôte:port" des serveurs d'environnements.
+REMOTE_ENV_ENDPOINTS = ["localhost:5555"]
+# Nombre d'environnements hébergés par défaut par chaque serveur.
+REMOTE_SERVER_NUM_ENVS = 4
+# Un battement de cœur est envoyé aux connexions inactives depuis cet intervalle (secondes).
+REMOTE_HEARTBEAT_INTERVAL = 5.0
+# Au-delà de ce silence (secondes), la connexion est considérée comme perdue.
+REMOTE_HEARTBEAT_TIMEOUT = 60.0
+# Nombre de tentatives de reconnexion avant d'abandonner un serveur.
+REMOTE_RECONNECT_ATTEMPTS = 10
+
+# "SYNC": MaskablePPO classique sur un SubprocVecEnv (collecte puis mise à jour, à tour de rôle).
+# "ASYNC": des acteurs jouent en continu avec une copie récente de la politique et envoient
+# leurs trajectoires à un learner qui applique des corrections d'importance (V-trace).
+TRAINING_MODE = "SYNC"
+
+# --- Sous-paramètres pour le mode "ASYNC" ---
+# Nombre de pas joués par un acteur avant d'envoyer un segment au learner.
+ASYNC_ROLLOUT_LENGTH = 64
+# Taille maximale de la file de segments (les acteurs attendent si le learner prend du retard).
+ASYNC_QUEUE_SIZE = 64
+# Nombre de segments consommés par mise à jour du learner.
+ASYNC_BATCH_SEGMENTS = 16
+# Seuils de troncature des ratios d'importance (rho_bar et c_bar de V-trace).
+ASYNC_RHO_CLIP = 1.0
+ASYNC_C_CLIP = 1.0
+
+
+# --- Statistiques des Épisodes ---
+# Chaque épisode terminé (tous environnements confondus) est enregistré dans logs/<nom>/episodes.
+# "JSONL": fichiers JSON Lines. "PARQUET": fichiers Parquet (nécessite pyarrow).
+STATS_FORMAT = "JSONL"
+# Nombre d'épisodes accumulés en mémoire avant chaque écriture.
+STATS_FLUSH_EPISODES = 1000
+# Nombre d'épisodes par fichier avant de passer au suivant.
+STATS_ROTATE_EPISODES = 100_000
+# Taille des fenêtres de pas de temps utilisées par l'analyse (python -m src.stats).
+STATS_WINDOW_TIMESTEPS = 50_000
+
+
+# --- Métriques en Direct (src/metrics.py) ---
+# Débit par worker, temps de collecte et de mise à jour, attente IPC et requêtes Neo4j,
+# écrits dans TensorBoard (préfixe "perf/") et exposés au format texte Prometheus.
+METRICS_ENABLED = True
+# Intervalle (en secondes) entre deux relevés des compteurs des workers.
+METRICS_INTERVAL_SECONDS = 10.0
+# Endpoint local http://METRICS_HOST:METRICS_PORT/metrics (None pour ne pas l'ouvrir).
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9464
+# Un worker sans aucun pas depuis ce délai (en secondes) est signalé comme bloqué.
+METRICS_STALL_SECONDS = 60.0
+
+# --- Profilage par Échantillonnage (src/profiler.py) ---
+# `kill -USR1 <pid du learner>` échantillonne les piles du learner et de chaque worker pendant
+# PROFILE_DURATION_SECONDS ; les fichiers .collapsed sont écrits dans logs/<nom>.
+PROFILE_SIGNAL = "SIGUSR1"
+PROFILE_INTERVAL_SECONDS = 0.02
+PROFILE_DURATION_SECONDS = 30.0
+# Fenêtre d'échantillonnage lancée automatiquement toutes les N secondes (None pour la désactiver).
+PROFILE_EVERY_SECONDS = None
+
+# --- Cache Partagé des Requêtes Neo4j (src/query_cache.py) ---
+# Voisins et distances déjà demandés par un worker sont servis aux autres par un processus
+# de cache local, démarré par l'entraînement ou la génération de missions.
+QUERY_CACHE_ENABLED = True
+# Budget mémoire du cache (les entrées les moins récemment utilisées sont évincées).
+QUERY_CACHE_MEMORY_MB = 512
+# Port 0 : choisi par le système ; l'adresse et une clé d'authentification tirée au hasard
+# sont transmises aux workers par l'environnement.
+QUERY_CACHE_ADDRESS = ("127.0.0.1", 0)
+
+
+# --- Configuration des Checkpoints ---
+# Fréquence des sauvegardes intermédiaires (en appels du callback, comme `CheckpointCallback`).
+CHECKPOINT_SAVE_FREQ = 50_000
+# Nombre de checkpoints récents conservés dans `models/checkpoints/<nom>`.
+CHECKPOINT_KEEP_LAST = 3
+# Nombre de meilleurs checkpoints (récompense moyenne des derniers épisodes) conservés en plus.
+CHECKPOINT_KEEP_BEST = 2
+
+
+# --- Configuration du Pré-entraînement par Imitation ---
+# Mettre à True pour qu'un nouvel entraînement parte du modèle pré-entraîné par
+# scripts/02a_pretrain_imitation.py (clonage des plus courts chemins) au lieu d'une politique aléatoire.
+IMITATION_WARM_START = False
+IMITATION_MODEL_PATH = os.path.join(MODELS_PATH, "imitation_warm_start.zip")
+# Démonstrations enregistrées (réutilisées tant que le fichier existe).
+DEMONSTRATIONS_FILE = os.path.join(WIKI_DUMPS_PATH, "demonstrations.npz")
+# Nombre de missions d'entraînement jouées par l'expert.
+IMITATION_NUM_MISSIONS = 5000
+IMITATION_EPOCHS = 10
+IMITATION_BATCH_SIZE = 256
+IMITATION_LEARNING_RATE = 0.001
+
 
 # --- Configuration de Reprise d'Entraînement ---
 # Mettre à True pour charger un modèle existant et continuer son entraînement.
@@ -70,6 +265,10 @@ RESUME_TRAINING = False
 # Exemple: MODEL_NAME_TO_RESUME = "nouveau_modele_1"
 MODEL_NAME_TO_RESUME = "nouveau_modele_1"
 
+# Mettre à True si la session précédente a été interrompue avant d'écrire son modèle final :
+# l'entraînement repart alors de son dernier checkpoint et garde le même nom de session.
+RESUME_FROM_CHECKPOINT = False
+
 # Chemin du modèle à charger si RESUME_TRAINING est True.
 # Peut être le modèle final ou un checkpoint spécifique.
 # Exemples:
@@ -78,7 +277,88 @@ MODEL_NAME_TO_RESUME = "nouveau_modele_1"
 MODEL_TO_RESUME_PATH = os.path.join(MODELS_PATH, "wiki_ppo_final.zip")
 
 
+# --- Configuration de l'Évaluation ---
+# Missions tirées (avec une graine fixe) dans missions.json et exclues de l'entraînement.
+EVAL_MISSIONS_FILE = "missions_eval.json"
+EVAL_NUM_MISSIONS = 1000
+EVAL_SEED = 1234
+# Nombre de parties jouées en parallèle par processus (un seul appel à `predict` par pas).
+EVAL_GAMES_PER_WORKER = 16
+
+
+# --- Balayage d'Hyperparamètres (scripts/08_sweep_hyperparameters.py) ---
+# Espace de recherche : ("log", min, max) tirage log-uniforme, ("uniform", min, max), ou liste de valeurs.
+SWEEP_SPACE = {
+    "learning_rate": ("log", 1e-5, 1e-3),
+    "gamma": [0.95, 0.98, 0.99, 0.995],
+    "n_steps": [256, 512, 1024, 2048],
+    "batch_size": [32, 64, 128, 256],
+}
+SWEEP_TRIALS = 27
+# Successive halving : après chaque palier, seul le meilleur 1/SWEEP_ETA des essais continue,
+# avec un budget cumulé SWEEP_ETA fois plus grand (25k, 75k puis 225k pas par défaut).
+SWEEP_ETA = 3
+SWEEP_MIN_TIMESTEPS = 25_000
+SWEEP_RUNGS = 3
+# Cœurs attribués à chaque essai (threads torch) : cœurs // SWEEP_CORES_PER_TRIAL essais tournent en même temps.
+SWEEP_CORES_PER_TRIAL = 2
+# Environnements par essai (dans le processus de l'essai) et parties d'évaluation jouées en parallèle.
+SWEEP_ENVS_PER_TRIAL = 4
+# Missions de validation tirées (graine SWEEP_SEED) parmi les missions d'entraînement pour classer
+# les essais ; le jeu d'évaluation (EVAL_MISSIONS_FILE) n'intervient pas dans la sélection.
+SWEEP_EVAL_MISSIONS = 200
+SWEEP_SEED = 0
+SWEEP_PATH = os.path.join(LOGS_PATH, "sweeps")
+
+
+# --- Configuration du Service de Chemins (scripts/06_pathfinding_server.py) ---
+PATHFINDING_HOST = "localhost"
+PATHFINDING_PORT = 8080
+# Nombre maximal de clics par partie.
+PATHFINDING_MAX_STEPS = 25
+# Nombre maximal de parties avancées ensemble (un seul appel au modèle par pas).
+PATHFINDING_MAX_BATCH = 256
+# Nombre de vecteurs MiniLM gardés en mémoire entre les requêtes (mode "VECTOR").
+PATHFINDING_EMBEDDING_CACHE_SIZE = 200_000
+# Délai maximal de résolution d'un lot (mode "greedy") avant une réponse 504.
+PATHFINDING_TIMEOUT_SECONDS = 300
+
+
+# --- Configuration de la Recherche Guidée (src/search.py) ---
+# Nombre maximal de pages développées par recherche.
+SEARCH_EXPANSION_BUDGET = 200
+# Poids de la borne inférieure de distance dans la priorité (0 = politique seule).
+SEARCH_BOUND_WEIGHT = 0.0
+# Profondeur du parcours inverse depuis la cible qui fournit cette borne.
+SEARCH_BOUND_DEPTH = 2
+# Pages au plus dans ce parcours (un niveau qui dépasserait est abandonné : la borne reste valide),
+# et nombre de cibles dont le parcours est gardé en mémoire.
+SEARCH_BOUND_MAX_PAGES = 50_000
+SEARCH_BOUND_CACHE_SIZE = 256
+# Nombre de pages développées ensemble (une requête Neo4j et un appel au modèle par lot).
+SEARCH_BATCH_EXPANSIONS = 8
+
+
+# --- Préchargement pendant le jeu (src/prefetch.py) ---
+# Nombre de pages candidates (les plus probables selon la politique) préchargées à chaque clic.
+PREFETCH_TOP_K = 5
+PREFETCH_WORKERS = 4
+# Nombre de résultats (voisins, vecteurs, distances) gardés en cache.
+PREFETCH_CACHE_SIZE = 4096
+
+
+# --- Articles affichés par l'interface (src/ui.py) ---
+# "LOCAL": stock construit par scripts/01c_build_article_store.py (hors-ligne, aucun appel réseau).
+# "WIKIPEDIA": pages demandées en direct à Wikipédia.
+# "HTTP": serveur d'articles (`src.api.serve_articles`), par exemple pour les tests.
+ARTICLE_SOURCE = "LOCAL"
+ARTICLE_STORE_PATH = os.path.join(WIKI_DUMPS_PATH, "articles")
+ARTICLE_SERVICE_URL = "http://localhost:8081"
+
+
 # --- Configuration du Jeu ---
+# Politiques exportées (TorchScript / ONNX) par scripts/05_export_policy.py.
+EXPORTED_MODELS_PATH = os.path.join(MODELS_PATH, "exported")
 DEFAULT_MODEL_NAME = "wiki_maskable_ppo.zip"
 DEFAULT_START_PAGE = "Intelligence artificielle"
 DEFAULT_TARGET_PAGE = "Apprentissage par renforcement"
\ No newline at end of file
@@ -1,12 +1,19 @@
 # src/data_importer.py (Version finale, combinant Snowball et la correction du parsing des liens)
 
 import gzip
+import os
 import re
 from collections import defaultdict
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
 from tqdm import tqdm
 from neo4j import GraphDatabase, Driver
 
 from . import config
+from .external_links import ExternalLinkSorter, LinkFile, clear_runs, link_keys, split_keys
+from .graph import bump_graph_version
+from .scoring import compute_page_scores, compute_page_scores_streaming
 
 # Regex V2.1 : Plus robuste pour éviter le "gel" du parsing.
 # Il capture (page_id, namespace, title, page_latest, page_len)
@@ -55,13 +62,8 @@ def parse_pages(filepath: str) -> dict[int, dict]:
 # # CHANGEMENT 2 : LA LOGIQUE DE PARSING DES LIENS EST SIMPLIFIÉE
 # ####################################################################
 # Elle travaille maintenant directement avec les IDs, ce qui est correct pour vos données.
-def parse_links_and_count_degrees(filepath: str, page_data: dict) -> tuple:
-    """Parse le dump des liens (format ID->ID) et compte les degrés."""
-    in_degrees = defaultdict(int)
-    out_degrees = defaultdict(int)
-    links = []
-    print(f"--- Parsing du fichier de liens (format ID -> ID) ---")
-
+def iter_links(filepath: str, page_data: dict) -> Iterator[tuple[int, int]]:
+    """Parcourt le dump des liens (format ID->ID) et renvoie les liens (source, cible) entre articles connus."""
     with gzip.open(filepath, 'rt', encoding='utf-8') as f:
         from itertools import islice
         line_iterator = f if not config.DEBUG_MODE else islice(f, config.DEBUG_LINE_LIMIT)
@@ -76,15 +78,55 @@ def parse_links_and_count_degrees(filepath: str, page_data: dict) -> tuple:
 
                     # Le lien est valide si les deux pages (source et destination) existent dans notre dictionnaire de pages.
                     if dest_namespace == 0 and source_id in page_data and dest_id in page_data:
-                        links.append((source_id, dest_id))
-                        in_degrees[dest_id] += 1
-                        out_degrees[source_id] += 1
+                        yield source_id, dest_id
                 except (ValueError, IndexError):
                     continue
+
+
+def parse_links_and_count_degrees(filepath: str, page_data: dict) -> tuple:
+    """Parse le dump des liens (format ID->ID) et compte les degrés."""
+    in_degrees = defaultdict(int)
+    out_degrees = defaultdict(int)
+    links = []
+    print(f"--- Parsing du fichier de liens (format ID -> ID) ---")
+    for source_id, dest_id in iter_links(filepath, page_data):
+        links.append((source_id, dest_id))
+        in_degrees[dest_id] += 1
+        out_degrees[source_id] += 1
     print(f"--- Parsing des liens terminé. {len(links)} liens valides trouvés. ---")
     return links, in_degrees, out_degrees
 
 
+def parse_links_to_disk(filepath: str, page_data: dict,
+                        output_path: str = os.path.join(config.LINKS_TMP_PATH, "links.bin")) -> tuple:
+    """
+    Variante hors mémoire de `parse_links_and_count_degrees` : les liens sont triés par runs
+    sur disque puis fusionnés (sans doublon) dans `output_path`, renumérotés en indices dans
+    `page_ids` (IDs triés). Renvoie (page_ids, LinkFile) ; les degrés se calculent ensuite
+    en une passe sur le fichier.
+    """
+    page_ids = np.fromiter(page_data.keys(), dtype=np.int64, count=len(page_data))
+    page_ids.sort()
+    index_of = np.full(int(page_ids[-1]) + 1 if len(page_ids) else 1, -1, dtype=np.int64)
+    index_of[page_ids] = np.arange(len(page_ids))
+
+    print(f"--- Parsing du fichier de liens vers des runs triés ({config.LINKS_TMP_PATH}) ---")
+    clear_runs()
+    sorter = ExternalLinkSorter()
+    for source_id, dest_id in iter_links(filepath, page_data):
+        sorter.add(source_id, dest_id)
+
+    def to_indices(keys):
+        # Renumérotation croissante : l'ordre des clés triées est préservé.
+        sources, targets = split_keys(keys)
+        return link_keys(index_of[sources], index_of[targets])
+
+    links = sorter.finish(output_path, transform=to_indices)
+    print(f"--- Parsing des liens terminé. {len(links)} liens valides distincts "
+          f"({sorter.added} lus). ---")
+    return page_ids, links
+
+
 # ####################################################################
 # # CHANGEMENT 3 : PETITE CORRECTION DANS load_into_neo4j
 # ####################################################################
@@ -106,6 +148,34 @@ def load_into_neo4j(driver: Driver, nodes_to_create: list[dict], all_links: list
            page_data[dest_id]['title'] in final_titles_to_keep
     ]
 
+    _write_graph(driver, nodes_to_create,
+                 (relevant_links[i:i + 50000] for i in range(0, len(relevant_links), 50000)),
+                 len(relevant_links))
+
+
+def load_into_neo4j_streaming(driver: Driver, nodes_to_create: list[dict], links: LinkFile,
+                              keep: np.ndarray, titles: list[str]):
+    """Variante de `load_into_neo4j` qui lit les liens triés sur disque, en une passe."""
+    print("--- Début de l'injection des données dans Neo4j ---")
+
+    def link_batches():
+        batch = []
+        for sources, targets in links.iter_blocks():
+            kept = keep[sources] & keep[targets]
+            for source, target in zip(sources[kept].tolist(), targets[kept].tolist()):
+                batch.append({"source": titles[source], "target": titles[target]})
+                if len(batch) == 50000:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    _write_graph(driver, nodes_to_create, link_batches(), None)
+
+
+def _write_graph(driver: Driver, nodes_to_create: list[dict], link_batches: Iterable[list[dict]],
+                 n_links: Optional[int]):
+    """Remplace le contenu de la base par les nœuds et les lots de liens donnés."""
     with driver.session(database="neo4j") as session:
         print("1. Nettoyage complet de la base de données...")
         session.run("DROP CONSTRAINT page_title_constraint IF EXISTS")
@@ -126,18 +196,22 @@ def load_into_neo4j(driver: Driver, nodes_to_create: list[dict], all_links: list
             batch = nodes_to_create[i:i + 50000]
             session.run(query_nodes, nodes=batch)
 
-        print(f"4. Création des {len(relevant_links)} relations :LINKS_TO...")
+        print(f"4. Création des {n_links} relations :LINKS_TO..." if n_links is not None
+              else "4. Création des relations :LINKS_TO (lecture en continu)...")
         query_links = """
         UNWIND $links AS link
         MATCH (a:Page {title: link.source})
         MATCH (b:Page {title: link.target})
         CREATE (a)-[:LINKS_TO]->(b)
         """
-        for i in tqdm(range(0, len(relevant_links), 50000), desc="Injection des Liens"):
-            batch = relevant_links[i:i + 50000]
+        created = 0
+        for batch in tqdm(link_batches, desc="Injection des Liens"):
             session.run(query_links, links=batch)
+            created += len(batch)
 
-    print("--- Injection Neo4j terminée. ---")
+    # Les caches de requêtes construits sur l'ancien graphe deviennent invalides.
+    version = bump_graph_version(driver)
+    print(f"--- Injection Neo4j terminée ({created} liens, version du graphe : {version}). ---")
 
 
 # Le reste du fichier (select_pages_snowball, run_import) est correct et n'a pas besoin de changer.
@@ -185,6 +259,73 @@ def select_pages_snowball(page_scores: dict, all_links: list, page_data: dict) -
     return pruned_ids
 
 
+def select_pages_snowball_streaming(scores: np.ndarray, links: LinkFile) -> np.ndarray:
+    """
+    Variante de `select_pages_snowball` pour les liens triés sur disque : chaque niveau
+    d'expansion et l'élagage sont une passe sur le fichier. Les liens d'une même source
+    arrivent dans un seul bloc, où l'on garde ses `SNOWBALL_NEIGHBOR_LIMIT` meilleurs voisins.
+    Renvoie le masque des pages gardées (indices de `scores`).
+    """
+    n_pages = len(scores)
+    seeds = np.argsort(-scores, kind="stable")[:config.SNOWBALL_SEED_COUNT]
+    keep = np.zeros(n_pages, dtype=bool)
+    keep[seeds] = True
+    frontier = keep.copy()
+    print(
+        f"Expansion en boule de neige (profondeur: {config.SNOWBALL_DEPTH}, limite: {config.SNOWBALL_NEIGHBOR_LIMIT} voisins/page)...")
+    for i in range(config.SNOWBALL_DEPTH):
+        next_frontier = np.zeros(n_pages, dtype=bool)
+        for sources, targets in tqdm(links.iter_blocks(align_sources=True),
+                                     desc=f"Expansion niveau {i + 1}/{config.SNOWBALL_DEPTH}"):
+            selected = frontier[sources]
+            sources, targets = sources[selected], targets[selected]
+            if not len(sources):
+                continue
+            # Voisins de chaque source par score décroissant, puis rang dans le groupe de la source.
+            order = np.lexsort((-scores[targets], sources))
+            sources, targets = sources[order], targets[order]
+            group_start = np.flatnonzero(np.r_[True, sources[1:] != sources[:-1]])
+            group_sizes = np.diff(np.r_[group_start, len(sources)])
+            rank = np.arange(len(sources)) - np.repeat(group_start, group_sizes)
+            next_frontier[targets[rank < config.SNOWBALL_NEIGHBOR_LIMIT]] = True
+        next_frontier &= ~keep
+        keep |= next_frontier
+        frontier = next_frontier
+    print(f"Taille du graphe après expansion : {int(keep.sum())} pages.")
+    print(f"Élagage du graphe (seuil de connectivité : {config.PRUNING_THRESHOLD})...")
+    subgraph_degrees = np.zeros(n_pages, dtype=np.int64)
+    for sources, targets in tqdm(links.iter_blocks(), desc="Calcul des degrés du sous-graphe"):
+        kept = keep[sources] & keep[targets]
+        subgraph_degrees += np.bincount(sources[kept], minlength=n_pages)
+        subgraph_degrees += np.bincount(targets[kept], minlength=n_pages)
+    pruned = keep & (subgraph_degrees >= config.PRUNING_THRESHOLD)
+    print(f"Taille du graphe après élagage : {int(pruned.sum())} pages.")
+    return pruned
+
+
+def _run_import_external(driver: Driver, page_data: dict):
+    """Import avec `LINK_PIPELINE = "EXTERNAL"` : les liens ne sont jamais chargés en mémoire."""
+    page_ids, links = parse_links_to_disk(config.PAGELINKS_DUMP_FULL_PATH, page_data)
+    titles = [page_data[pid]['title'] for pid in page_ids.tolist()]
+    lengths = np.fromiter((page_data[pid]['length'] for pid in page_ids.tolist()), dtype=np.float64,
+                          count=len(page_ids))
+    print(f"Calcul des scores de notoriété (mode {config.SCORE_MODE}, liens sur disque)...")
+    scores = compute_page_scores_streaming(links, lengths, config.SCORE_MODE)
+    if config.TOP_PAGES_SELECTION_MODE == "SNOWBALL":
+        print("--- Stratégie de sélection : SNOWBALL ---")
+        keep = select_pages_snowball_streaming(scores, links)
+    elif config.TOP_PAGES_SELECTION_MODE == "FLAT":
+        print("--- Stratégie de sélection : FLAT ---")
+        keep = np.zeros(len(scores), dtype=bool)
+        keep[np.argsort(-scores, kind="stable")[:config.NUM_TOP_PAGES_TO_KEEP]] = True
+    else:
+        raise ValueError(f"Stratégie de sélection inconnue: {config.TOP_PAGES_SELECTION_MODE}")
+    nodes_to_create = [{"title": titles[i], "score": float(scores[i])} for i in np.flatnonzero(keep).tolist()]
+    print(f"Nombre final de pages à importer dans le graphe : {len(nodes_to_create)}")
+    load_into_neo4j_streaming(driver, nodes_to_create, links, keep, titles)
+    links.remove()
+
+
 def run_import():
     """Fonction principale orchestrant tout le processus d'importation."""
     # ... (inchangé)
@@ -197,21 +338,16 @@ def run_import():
         driver.verify_connectivity()
         print("Connexion à Neo4j établie.")
         page_data = parse_pages(config.PAGE_DUMP_FULL_PATH)
-        all_links, in_degrees, out_degrees = parse_links_and_count_degrees(config.PAGELINKS_DUMP_FULL_PATH, page_data)
         if not page_data:
             print("Aucune page trouvée.")
             return
-        max_in = max(in_degrees.values()) if in_degrees else 1
-        max_out = max(out_degrees.values()) if out_degrees else 1
-        max_len = max(p['length'] for p in page_data.values() if p['length'] > 0) or 1
-        page_scores = {}
-        for pid, data in tqdm(page_data.items(), desc="Calcul des scores de notoriété"):
-            score = (
-                    (in_degrees.get(pid, 0) / max_in) * config.SCORE_WEIGHT_INDEGREE +
-                    (out_degrees.get(pid, 0) / max_out) * config.SCORE_WEIGHT_OUTDEGREE +
-                    (data['length'] / max_len) * config.SCORE_WEIGHT_PAGELENGTH
-            )
-            page_scores[pid] = score
+        if config.LINK_PIPELINE == "EXTERNAL":
+            _run_import_external(driver, page_data)
+            print("\n✅ Importation 'Snowball & Pruning' terminée avec succès !")
+            return
+        all_links, in_degrees, out_degrees = parse_links_and_count_degrees(config.PAGELINKS_DUMP_FULL_PATH, page_data)
+        print(f"Calcul des scores de notoriété (mode {config.SCORE_MODE})...")
+        page_scores = compute_page_scores(page_data, all_links, config.SCORE_MODE)
         final_pages_ids_to_import = set()
         if config.TOP_PAGES_SELECTION_MODE == "SNOWBALL":
             print("--- Stratégie de sélection : SNOWBALL ---")
@@ -228,4 +364,50 @@ def run_import():
         } for pid in final_pages_ids_to_import]
         print(f"Nombre final de pages à importer dans le graphe : {len(nodes_to_create)}")
         load_into_neo4j(driver, nodes_to_create, all_links, page_data)
-    print("\n✅ Importation 'Snowball & Pruning' terminée avec succès !")
\ No newline at end of file
+    print("\n✅ Importation 'Snowball & Pruning' terminée avec succès !")
+
+# ####################################################################
+# # STOCK D'ARTICLES POUR L'INTERFACE (résumés + liens des pages du graphe)
+# ####################################################################
+ABSTRACT_TITLE_PREFIX = re.compile(r"^Wikip[ée]dia\s*:\s*")
+
+
+def parse_abstracts(filepath: str, titles: set) -> dict[str, str]:
+    """Lit le dump des résumés (XML) en flux et garde ceux des pages demandées."""
+    import xml.etree.ElementTree as ET
+
+    summaries = {}
+    print(f"--- Parsing du fichier de résumés : {filepath} ---")
+    with gzip.open(filepath, 'rb') as f:
+        for _, elem in tqdm(ET.iterparse(f, events=("end",)), desc="Parsing Résumés"):
+            if elem.tag != "doc":
+                continue
+            # Les titres du dump des résumés utilisent des espaces, ceux du graphe des "_".
+            title = ABSTRACT_TITLE_PREFIX.sub("", elem.findtext("title") or "").replace(" ", "_")
+            if title in titles:
+                summaries[title] = (elem.findtext("abstract") or "").strip()
+            elem.clear()
+    print(f"--- {len(summaries)} résumés trouvés sur {len(titles)} pages. ---")
+    return summaries
+
+
+def build_article_store(driver: Driver, path: str = config.ARTICLE_STORE_PATH) -> int:
+    """Construit le stock local d'articles de l'interface à partir du graphe et du dump des résumés."""
+    from .article_store import write_article_store
+
+    with driver.session(database="neo4j") as session:
+        result = session.run(
+            "MATCH (p:Page) OPTIONAL MATCH (p)-[:LINKS_TO]->(next:Page) "
+            "RETURN p.title AS title, collect(next.title) AS links"
+        )
+        links = {record["title"]: sorted(record["links"]) for record in result}
+    print(f"{len(links)} pages dans le graphe.")
+
+    summaries = {}
+    if os.path.exists(config.ABSTRACT_DUMP_FULL_PATH):
+        summaries = parse_abstracts(config.ABSTRACT_DUMP_FULL_PATH, set(links))
+    else:
+        print(f"ATTENTION: '{config.ABSTRACT_DUMP_FULL_PATH}' introuvable, les articles n'auront pas de résumé.")
+
+    return write_article_store(
+        ((title, summaries.get(title, ""), page_links) for title, page_links in links.items()), path)
@@ -3,15 +3,85 @@ import gymnasium as gym
 import numpy as np
 from neo4j import GraphDatabase, Driver
 from sentence_transformers import SentenceTransformer
+import os
 import random
 import json
+import time
 from typing import Optional, Tuple, Dict, List
 
 from . import config
+from .compressed_graph import CompressedGraph, get_compressed_graph
+from .node_table import NodeTable
+from .partition import local_mission_indices
+from .mission_sampler import MissionSampler
+from .prefetch import Prefetcher
+from .query_cache import connect_query_cache
+from .shared_arrays import SharedArray
+from .structure import StructuralFeatures
 
 MODEL_NAME = 'all-MiniLM-L6-v2'
 VECTOR_SIZE = 384
 
+_ENCODER: Optional[SentenceTransformer] = None
+
+
+def get_encoder() -> SentenceTransformer:
+    """Charge MiniLM une seule fois par processus (partagé par tous les WikiEnv du processus)."""
+    global _ENCODER
+    if _ENCODER is None:
+        _ENCODER = SentenceTransformer(MODEL_NAME)
+    return _ENCODER
+
+
+def load_held_out_missions() -> List[Dict]:
+    """Missions réservées à l'évaluation (tirées par 00_generate_missions.py, ou au début de l'entraînement)."""
+    if not os.path.exists(config.EVAL_MISSIONS_FILE):
+        return []
+    with open(config.EVAL_MISSIONS_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_training_missions() -> List[Dict]:
+    """Missions d'entraînement : missions.json sans les missions réservées à l'évaluation (ordre conservé)."""
+    with open("missions.json", "r", encoding="utf-8") as f:
+        missions = json.load(f)
+    # Les missions d'évaluation ne sont jamais tirées pendant l'entraînement.
+    held_out = {(m["start"], m["target"]) for m in load_held_out_missions()}
+    if held_out:
+        missions = [m for m in missions if (m["start"], m["target"]) not in held_out]
+    return missions
+
+
+def order_actions(neighbors: Dict[str, float], target_title: Optional[str], visited: set,
+                  max_actions: int) -> List[str]:
+    """
+    Ordonne les actions possibles : la cible en premier si elle est voisine, puis les autres
+    voisins non visités par score décroissant. Partagé par WikiEnv et les agents de jeu pour
+    que l'action n°i désigne toujours la même page.
+    """
+    # --- NOUVELLE LOGIQUE ANTI-CYCLE ---
+    # On ne considère que les voisins qui ne sont PAS dans le chemin déjà parcouru.
+    # On utilise un `set` (visited) pour que cette vérification soit instantanée.
+    unvisited_neighbors = {
+        title: score for title, score in neighbors.items()
+        if title not in visited
+    }
+
+    target_is_neighbor = target_title in unvisited_neighbors
+
+    sorted_neighbors = sorted(
+        [n for n in unvisited_neighbors if n != target_title],
+        key=lambda n: unvisited_neighbors.get(n, 0),
+        reverse=True
+    )
+
+    final_actions = []
+    if target_is_neighbor:
+        final_actions.append(target_title)
+
+    final_actions.extend(sorted_neighbors)
+    return final_actions[:max_actions]
+
 
 class WikiEnv(gym.Env):
     """
@@ -20,24 +90,69 @@ class WikiEnv(gym.Env):
     """
     metadata = {"render_modes": ["human"]}
 
-    def __init__(self):
+    def __init__(self, observation_mode: Optional[str] = None, prefetch: bool = False,
+                 mission_stats: Optional[SharedArray] = None, structural_features: Optional[bool] = None,
+                 worker_index: int = 0):
         super().__init__()
         print("Initialisation de l'environnement WikiEnv (Anti-Cycle)...")
-        self.driver: Driver = self._connect_to_neo4j()
-        self.model = SentenceTransformer(MODEL_NAME)
-        with open("missions.json", "r", encoding="utf-8") as f:
-            self.missions = json.load(f)
+        self.observation_mode = observation_mode or config.OBSERVATION_MODE
+        self.structural_features = (config.STRUCTURAL_FEATURES if structural_features is None
+                                    else structural_features)
+        # Graphe compressé local (graphe complet, sans serveur) ou base Neo4j.
+        self.graph: Optional[CompressedGraph] = None
+        self.driver: Optional[Driver] = None
+        self.query_cache = None
+        if config.GRAPH_BACKEND == "COMPRESSED":
+            self.graph = get_compressed_graph()
+        else:
+            self.driver = self._connect_to_neo4j()
+            # Cache partagé des voisins et distances, s'il a été démarré par le processus principal.
+            self.query_cache = connect_query_cache(self.driver)
+        self.missions = load_training_missions()
         print(f"{len(self.missions)} missions chargées.")
 
+        # Missions locales : ce worker tire surtout des missions qui partent de sa partition du
+        # graphe, ce qui concentre ses lectures (pages, cache) sur une zone contiguë.
+        self.local_missions: Optional[np.ndarray] = None
+        if config.PARTITION_MISSIONS:
+            self.local_missions = local_mission_indices(self.missions, worker_index)
+
+        # Tirage prioritaire : les statistiques sont partagées si le processus principal les fournit.
+        self.mission_sampler: Optional[MissionSampler] = None
+        if config.MISSION_SAMPLING == "PRIORITIZED":
+            self.mission_sampler = MissionSampler(len(self.missions), mission_stats,
+                                                  local_missions=self.local_missions)
+        self.mission_index: Optional[int] = None
+
         self.max_actions = 100
         self.action_space = gym.spaces.Discrete(self.max_actions)
 
         # L'observation reste simple, la complexité est dans la logique d'action
-        self.observation_space = gym.spaces.Box(
-            low=-np.inf, high=np.inf,
-            shape=(3 * VECTOR_SIZE,),
-            dtype=np.float32
-        )
+        self.structure: Optional[StructuralFeatures] = None
+        if self.observation_mode == "VECTOR":
+            self.model = get_encoder()
+            # Embeddings structurels (optionnels) : 3 lignes lues dans un fichier mappé, ajoutées
+            # après les vecteurs MiniLM. En mode "INDEX", c'est la politique qui les ajoute.
+            structure_size = 0
+            if self.structural_features:
+                self.structure = StructuralFeatures(config.NODE_TABLE_PATH)
+                structure_size = self.structure.size
+            self.observation_space = gym.spaces.Box(
+                low=-np.inf, high=np.inf,
+                shape=(3 * (VECTOR_SIZE + structure_size),),
+                dtype=np.float32
+            )
+        elif self.observation_mode == "INDEX":
+            # Seuls les identifiants voyagent entre processus ; la politique fait la correspondance
+            # avec les vecteurs (voir src/features.py).
+            self.node_table = NodeTable(config.NODE_TABLE_PATH)
+            self.observation_space = gym.spaces.Box(
+                low=0, high=len(self.node_table) - 1,
+                shape=(3,),
+                dtype=np.int32
+            )
+        else:
+            raise ValueError(f"Mode d'observation inconnu: {self.observation_mode}")
 
         self.max_steps = 25
         # ... (initialisation des variables d'état)
@@ -48,10 +163,23 @@ class WikiEnv(gym.Env):
         self.previous_page_title: Optional[str] = None
         self.current_step = 0
         self.current_distance_to_target = -1
+        self.initial_distance = -1
         self.path: List[str] = []
         self.path_set: set[str] = set()  # Pour une vérification rapide des cycles
         self.available_actions: List[str] = []
 
+        # Compteurs lus par les métriques en direct (voir src/metrics.py).
+        self.neo4j_queries = 0
+        self.neo4j_query_time = 0.0
+
+        # En jeu, les requêtes des prochains clics possibles peuvent être lancées à l'avance (voir `prefetch`).
+        self.prefetcher: Optional[Prefetcher] = None
+        if prefetch:
+            fetchers = {"neighbors": self._query_neighbors, "distance": self._query_shortest_path_distance}
+            if self.observation_mode == "VECTOR":
+                fetchers["embedding"] = lambda title: self.model.encode(title, convert_to_numpy=True)
+            self.prefetcher = Prefetcher(fetchers)
+
     def _connect_to_neo4j(self) -> Driver:
         # ... (inchangé)
         auth = None
@@ -65,24 +193,55 @@ class WikiEnv(gym.Env):
         # ... (inchangé)
         if title is None:
             return np.zeros(VECTOR_SIZE, dtype=np.float32)
+        if self.prefetcher is not None:
+            return self.prefetcher.get("embedding", title)
         return self.model.encode(title, convert_to_numpy=True)
 
     def _get_shortest_path_distance(self, start_node: str, end_node: str) -> int:
-        # ... (inchangé)
-        with self.driver.session(database="neo4j") as session:
-            result = session.run(
-                "MATCH (start:Page {title: $s}), (end:Page {title: $e}) "
-                "MATCH p = shortestPath((start)-[:LINKS_TO*]->(end)) "
-                "RETURN length(p) AS d", s=start_node, e=end_node
-            )
-            record = result.single()
-            return record["d"] if record else self.max_steps * 2
+        if self.prefetcher is not None:
+            return self.prefetcher.get("distance", start_node, end_node)
+        return self._query_shortest_path_distance(start_node, end_node)
+
+    def _count_query(self, started: float) -> None:
+        self.neo4j_queries += 1
+        self.neo4j_query_time += time.perf_counter() - started
+
+    def _query_shortest_path_distance(self, start_node: str, end_node: str) -> int:
+        if self.query_cache is not None:
+            distance = self.query_cache.get_or_fetch("distance", (start_node, end_node), self._fetch_distance)
+        else:
+            distance = self._fetch_distance(start_node, end_node)
+        return distance if distance is not None else self.max_steps * 2
+
+    def _fetch_distance(self, start_node: str, end_node: str) -> Optional[int]:
+        if self.graph is not None:
+            return self.graph.shortest_path_distance(start_node, end_node)
+        started = time.perf_counter()
+        try:
+            with self.driver.session(database="neo4j") as session:
+                result = session.run(
+                    "MATCH (start:Page {title: $s}), (end:Page {title: $e}) "
+                    "MATCH p = shortestPath((start)-[:LINKS_TO*]->(end)) "
+                    "RETURN length(p) AS d", s=start_node, e=end_node
+                )
+                record = result.single()
+                return record["d"] if record else None
+        finally:
+            self._count_query(started)
 
     def _get_observation(self) -> np.ndarray:
-        # ... (inchangé)
+        if self.observation_mode == "INDEX":
+            return np.array([
+                self.node_table.id_of(self.current_page_title),
+                self.node_table.id_of(self.target_page_title),
+                self.node_table.id_of(self.previous_page_title),
+            ], dtype=np.int32)
         current_vector = self._get_page_vector(self.current_page_title)
         previous_vector = self._get_page_vector(self.previous_page_title)
         obs = np.concatenate([current_vector, self.target_vector, previous_vector]).astype(np.float32)
+        if self.structure is not None:
+            structure = self.structure.of([self.current_page_title, self.target_page_title, self.previous_page_title])
+            obs = np.concatenate([obs, structure])
         return obs
 
     def _get_available_actions(self) -> List[str]:
@@ -90,44 +249,72 @@ class WikiEnv(gym.Env):
         Récupère les liens sortants, en garantissant la présence de la cible
         ET en filtrant les pages déjà visitées.
         """
-        with self.driver.session(database="neo4j") as session:
-            result = session.run(
-                "MATCH (p:Page {title: $title})-[:LINKS_TO]->(next:Page) "
-                "RETURN next.title AS nextPage, next.score AS score",
-                title=self.current_page_title
-            )
-            neighbors = {record["nextPage"]: record["score"] for record in result}
-
-        # --- NOUVELLE LOGIQUE ANTI-CYCLE ---
-        # On ne considère que les voisins qui ne sont PAS dans le chemin déjà parcouru.
-        # On utilise un `set` (self.path_set) pour que cette vérification soit instantanée.
-        unvisited_neighbors = {
-            title: score for title, score in neighbors.items()
-            if title not in self.path_set
-        }
-
-        target_is_neighbor = self.target_page_title in unvisited_neighbors
-
-        sorted_neighbors = sorted(
-            [n for n in unvisited_neighbors if n != self.target_page_title],
-            key=lambda n: unvisited_neighbors.get(n, 0),
-            reverse=True
-        )
+        if self.prefetcher is not None:
+            neighbors = self.prefetcher.get("neighbors", self.current_page_title)
+        else:
+            neighbors = self._query_neighbors(self.current_page_title)
+        if (self.graph is not None and self.current_distance_to_target == 1
+                and self.target_page_title not in neighbors):
+            # Liste tronquée par score (voir `_fetch_neighbors`) : une cible voisine peut être au-delà.
+            target_id = self.graph.title_to_id[self.target_page_title]
+            neighbors = {**neighbors, self.target_page_title: float(self.graph.scores[target_id])}
+        return order_actions(neighbors, self.target_page_title, self.path_set, self.max_actions)
+
+    def _query_neighbors(self, title: str) -> Dict[str, float]:
+        if self.query_cache is not None:
+            return self.query_cache.get_or_fetch("neighbors", (title,), self._fetch_neighbors)
+        return self._fetch_neighbors(title)
 
-        final_actions = []
-        if target_is_neighbor:
-            final_actions.append(self.target_page_title)
+    def _fetch_neighbors(self, title: str) -> Dict[str, float]:
+        if self.graph is not None:
+            # Seul le début de la liste (par score décroissant) est décodé : assez pour garder
+            # `max_actions` voisins après le filtrage des pages déjà visitées.
+            return self.graph.neighbors(title, limit=self.max_actions + len(self.path_set) + 1)
+        started = time.perf_counter()
+        try:
+            with self.driver.session(database="neo4j") as session:
+                result = session.run(
+                    "MATCH (p:Page {title: $title})-[:LINKS_TO]->(next:Page) "
+                    "RETURN next.title AS nextPage, next.score AS score",
+                    title=title
+                )
+                return {record["nextPage"]: record["score"] for record in result}
+        finally:
+            self._count_query(started)
 
-        final_actions.extend(sorted_neighbors)
-        return final_actions[:self.max_actions]
+    def prefetch(self, titles: List[str]) -> None:
+        """
+        Lance en arrière-plan les requêtes dont `step` aura besoin si l'une de ces pages est
+        choisie (voisins, distance à la cible, vecteur). Sans effet si `prefetch=False`.
+        """
+        if self.prefetcher is None:
+            return
+        for title in titles:
+            self.prefetcher.prefetch("neighbors", title)
+            self.prefetcher.prefetch("distance", title, self.target_page_title)
+            if self.observation_mode == "VECTOR":
+                self.prefetcher.prefetch("embedding", title)
 
     def reset(self, seed: Optional[int] = None, options: Optional[Dict] = None) -> Tuple[np.ndarray, Dict]:
         super().reset(seed=seed)
-        mission = random.choice(self.missions)
+        # Une mission précise peut être imposée (évaluation, démonstrations).
+        if options and "mission" in options:
+            mission = options["mission"]
+            self.mission_index = None
+        else:
+            local = self.local_missions is not None and self.np_random.random() < config.PARTITION_LOCALITY
+            if self.mission_sampler is not None:
+                self.mission_index = self.mission_sampler.sample(self.np_random, local)
+            elif local:
+                self.mission_index = int(self.local_missions[self.np_random.integers(len(self.local_missions))])
+            else:
+                self.mission_index = random.randrange(len(self.missions))
+            mission = self.missions[self.mission_index]
         self.start_page_title = mission["start"]
         self.target_page_title = mission["target"]
 
-        self.target_vector = self._get_page_vector(self.target_page_title)
+        if self.observation_mode == "VECTOR":
+            self.target_vector = self._get_page_vector(self.target_page_title)
         self.current_page_title = self.start_page_title
         self.previous_page_title = None
         self.current_step = 0
@@ -139,12 +326,14 @@ class WikiEnv(gym.Env):
         self.current_distance_to_target = self._get_shortest_path_distance(
             self.current_page_title, self.target_page_title
         )
+        self.initial_distance = self.current_distance_to_target
         self.available_actions = self._get_available_actions()
         return self._get_observation(), {"action_mask": self.action_mask()}
 
     def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, Dict]:
         if action >= len(self.available_actions):
             reward = -10.0
+            self._record_outcome(success=False)
             return self._get_observation(), reward, False, True, {"action_mask": self.action_mask()}
 
         # --- Transition d'état ---
@@ -174,11 +363,19 @@ class WikiEnv(gym.Env):
 
         self.current_distance_to_target = new_distance
 
+        if terminated or truncated:
+            self._record_outcome(success=terminated)
+
         # On met à jour la liste d'actions possibles (qui seront maintenant filtrées)
         self.available_actions = self._get_available_actions()
-        info = {"path": self.path, "action_mask": self.action_mask()}
+        info = {"path": self.path, "start": self.start_page_title, "target": self.target_page_title,
+                "distance": self.initial_distance, "action_mask": self.action_mask()}
         return self._get_observation(), reward, terminated, truncated, info
 
+    def _record_outcome(self, success: bool) -> None:
+        if self.mission_sampler is not None and self.mission_index is not None:
+            self.mission_sampler.record(self.mission_index, success, self.current_step, self.initial_distance)
+
     def action_mask(self) -> np.ndarray:
         # ... (inchangé)
         mask = np.zeros(self.max_actions, dtype=np.int8)
@@ -189,4 +386,7 @@ class WikiEnv(gym.Env):
     def close(self):
         # ... (inchangé)
         print("Fermeture de la connexion Neo4j.")
-        self.driver.close()
\ No newline at end of file
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+        if self.driver is not None:
+            self.driver.close()
\ No newline at end of file
@@ -0,0 +1,177 @@
+# src/evaluation.py (Évaluation hors-ligne des modèles entraînés)
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from . import config
+
+# État propre à chaque processus du pool (modèle et environnements chargés une seule fois).
+_worker_state: Dict = {}
+
+
+def select_eval_missions(count: int = config.EVAL_NUM_MISSIONS, seed: int = config.EVAL_SEED,
+                         path: str = config.EVAL_MISSIONS_FILE, source: str = "missions.json") -> List[Dict]:
+    """
+    Charge le jeu de missions d'évaluation, ou le tire une fois pour toutes avec une graine fixe.
+    Une fois le fichier écrit, WikiEnv exclut ces missions de l'entraînement.
+    """
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return create_eval_missions(count, seed, path, source)
+
+
+def create_eval_missions(count: int = config.EVAL_NUM_MISSIONS, seed: int = config.EVAL_SEED,
+                         path: str = config.EVAL_MISSIONS_FILE, source: str = "missions.json") -> List[Dict]:
+    """
+    Tire (ou retire) le jeu de missions d'évaluation. Appelé par 00_generate_missions.py juste
+    après missions.json : le jeu est réservé avant tout entraînement.
+    """
+    with open(source, "r", encoding="utf-8") as f:
+        missions = json.load(f)
+    selected = random.Random(seed).sample(missions, min(count, len(missions)))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(selected, f, indent=4, ensure_ascii=False)
+    print(f"{len(selected)} missions d'évaluation tirées (graine {seed}) et sauvegardées dans '{path}'.")
+    return selected
+
+
+def eval_split_id(path: str = config.EVAL_MISSIONS_FILE) -> Optional[str]:
+    """Empreinte du jeu de missions réservé (None s'il n'existe pas encore)."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        missions = json.load(f)
+    pairs = sorted([m["start"], m["target"]] for m in missions)
+    return hashlib.sha1(json.dumps(pairs, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def trained_without_eval_missions(model_path: str) -> bool:
+    """
+    Vrai si le modèle a été créé alors que le jeu réservé actuel existait déjà (empreinte
+    `eval_split` enregistrée par `create_model`) : il n'a jamais joué ces missions.
+    """
+    from stable_baselines3.common.save_util import load_from_zip_file
+
+    data, _, _ = load_from_zip_file(model_path, device="cpu")
+    return data is not None and data.get("eval_split") is not None and data["eval_split"] == eval_split_id()
+
+
+def detect_observation_mode(model) -> str:
+    """Retrouve le mode d'observation avec lequel un modèle a été entraîné."""
+    return "INDEX" if model.observation_space.shape == (3,) else "VECTOR"
+
+
+def detect_structural_features(model) -> bool:
+    """Retrouve si un modèle a été entraîné avec les embeddings structurels (voir src/structure.py)."""
+    from .environment import VECTOR_SIZE
+
+    if detect_observation_mode(model) == "INDEX":
+        return bool(getattr(model.policy.features_extractor, "structural", False))
+    return model.observation_space.shape[0] > 3 * VECTOR_SIZE
+
+
+def _init_worker(model_path: str, games_per_worker: int, ready=None) -> None:
+    import torch
+    from sb3_contrib import MaskablePPO
+    from .environment import WikiEnv
+
+    torch.set_num_threads(1)
+    model = MaskablePPO.load(model_path, device="cpu")
+    mode = detect_observation_mode(model)
+    _worker_state["model"] = model
+    structural = detect_structural_features(model)
+    _worker_state["envs"] = [WikiEnv(observation_mode=mode, structural_features=structural)
+                             for _ in range(games_per_worker)]
+    if ready is not None:
+        ready.wait()
+
+
+def _play_missions(missions: List[Dict]) -> List[Dict]:
+    return play_missions(_worker_state["model"], _worker_state["envs"], missions)
+
+
+def play_missions(model, envs: List, missions: List[Dict]) -> List[Dict]:
+    """Joue un paquet de missions en avançant toutes les parties actives d'un même pas à la fois."""
+    pending = list(reversed(missions))
+    active: Dict[int, Dict] = {}
+    observations: List[Optional[np.ndarray]] = [None] * len(envs)
+    results = []
+
+    def start_game(i: int) -> None:
+        mission = pending.pop()
+        observations[i], _ = envs[i].reset(options={"mission": mission})
+        active[i] = mission
+
+    def finish_game(i: int, success: bool) -> None:
+        mission = active.pop(i)
+        results.append({
+            "start": mission["start"],
+            "target": mission["target"],
+            "distance": mission.get("distance"),
+            "success": success,
+            "clicks": envs[i].current_step,
+        })
+        if pending:
+            start_game(i)
+
+    for i in range(len(envs)):
+        if pending:
+            start_game(i)
+
+    while active:
+        # Une impasse (aucun lien non visité) compte comme un échec.
+        for i in [i for i in active if not envs[i].available_actions]:
+            finish_game(i, success=False)
+        if not active:
+            break
+        indices = list(active)
+        batch_obs = np.stack([observations[i] for i in indices])
+        batch_masks = np.stack([envs[i].action_mask() for i in indices]).astype(bool)
+        actions, _ = model.predict(batch_obs, action_masks=batch_masks, deterministic=True)
+        for i, action in zip(indices, np.atleast_1d(actions)):
+            observations[i], _, terminated, truncated, _ = envs[i].step(int(action))
+            if terminated or truncated:
+                finish_game(i, success=terminated)
+    return results
+
+
+def summarize_results(results: List[Dict], elapsed: float) -> Dict[str, float]:
+    total = len(results)
+    successes = [r for r in results if r["success"]]
+    gaps = [r["clicks"] - r["distance"] for r in successes if r.get("distance")]
+    return {
+        "missions": total,
+        "success_rate": len(successes) / total if total else 0.0,
+        "mean_clicks": float(np.mean([r["clicks"] for r in results])) if results else 0.0,
+        "mean_clicks_success": float(np.mean([r["clicks"] for r in successes])) if successes else 0.0,
+        # Clics en trop par rapport au plus court chemin réel (parties réussies uniquement).
+        "optimality_gap": float(np.mean(gaps)) if gaps else 0.0,
+        "missions_per_sec": total / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def evaluate_model(model_path: str, missions: List[Dict], num_workers: Optional[int] = None,
+                   games_per_worker: int = config.EVAL_GAMES_PER_WORKER) -> Dict[str, float]:
+    """Évalue un modèle sur un jeu de missions fixe, réparti sur un pool de processus."""
+    num_workers = num_workers or os.cpu_count()
+    chunk_size = max(games_per_worker, len(missions) // (num_workers * 4) or 1)
+    chunks = [missions[i:i + chunk_size] for i in range(0, len(missions), chunk_size)]
+
+    ctx = multiprocessing.get_context("spawn")
+    # Le chargement des modèles n'est pas compté dans le débit : le chronomètre part quand tous
+    # les workers ont fini leur initialisation (barrière franchie par les workers et ce processus).
+    ready = ctx.Barrier(num_workers + 1)
+    with ctx.Pool(num_workers, initializer=_init_worker, initargs=(model_path, games_per_worker, ready)) as pool:
+        ready.wait()
+        start_time = time.perf_counter()
+        results = [result for chunk_results in pool.imap_unordered(_play_missions, chunks)
+                   for result in chunk_results]
+        elapsed = time.perf_counter() - start_time
+    return summarize_results(results, elapsed)
@@ -0,0 +1,154 @@
+# src/external_links.py (Tri externe des liens : runs triés sur disque puis fusion)
+import glob
+import os
+from array import array
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+from . import config
+
+# Un lien (source, cible) est une clé uint64 : source sur les 32 bits de poids fort, cible sur
+# les 32 bits de poids faible. L'ordre des clés est l'ordre (source, cible).
+_LOW_BITS = np.uint64(0xFFFFFFFF)
+_SHIFT = np.uint64(32)
+
+
+def link_keys(sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    return (sources.astype(np.uint64) << _SHIFT) | targets.astype(np.uint64)
+
+
+def split_keys(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return (keys >> _SHIFT).astype(np.int64), (keys & _LOW_BITS).astype(np.int64)
+
+
+class LinkFile:
+    """Liens triés et sans doublon, sur disque (clés uint64 brutes), lus par mappage mémoire."""
+
+    def __init__(self, path: str):
+        self.path = path
+        size = os.path.getsize(path)
+        self.keys = np.memmap(path, dtype=np.uint64, mode="r") if size else np.zeros(0, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def iter_blocks(self, block_size: int = config.LINKS_BLOCK_SIZE,
+                    align_sources: bool = False) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Parcourt les liens par blocs (sources, cibles). Avec `align_sources`, un bloc ne coupe
+        jamais la liste des liens d'une même source (utile pour les traitements par source).
+        """
+        start, total = 0, len(self.keys)
+        while start < total:
+            end = min(start + block_size, total)
+            if align_sources and end < total:
+                last_source = self.keys[end - 1] >> _SHIFT
+                cut = start + int(np.searchsorted(self.keys[start:end], last_source << _SHIFT))
+                if cut > start:
+                    end = cut
+                else:
+                    # Une seule source occupe tout le bloc : on l'étend jusqu'à la fin de ses liens.
+                    end = int(np.searchsorted(self.keys, (last_source + np.uint64(1)) << _SHIFT))
+            yield split_keys(np.asarray(self.keys[start:end]))
+            start = end
+
+    def remove(self) -> None:
+        del self.keys
+        os.remove(self.path)
+
+
+class ExternalLinkSorter:
+    """
+    Trie un nombre arbitraire de liens avec une mémoire bornée : les liens sont accumulés par
+    runs de `run_size`, chaque run est trié puis écrit sur disque, et `finish` fusionne les
+    runs (fusion à k voies par blocs) en un seul fichier trié et dédoublonné.
+    """
+
+    def __init__(self, directory: str = config.LINKS_TMP_PATH, run_size: int = config.LINKS_RUN_SIZE,
+                 name: str = "links"):
+        self.directory = directory
+        self.name = name
+        self.run_size = run_size
+        os.makedirs(directory, exist_ok=True)
+        self._buffer = array("Q")
+        self._runs: List[str] = []
+        self.added = 0
+
+    def add(self, source: int, target: int) -> None:
+        self._buffer.append(source << 32 | target)
+        if len(self._buffer) >= self.run_size:
+            self._flush()
+
+    def add_arrays(self, sources: np.ndarray, targets: np.ndarray) -> None:
+        keys = link_keys(sources, targets)
+        start = 0
+        while start < len(keys):
+            stop = start + self.run_size - len(self._buffer)
+            self._buffer.frombytes(keys[start:stop].tobytes())
+            start = stop
+            if len(self._buffer) >= self.run_size:
+                self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        keys = np.unique(np.frombuffer(self._buffer, dtype=np.uint64))
+        path = os.path.join(self.directory, f"{self.name}_{os.getpid()}_{len(self._runs):05d}.run")
+        keys.tofile(path)
+        self._runs.append(path)
+        self.added += len(self._buffer)
+        self._buffer = array("Q")
+
+    def _merged_blocks(self, block_size: int) -> Iterator[np.ndarray]:
+        runs = [np.memmap(path, dtype=np.uint64, mode="r") for path in self._runs if os.path.getsize(path)]
+        positions = [0] * len(runs)
+        while True:
+            active = [i for i, run in enumerate(runs) if positions[i] < len(run)]
+            if not active:
+                return
+            # Tout ce qui est <= `bound` est dans le prochain bloc de chaque run : on peut l'émettre.
+            bound = min(runs[i][min(positions[i] + block_size, len(runs[i])) - 1] for i in active)
+            parts = []
+            for i in active:
+                window = runs[i][positions[i]:positions[i] + block_size]
+                end = int(np.searchsorted(window, bound, side="right"))
+                parts.append(np.asarray(window[:end]))
+                positions[i] += end
+            # Chaque run est déjà dédoublonné : une clé égale à `bound` ne peut pas réapparaître ensuite.
+            yield np.unique(np.concatenate(parts))
+
+    def finish(self, output_path: str, transform: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+               block_size: int = config.LINKS_BLOCK_SIZE) -> LinkFile:
+        """
+        Fusionne les runs dans `output_path`. `transform` (optionnel) est appliqué à chaque bloc
+        de clés fusionnées ; il doit préserver l'ordre (ex. renumérotation monotone des pages).
+        """
+        self._flush()
+        with open(output_path + ".tmp", "wb") as f:
+            for keys in tqdm(self._merged_blocks(block_size), desc=f"Fusion de {len(self._runs)} runs"):
+                if transform is not None:
+                    keys = transform(keys)
+                keys.tofile(f)
+        os.replace(output_path + ".tmp", output_path)
+        for path in self._runs:
+            os.remove(path)
+        self._runs = []
+        return LinkFile(output_path)
+
+
+def clear_runs(directory: str = config.LINKS_TMP_PATH) -> None:
+    """Supprime les runs laissés par une exécution interrompue."""
+    for path in glob.glob(os.path.join(directory, "*.run")):
+        os.remove(path)
+
+
+def streaming_degrees(links: LinkFile, n_pages: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Degrés entrant et sortant de chaque page, en une passe sur les liens."""
+    in_degrees = np.zeros(n_pages, dtype=np.int64)
+    out_degrees = np.zeros(n_pages, dtype=np.int64)
+    for sources, targets in tqdm(links.iter_blocks(), desc="Calcul des degrés"):
+        out_degrees += np.bincount(sources, minlength=n_pages)
+        in_degrees += np.bincount(targets, minlength=n_pages)
+    return in_degrees, out_degrees
@@ -0,0 +1,42 @@
+# src/features.py (Extracteurs de caractéristiques pour les politiques SB3)
+import os
+
+import gymnasium as gym
+import numpy as np
+import torch as th
+from stable_baselines3.common.torch_layers import BaseFeaturesExtractor
+
+from . import config
+from .node_table import VECTORS_FILE
+from .structure import load_structure
+
+
+class NodeEmbeddingExtractor(BaseFeaturesExtractor):
+    """
+    Transforme une observation d'identifiants (actuel, cible, précédent) en la concaténation
+    de leurs vecteurs MiniLM, lus dans la table figée et mappée en mémoire.
+    La politique reçoit exactement la même entrée qu'en mode "VECTOR".
+
+    La table n'est ni un paramètre ni un buffer : elle n'est pas entraînée et n'alourdit pas
+    les fichiers .zip des modèles, qui ne retiennent que son chemin.
+    """
+
+    def __init__(self, observation_space: gym.spaces.Box, table_path: str = config.NODE_TABLE_PATH,
+                 structural: bool = False):
+        vectors = np.load(os.path.join(table_path, VECTORS_FILE), mmap_mode="r")
+        # Embeddings structurels (optionnels) : ajoutés après les 3 vecteurs MiniLM, comme en mode "VECTOR".
+        structure = load_structure(table_path) if structural else None
+        row_size = vectors.shape[1] + (structure.shape[1] if structure is not None else 0)
+        super().__init__(observation_space, features_dim=observation_space.shape[0] * row_size)
+        self.table_path = table_path
+        self.structural = structural
+        self.vectors = vectors
+        self.structure = structure
+
+    def forward(self, observations: th.Tensor) -> th.Tensor:
+        # SB3 convertit les observations en flottants : les identifiants restent exacts jusqu'à 2^24.
+        ids = observations.long().cpu().numpy()
+        features = self.vectors[ids].reshape(ids.shape[0], -1)
+        if self.structure is not None:
+            features = np.concatenate([features, self.structure[ids].reshape(ids.shape[0], -1)], axis=1)
+        return th.as_tensor(features, device=observations.device)
@@ -0,0 +1,111 @@
+# src/graph.py (Accès au graphe des pages)
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from neo4j import GraphDatabase, Driver
+
+from . import config
+
+
+def connect_to_neo4j() -> Driver:
+    auth = None
+    if config.NEO4J_AUTH_ENABLED:
+        auth = (config.NEO4J_USER, config.NEO4J_PASSWORD)
+    driver = GraphDatabase.driver(config.NEO4J_URI, auth=auth)
+    driver.verify_connectivity()
+    return driver
+
+
+def graph_version(driver: Driver) -> str:
+    """
+    Identifiant de la version du graphe, utilisé pour invalider les caches de requêtes.
+    Posé par l'import (voir `bump_graph_version`) ; à défaut, dérivé des nombres de pages et de liens.
+    """
+    with driver.session(database="neo4j") as session:
+        record = session.run("MATCH (m:GraphMeta) RETURN m.version AS version").single()
+        if record and record["version"]:
+            return str(record["version"])
+        pages = session.run("MATCH (p:Page) RETURN count(p) AS n").single()["n"]
+        links = session.run("MATCH ()-[r:LINKS_TO]->() RETURN count(r) AS n").single()["n"]
+        return f"{pages}-{links}"
+
+
+def bump_graph_version(driver: Driver) -> str:
+    """Donne une nouvelle version au graphe après une modification (pages, liens ou scores)."""
+    version = time.strftime("%Y%m%d-%H%M%S")
+    with driver.session(database="neo4j") as session:
+        session.run("MERGE (m:GraphMeta) SET m.version = $version", version=version)
+    return version
+
+
+class Neo4jGraph:
+    """Requêtes de voisinage sur la base Neo4j, unitaires ou groupées en une seule requête."""
+
+    def __init__(self, driver: Optional[Driver] = None):
+        self._owns_driver = driver is None
+        self.driver = driver or connect_to_neo4j()
+
+    def neighbors(self, title: str) -> Dict[str, float]:
+        """Liens sortants d'une page, avec le score de chaque page liée."""
+        with self.driver.session(database="neo4j") as session:
+            result = session.run(
+                "MATCH (p:Page {title: $title})-[:LINKS_TO]->(next:Page) "
+                "RETURN next.title AS nextPage, next.score AS score",
+                title=title
+            )
+            return {record["nextPage"]: record["score"] for record in result}
+
+    def neighbors_many(self, titles: List[str]) -> Dict[str, Dict[str, float]]:
+        """Liens sortants de plusieurs pages en un aller-retour (les pages sans lien sont absentes)."""
+        with self.driver.session(database="neo4j") as session:
+            result = session.run(
+                "UNWIND $titles AS title "
+                "MATCH (p:Page {title: title})-[:LINKS_TO]->(next:Page) "
+                "RETURN title, collect([next.title, next.score]) AS neighbors",
+                titles=list(set(titles))
+            )
+            return {record["title"]: {t: s for t, s in record["neighbors"]} for record in result}
+
+    def missing(self, titles: List[str]) -> Set[str]:
+        """Titres sans page correspondante dans la base, en un aller-retour."""
+        with self.driver.session(database="neo4j") as session:
+            result = session.run(
+                "UNWIND $titles AS title "
+                "OPTIONAL MATCH (p:Page {title: title}) "
+                "WITH title, p WHERE p IS NULL "
+                "RETURN title",
+                titles=list(set(titles))
+            )
+            return {record["title"] for record in result}
+
+    def predecessors_within(self, title: str, depth: int,
+                            max_pages: Optional[int] = None) -> Tuple[Dict[str, int], int]:
+        """
+        Pages pouvant atteindre `title` en au plus `depth` clics, avec leur distance exacte,
+        et nombre de pages dont les prédécesseurs ont été lus. Un niveau qui porterait le total
+        au-delà de `max_pages` est abandonné : seuls des niveaux complets sont renvoyés.
+        """
+        distances = {title: 0}
+        frontier = [title]
+        expanded = 0
+        with self.driver.session(database="neo4j") as session:
+            for d in range(1, depth + 1):
+                result = session.run(
+                    "UNWIND $titles AS title "
+                    "MATCH (prev:Page)-[:LINKS_TO]->(p:Page {title: title}) "
+                    "RETURN DISTINCT prev.title AS title",
+                    titles=frontier
+                )
+                expanded += len(frontier)
+                frontier = [r["title"] for r in result if r["title"] not in distances]
+                if max_pages is not None and len(distances) + len(frontier) > max_pages:
+                    break
+                for t in frontier:
+                    distances[t] = d
+                if not frontier:
+                    break
+        return distances, expanded
+
+    def close(self) -> None:
+        if self._owns_driver:
+            self.driver.close()
@@ -0,0 +1,169 @@
+# src/imitation.py (Pré-entraînement par imitation des plus courts chemins)
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import torch as th
+from tqdm import tqdm
+
+from . import config
+
+
+def get_shortest_path(driver, start_title: str, target_title: str) -> Optional[List[str]]:
+    """Titres des pages d'un plus court chemin réel (départ et cible compris), ou None."""
+    with driver.session(database="neo4j") as session:
+        result = session.run(
+            "MATCH (s:Page {title: $s}), (t:Page {title: $t}) "
+            "MATCH p = shortestPath((s)-[:LINKS_TO*..15]->(t)) "
+            "RETURN [n IN nodes(p) | n.title] AS titles", s=start_title, t=target_title
+        )
+        record = result.single()
+        return record["titles"] if record else None
+
+
+def _expert_action(env, planned: Optional[str]) -> Optional[int]:
+    """
+    Action de l'expert : le saut suivant du plus court chemin prévu s'il est proposé, sinon
+    n'importe quelle action proposée à distance d - 1 de la cible (il peut exister plusieurs
+    plus courts chemins, et la liste des actions est tronquée). None si aucune ne l'est.
+    """
+    if planned is not None and planned in env.available_actions:
+        return env.available_actions.index(planned)
+    target = env.target_page_title
+    wanted = env.current_distance_to_target - 1
+    for action, title in enumerate(env.available_actions):
+        if title == target or env._get_shortest_path_distance(title, target) == wanted:
+            return action
+    return None
+
+
+def generate_demonstrations(env, missions: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Joue chaque mission en suivant un plus court chemin et enregistre les décisions de
+    l'expert (observation, masque, action) telles que la politique les verrait.
+    Quand le saut prévu n'est pas parmi les actions proposées, l'expert prend une autre
+    action qui rapproche d'un clic de la cible ; la mission n'est écartée que s'il n'y en a aucune.
+    """
+    observations, masks, actions = [], [], []
+    completed = skipped = 0
+    for mission in tqdm(missions, desc="Démonstrations"):
+        if env.graph is not None:
+            path = env.graph.shortest_path(mission["start"], mission["target"], max_depth=15)
+        else:
+            path = get_shortest_path(env.driver, mission["start"], mission["target"])
+        if not path or len(path) < 2:
+            continue
+        observation, _ = env.reset(options={"mission": mission})
+        mission_observations, mission_masks, mission_actions = [], [], []
+        # Le chemin prévu n'est suivi que tant que l'expert n'en dévie pas.
+        planned = path[1:]
+        while True:
+            action = _expert_action(env, planned[0] if planned else None)
+            if action is None:
+                skipped += 1
+                break
+            if planned and env.available_actions[action] == planned[0]:
+                planned = planned[1:]
+            else:
+                planned = []
+            mission_observations.append(observation)
+            mission_masks.append(env.action_mask().astype(bool))
+            mission_actions.append(action)
+            observation, _, terminated, truncated, _ = env.step(action)
+            if terminated or truncated:
+                completed += int(terminated)
+                observations.extend(mission_observations)
+                masks.extend(mission_masks)
+                actions.extend(mission_actions)
+                break
+
+    print(f"{len(actions)} décisions enregistrées ({completed}/{len(missions)} missions menées à la cible, "
+          f"{skipped} écartées faute d'action rapprochant de la cible).")
+    return {
+        "observations": np.asarray(observations, dtype=env.observation_space.dtype),
+        "masks": np.asarray(masks, dtype=bool),
+        "actions": np.asarray(actions, dtype=np.int64),
+    }
+
+
+def demonstration_context(env) -> Dict:
+    """
+    Ce dont dépendent les démonstrations : mode et forme des observations, embeddings
+    structurels, version du graphe (et de la table des nœuds en mode "INDEX") et jeu
+    d'évaluation exclu. Des démonstrations enregistrées dans un autre contexte sont refaites.
+    """
+    from .evaluation import eval_split_id
+    from .graph import graph_version
+    from .node_table import TITLES_FILE
+
+    context = {
+        "observation_mode": env.observation_mode,
+        "observation_shape": list(env.observation_space.shape),
+        "structural": bool(env.structural_features),
+        "graph_version": env.graph.version if env.graph is not None else graph_version(env.driver),
+        "eval_split": eval_split_id(),
+    }
+    if env.observation_mode == "INDEX":
+        context["node_table"] = os.path.getmtime(os.path.join(config.NODE_TABLE_PATH, TITLES_FILE))
+    return context
+
+
+def save_demonstrations(path: str, demonstrations: Dict[str, np.ndarray], context: Dict) -> None:
+    np.savez_compressed(path, context=np.array(json.dumps(context)), **demonstrations)
+
+
+def load_demonstrations(path: str) -> Dict[str, np.ndarray]:
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files if key != "context"}
+
+
+def load_demonstration_context(path: str) -> Optional[Dict]:
+    """Contexte enregistré avec les démonstrations (None pour un fichier plus ancien)."""
+    with np.load(path) as data:
+        return json.loads(str(data["context"])) if "context" in data.files else None
+
+
+def behavior_clone(model, demonstrations: Dict[str, np.ndarray], epochs: int = config.IMITATION_EPOCHS,
+                   batch_size: int = config.IMITATION_BATCH_SIZE,
+                   learning_rate: float = config.IMITATION_LEARNING_RATE) -> List[float]:
+    """
+    Entraîne la politique masquée à reproduire les actions de l'expert (maximum de
+    vraisemblance sous le masque). Seule la tête "acteur" est concernée ; la fonction de
+    valeur sera apprise par PPO. Renvoie la précision de chaque époque.
+    """
+    policy = model.policy
+    policy.set_training_mode(True)
+    optimizer = th.optim.Adam(policy.parameters(), lr=learning_rate)
+
+    observations = demonstrations["observations"]
+    masks = demonstrations["masks"]
+    actions = demonstrations["actions"]
+    n_samples = len(actions)
+    accuracies = []
+    for epoch in range(epochs):
+        permutation = np.random.permutation(n_samples)
+        total_loss, correct = 0.0, 0
+        for start in range(0, n_samples, batch_size):
+            batch = permutation[start:start + batch_size]
+            obs_tensor = th.as_tensor(observations[batch], device=policy.device)
+            action_tensor = th.as_tensor(actions[batch], device=policy.device)
+            _, log_prob, _ = policy.evaluate_actions(obs_tensor, action_tensor, action_masks=masks[batch])
+            loss = -log_prob.mean()
+
+            optimizer.zero_grad()
+            loss.backward()
+            th.nn.utils.clip_grad_norm_(policy.parameters(), model.max_grad_norm)
+            optimizer.step()
+
+            total_loss += loss.item() * len(batch)
+            with th.no_grad():
+                distribution = policy.get_distribution(obs_tensor, action_masks=masks[batch])
+                correct += int((distribution.mode() == action_tensor).sum())
+
+        accuracy = correct / n_samples
+        accuracies.append(accuracy)
+        print(f"Époque {epoch + 1}/{epochs} - perte: {total_loss / n_samples:.4f} - précision: {accuracy * 100:.2f}%")
+
+    policy.set_training_mode(False)
+    return accuracies
@@ -0,0 +1,270 @@
+# src/inference.py (Export et inférence légère de la politique masquée)
+import json
+import os
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import torch as th
+from torch import nn
+
+from . import config
+from .node_table import VECTORS_FILE
+from .structure import load_structure
+
+
+class _PolicyLogits(nn.Module):
+    """Partie "acteur" de la politique : caractéristiques -> logits des actions (sans la valeur)."""
+
+    def __init__(self, policy):
+        super().__init__()
+        self.mlp_extractor = policy.mlp_extractor
+        self.action_net = policy.action_net
+
+    def forward(self, features: th.Tensor) -> th.Tensor:
+        return self.action_net(self.mlp_extractor.forward_actor(features))
+
+
+def _metadata_path(path: str) -> str:
+    return path + ".json"
+
+
+def export_policy(model_path: str, output_path: str, fmt: str = "torchscript", quantize: bool = False) -> dict:
+    """
+    Exporte la politique d'un modèle MaskablePPO en artefact autonome (TorchScript ou ONNX),
+    avec quantification dynamique int8 optionnelle des couches linéaires.
+    La recherche d'embeddings du mode "INDEX" reste hors du graphe : `ExportedPolicy` la fait
+    directement dans la table mappée en mémoire.
+    """
+    from sb3_contrib import MaskablePPO
+    from .evaluation import detect_observation_mode, detect_structural_features
+
+    model = MaskablePPO.load(model_path, device="cpu")
+    policy = model.policy
+    observation_mode = detect_observation_mode(model)
+    features_dim = policy.features_extractor.features_dim
+    module = _PolicyLogits(policy).eval()
+    example = th.zeros(1, features_dim)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    if fmt == "torchscript":
+        if quantize:
+            module = th.ao.quantization.quantize_dynamic(module, {nn.Linear}, dtype=th.qint8)
+        with th.no_grad():
+            th.jit.trace(module, example).save(output_path)
+    elif fmt == "onnx":
+        fp32_path = output_path + ".fp32" if quantize else output_path
+        th.onnx.export(module, example, fp32_path, input_names=["features"], output_names=["logits"],
+                       dynamic_axes={"features": {0: "batch"}, "logits": {0: "batch"}})
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(fp32_path, output_path, weight_type=QuantType.QInt8)
+            os.remove(fp32_path)
+    else:
+        raise ValueError(f"Format d'export inconnu: {fmt}")
+
+    metadata = {
+        "format": fmt,
+        "quantized": quantize,
+        "source_model": os.path.basename(model_path),
+        "observation_mode": observation_mode,
+        "table_path": getattr(policy.features_extractor, "table_path", None),
+        "structural": detect_structural_features(model),
+        "features_dim": features_dim,
+        "n_actions": int(model.action_space.n),
+    }
+    with open(_metadata_path(output_path), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=4)
+    return metadata
+
+
+class ExportedPolicy:
+    """
+    Politique exportée, utilisable à la place d'un modèle SB3 : même signature de `predict`,
+    mais sans charger SB3 ni reconstruire l'algorithme complet.
+    """
+
+    def __init__(self, path: str):
+        with open(_metadata_path(path), "r", encoding="utf-8") as f:
+            self.metadata = json.load(f)
+        self.observation_mode = self.metadata["observation_mode"]
+        self.vectors = None
+        self.structure = None
+        if self.observation_mode == "INDEX":
+            table_path = self.metadata["table_path"] or config.NODE_TABLE_PATH
+            self.vectors = np.load(os.path.join(table_path, VECTORS_FILE), mmap_mode="r")
+            if self.metadata.get("structural"):
+                self.structure = load_structure(table_path)
+
+        self._session = None
+        self._module = None
+        if self.metadata["format"] == "onnx":
+            import onnxruntime
+            self._session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+        else:
+            self._module = th.jit.load(path, map_location="cpu").eval()
+
+    def _features(self, observations: np.ndarray) -> np.ndarray:
+        if self.vectors is not None:
+            ids = observations.astype(np.int64)
+            features = self.vectors[ids].reshape(ids.shape[0], -1)
+            if self.structure is not None:
+                features = np.concatenate([features, self.structure[ids].reshape(ids.shape[0], -1)], axis=1)
+            return features
+        return observations.astype(np.float32, copy=False)
+
+    def logits(self, observations: np.ndarray) -> np.ndarray:
+        features = self._features(observations)
+        if self._session is not None:
+            return self._session.run(None, {"features": features})[0]
+        with th.inference_mode():
+            return self._module(th.as_tensor(features)).numpy()
+
+    def predict(self, observation: np.ndarray, action_masks: Optional[np.ndarray] = None,
+                deterministic: bool = True) -> Tuple[np.ndarray, None]:
+        """Même convention que `MaskablePPO.predict` : une observation seule ou un lot."""
+        observation = np.asarray(observation)
+        single = observation.ndim == 1
+        observations = observation[None] if single else observation
+        logits = self.logits(observations)
+        if action_masks is not None:
+            masks = np.asarray(action_masks, dtype=bool).reshape(logits.shape)
+            logits = np.where(masks, logits, -np.inf)
+
+        if deterministic:
+            actions = np.argmax(logits, axis=1)
+        else:
+            probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probs /= probs.sum(axis=1, keepdims=True)
+            actions = np.array([np.random.choice(len(p), p=p) for p in probs])
+        return (actions[0] if single else actions), None
+
+
+def load_policy(path: str):
+    """Charge une politique exportée (.pt / .onnx) ou un modèle SB3 complet (.zip)."""
+    if path.endswith(".zip"):
+        from sb3_contrib import MaskablePPO
+        return MaskablePPO.load(path, device="cpu")
+    return ExportedPolicy(path)
+
+
+def observation_mode_of(policy) -> str:
+    if isinstance(policy, ExportedPolicy):
+        return policy.observation_mode
+    from .evaluation import detect_observation_mode
+    return detect_observation_mode(policy)
+
+
+def structural_features_of(policy) -> bool:
+    if isinstance(policy, ExportedPolicy):
+        return bool(policy.metadata.get("structural", False))
+    from .evaluation import detect_structural_features
+    return detect_structural_features(policy)
+
+
+def compare_with_model(model_path: str, exported_path: str, samples: int = 1000) -> dict:
+    """Vérifie que l'artefact exporté choisit les mêmes actions que le modèle d'origine et mesure les latences."""
+    start = time.perf_counter()
+    exported = ExportedPolicy(exported_path)
+    exported_load_time = time.perf_counter() - start
+
+    from sb3_contrib import MaskablePPO
+    start = time.perf_counter()
+    model = MaskablePPO.load(model_path, device="cpu")
+    model_load_time = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    n_actions = exported.metadata["n_actions"]
+    if exported.observation_mode == "INDEX":
+        observations = rng.integers(0, exported.vectors.shape[0], size=(samples,) + model.observation_space.shape)
+    else:
+        observations = rng.standard_normal((samples,) + model.observation_space.shape).astype(np.float32)
+    masks = rng.random((samples, n_actions)) < 0.5
+    masks[:, 0] = True
+
+    agree = 0
+    model_time, exported_time = 0.0, 0.0
+    for obs, mask in zip(observations, masks):
+        start = time.perf_counter()
+        expected, _ = model.predict(obs, action_masks=mask, deterministic=True)
+        model_time += time.perf_counter() - start
+        start = time.perf_counter()
+        action, _ = exported.predict(obs, action_masks=mask, deterministic=True)
+        exported_time += time.perf_counter() - start
+        agree += int(expected) == int(action)
+
+    return {
+        "agreement": agree / samples,
+        "model_load_s": model_load_time,
+        "exported_load_s": exported_load_time,
+        "model_decision_ms": model_time / samples * 1000,
+        "exported_decision_ms": exported_time / samples * 1000,
+    }
+
+
+def action_probabilities(policy, observations: np.ndarray, action_masks: np.ndarray) -> np.ndarray:
+    """Probabilités des actions sous le masque, pour un lot d'observations (modèle SB3 ou exporté)."""
+    if isinstance(policy, ExportedPolicy):
+        logits = np.where(action_masks, policy.logits(observations), -np.inf)
+        probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return probs / probs.sum(axis=1, keepdims=True)
+    obs_tensor, _ = policy.policy.obs_to_tensor(observations)
+    with th.no_grad():
+        distribution = policy.policy.get_distribution(obs_tensor, action_masks=action_masks)
+        return distribution.distribution.probs.cpu().numpy()
+
+
+class ObservationBuilder:
+    """
+    Construit par lots les observations de WikiEnv ([actuelle, cible, précédente]) hors de
+    l'environnement. En mode "VECTOR", les vecteurs MiniLM sont calculés en un seul appel
+    pour les titres jamais vus et gardés dans un cache borné ; avec `structural`, les
+    embeddings structurels sont ajoutés comme dans WikiEnv.
+    """
+
+    def __init__(self, observation_mode: str, embedding_cache_size: int = 200_000, structural: bool = False):
+        from .environment import get_encoder
+
+        self.observation_mode = observation_mode
+        self.embedding_cache_size = embedding_cache_size
+        self._embeddings: Dict[str, np.ndarray] = {}
+        self.node_table = None
+        self.encoder = None
+        self.structure = None
+        if observation_mode == "INDEX":
+            from .node_table import NodeTable
+            self.node_table = NodeTable(config.NODE_TABLE_PATH)
+        else:
+            self.encoder = get_encoder()
+            if structural:
+                from .structure import StructuralFeatures
+                self.structure = StructuralFeatures(config.NODE_TABLE_PATH)
+
+    def unknown(self, titles: List[str]) -> Set[str]:
+        """Titres sans ligne dans la table des nœuds, quand les observations en ont besoin."""
+        table = self.node_table if self.node_table is not None else getattr(self.structure, "node_table", None)
+        if table is None:
+            return set()
+        return {title for title in titles if title not in table.title_to_id}
+
+    def embed(self, titles: List[Optional[str]]) -> np.ndarray:
+        from .environment import VECTOR_SIZE
+
+        missing = list({t for t in titles if t is not None and t not in self._embeddings})
+        if missing:
+            if len(self._embeddings) + len(missing) > self.embedding_cache_size:
+                self._embeddings.clear()
+            for title, vector in zip(missing, self.encoder.encode(missing, convert_to_numpy=True)):
+                self._embeddings[title] = vector
+        zeros = np.zeros(VECTOR_SIZE, dtype=np.float32)
+        return np.stack([zeros if t is None else self._embeddings[t] for t in titles])
+
+    def build(self, currents: List[str], targets: List[str], previouses: List[Optional[str]]) -> np.ndarray:
+        if self.node_table is not None:
+            ids = self.node_table.id_of
+            return np.array([[ids(c), ids(t), ids(p)] for c, t, p in zip(currents, targets, previouses)],
+                            dtype=np.int32)
+        parts = [self.embed(currents), self.embed(targets), self.embed(previouses)]
+        if self.structure is not None:
+            parts.append(np.stack([self.structure.of([c, t, p]) for c, t, p in zip(currents, targets, previouses)]))
+        return np.concatenate(parts, axis=1).astype(np.float32)
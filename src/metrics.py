@@ -0,0 +1,277 @@
+# src/metrics.py (Métriques de débit et de latence en direct pendant l'entraînement)
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+import gymnasium as gym
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.vec_env import VecEnv, VecEnvWrapper
+
+from . import config
+from .shared_arrays import SharedArray
+
+# Colonnes du tableau des compteurs (une ligne par worker). Les compteurs sont cumulatifs :
+# le processus principal calcule les débits à partir de leurs différences entre deux relevés.
+STEPS, EPISODES, STEP_TIME, NEO4J_QUERIES, NEO4J_TIME, LAST_STEP = range(6)
+N_COUNTERS = 6
+
+
+def create_worker_metrics(n_workers: int) -> SharedArray:
+    """Tableau partagé des compteurs des workers, à créer dans le processus principal."""
+    return SharedArray((n_workers, N_COUNTERS), np.float64)
+
+
+class WorkerMetrics(gym.Wrapper):
+    """
+    Tient à jour, dans la ligne `index` du tableau partagé, les compteurs du worker : pas,
+    épisodes, temps passé dans `step` et requêtes Neo4j de WikiEnv. Chaque worker n'écrit
+    que sa ligne : aucun verrou n'est nécessaire.
+    """
+
+    def __init__(self, env: gym.Env, table: SharedArray, index: int):
+        super().__init__(env)
+        self.table = table
+        self.index = index
+
+    def _publish(self, row: np.ndarray) -> None:
+        wiki_env = self.env.unwrapped
+        row[NEO4J_QUERIES] = getattr(wiki_env, "neo4j_queries", 0)
+        row[NEO4J_TIME] = getattr(wiki_env, "neo4j_query_time", 0.0)
+        row[LAST_STEP] = time.time()
+
+    def reset(self, **kwargs):
+        result = self.env.reset(**kwargs)
+        self._publish(self.table.array[self.index])
+        return result
+
+    def step(self, action):
+        started = time.perf_counter()
+        observation, reward, terminated, truncated, info = self.env.step(action)
+        row = self.table.array[self.index]
+        row[STEP_TIME] += time.perf_counter() - started
+        row[STEPS] += 1
+        if terminated or truncated:
+            row[EPISODES] += 1
+        self._publish(row)
+        return observation, reward, terminated, truncated, info
+
+
+class TimedVecEnv(VecEnvWrapper):
+    """Mesure le temps d'attente de chaque `step_wait` (le pas du worker le plus lent, plus l'IPC)."""
+
+    def __init__(self, venv: VecEnv):
+        super().__init__(venv)
+        self.wait_time = 0.0
+        self.steps = 0
+
+    def reset(self):
+        return self.venv.reset()
+
+    def step_wait(self):
+        started = time.perf_counter()
+        result = self.venv.step_wait()
+        self.wait_time += time.perf_counter() - started
+        self.steps += 1
+        return result
+
+
+def to_prometheus(values: Dict[str, float]) -> str:
+    """
+    Format texte Prometheus. Les clés "perf/worker_03/steps_per_sec" deviennent
+    `wikiai_worker_steps_per_sec{worker="03"}`, les autres `wikiai_<nom>`.
+    """
+    lines = []
+    for key, value in sorted(values.items()):
+        name = key.split("/", 1)[-1]
+        labels = ""
+        if name.startswith("worker_") and "/" in name:
+            worker, name = name.split("/", 1)
+            labels = f'{{worker="{worker[len("worker_"):]}"}}'
+            name = f"worker_{name}"
+        lines.append(f"wikiai_{name}{labels} {float(value):.6g}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    callback: "MetricsCallback" = None
+
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = to_prometheus(self.callback.snapshot()).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsCallback(BaseCallback):
+    """
+    Relève les compteurs des workers toutes les `interval` secondes et à chaque fin de
+    collecte, puis écrit les métriques "perf/..." dans le logger (TensorBoard) :
+
+    - débit total et par worker (pas/s), latence moyenne d'un pas et délai depuis le
+      dernier pas de chaque worker (un worker bloqué est signalé dans la console) ;
+    - temps de collecte d'un rollout et temps de mise à jour de la politique ;
+    - attente IPC : temps moyen d'un `step_wait` moins le temps de calcul moyen d'un pas
+      dans les workers (communication et attente du worker le plus lent) ;
+    - nombre et latence des requêtes Neo4j.
+
+    Les dernières valeurs sont aussi servies sur http://host:port/metrics. Le délai depuis
+    le dernier pas de chaque worker est aussi relevé par un thread de surveillance : quand un
+    worker bloque `step_wait`, aucun callback n'est appelé mais l'alerte part quand même.
+    """
+
+    def __init__(self, worker_metrics: Optional[SharedArray] = None, timed_env: Optional[TimedVecEnv] = None,
+                 interval: float = config.METRICS_INTERVAL_SECONDS, host: str = config.METRICS_HOST,
+                 port: Optional[int] = config.METRICS_PORT, stall_seconds: float = config.METRICS_STALL_SECONDS,
+                 verbose=0):
+        super(MetricsCallback, self).__init__(verbose)
+        self.worker_metrics = worker_metrics
+        self.timed_env = timed_env
+        self.interval = interval
+        self.host = host
+        self.port = port
+        self.stall_seconds = stall_seconds
+        self._values: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._last_report = 0.0
+        self._last_counters: Optional[np.ndarray] = None
+        self._last_wait: Tuple[float, int] = (0.0, 0)
+        self._rollout_start: Optional[float] = None
+        self._rollout_end: Optional[float] = None
+        self._stalled = set()
+        self._stop_watchdog = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def _init_callback(self) -> None:
+        self._last_report = time.perf_counter()
+        if self.worker_metrics is not None:
+            self._last_counters = self.worker_metrics.array.copy()
+        if self.timed_env is not None:
+            self._last_wait = (self.timed_env.wait_time, self.timed_env.steps)
+        if self.port is not None:
+            handler = type("MetricsHandler", (_MetricsHandler,), {"callback": self})
+            try:
+                self._server = ThreadingHTTPServer((self.host, self.port), handler)
+            except OSError as e:
+                # Port déjà pris (ex. un second entraînement en parallèle) : les métriques restent dans TensorBoard.
+                print(f"ATTENTION: endpoint de métriques indisponible sur {self.host}:{self.port} ({e}).")
+            else:
+                threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+                print(f"Métriques en direct sur http://{self.host}:{self.port}/metrics")
+        if self.worker_metrics is not None:
+            self._watchdog = threading.Thread(target=self._watch_workers, name="metrics-watchdog", daemon=True)
+            self._watchdog.start()
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def _publish(self, values: Dict[str, float]) -> None:
+        values = {key: float(value) for key, value in values.items()}
+        with self._lock:
+            self._values.update(values)
+        for key, value in values.items():
+            self.logger.record(key, value)
+
+    def _liveness(self) -> Dict[str, float]:
+        """Délai depuis le dernier pas de chaque worker ; signale (une fois) les workers bloqués."""
+        values: Dict[str, float] = {}
+        wall_clock = time.time()
+        with self._lock:
+            for worker, last_step in enumerate(self.worker_metrics.array[:, LAST_STEP].tolist()):
+                since_last_step = wall_clock - last_step if last_step > 0 else 0.0
+                values[f"perf/worker_{worker:02d}/seconds_since_step"] = since_last_step
+                if since_last_step > self.stall_seconds and worker not in self._stalled:
+                    self._stalled.add(worker)
+                    print(f"ATTENTION: le worker {worker} n'a joué aucun pas depuis {since_last_step:.0f} s.")
+                elif since_last_step <= self.stall_seconds:
+                    self._stalled.discard(worker)
+            values["perf/stalled_workers"] = float(len(self._stalled))
+        return values
+
+    def _watch_workers(self) -> None:
+        # Hors du thread principal : seules les valeurs servies sur /metrics sont mises à jour
+        # (le logger de SB3 n'est écrit que par les callbacks).
+        while not self._stop_watchdog.wait(self.interval):
+            values = self._liveness()
+            with self._lock:
+                self._values.update(values)
+
+    def _report(self) -> None:
+        now = time.perf_counter()
+        elapsed = max(now - self._last_report, 1e-9)
+        self._last_report = now
+        values: Dict[str, float] = {}
+
+        worker_step_time = None
+        if self.worker_metrics is not None:
+            counters = self.worker_metrics.array.copy()
+            delta = counters - self._last_counters
+            self._last_counters = counters
+            steps = delta[:, STEPS]
+            values["perf/env_steps_per_sec"] = steps.sum() / elapsed
+            values["perf/worker_min_steps_per_sec"] = steps.min() / elapsed
+            if steps.sum() > 0:
+                worker_step_time = delta[:, STEP_TIME].sum() / steps.sum()
+                values["perf/env_step_ms"] = 1000 * worker_step_time
+            queries = delta[:, NEO4J_QUERIES].sum()
+            values["perf/neo4j_queries_per_sec"] = queries / elapsed
+            if queries > 0:
+                values["perf/neo4j_query_ms"] = 1000 * delta[:, NEO4J_TIME].sum() / queries
+
+            for worker in range(len(counters)):
+                values[f"perf/worker_{worker:02d}/steps_per_sec"] = steps[worker] / elapsed
+            values.update(self._liveness())
+
+        if self.timed_env is not None:
+            wait_time, wait_steps = self.timed_env.wait_time, self.timed_env.steps
+            last_time, last_steps = self._last_wait
+            self._last_wait = (wait_time, wait_steps)
+            if wait_steps > last_steps:
+                step_wait = (wait_time - last_time) / (wait_steps - last_steps)
+                values["perf/step_wait_ms"] = 1000 * step_wait
+                if worker_step_time is not None:
+                    values["perf/ipc_wait_ms"] = 1000 * max(step_wait - worker_step_time, 0.0)
+
+        self._publish(values)
+
+    def _on_step(self) -> bool:
+        if time.perf_counter() - self._last_report >= self.interval:
+            self._report()
+        return True
+
+    def _on_rollout_start(self) -> None:
+        now = time.perf_counter()
+        if self._rollout_end is not None:
+            # Entre la fin d'une collecte et le début de la suivante : mise à jour de la politique.
+            self._publish({"perf/update_time_s": now - self._rollout_end})
+        self._rollout_start = now
+
+    def _on_rollout_end(self) -> None:
+        now = time.perf_counter()
+        self._rollout_end = now
+        if self._rollout_start is not None:
+            self._publish({"perf/rollout_time_s": now - self._rollout_start})
+        self._report()
+
+    def _on_training_end(self) -> None:
+        # Le thread de surveillance lit les compteurs partagés : il doit être arrêté avant que
+        # l'appelant ne les libère (`worker_metrics.close()`).
+        self._stop_watchdog.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,104 @@
+# src/mission_sampler.py (Tirage prioritaire des missions difficiles)
+from typing import Optional
+
+import numpy as np
+
+from . import config
+from .shared_arrays import SharedArray
+
+# Colonnes du tableau de statistiques (une ligne par mission d'entraînement).
+VISITS, FAILURE, REGRET = 0, 1, 2
+
+
+def create_mission_stats(n_missions: int) -> SharedArray:
+    """
+    Tableau partagé des résultats par mission, à créer dans le processus principal et à
+    transmettre aux environnements. Les missions jamais jouées partent avec un taux d'échec
+    de 1, ce qui les fait tirer en priorité.
+    """
+    stats = SharedArray((n_missions, 3), np.float32)
+    _reset_stats(stats.array)
+    return stats
+
+
+def _reset_stats(table: np.ndarray) -> None:
+    table[:] = 0.0
+    table[:, FAILURE] = 1.0
+
+
+class MissionSampler:
+    """
+    Tire les missions proportionnellement à leur difficulté récente : moyenne mobile des
+    échecs, plus `regret_weight` fois la moyenne mobile des clics en trop (relatifs au plus
+    court chemin). Une part `exploration_floor` des tirages reste uniforme, pour que les
+    missions déjà réussies reviennent de temps en temps.
+
+    Les statistiques sont partagées par tous les workers sans verrou : chaque fin d'épisode
+    ne touche qu'une ligne, et une écriture concurrente perdue ne fait que décaler légèrement
+    une moyenne. La distribution de tirage est recalculée tous les `refresh_every` épisodes.
+    """
+
+    def __init__(self, n_missions: int, stats: Optional[SharedArray] = None,
+                 exploration_floor: float = config.PRIORITY_EXPLORATION_FLOOR,
+                 ema: float = config.PRIORITY_EMA, regret_weight: float = config.PRIORITY_REGRET_WEIGHT,
+                 refresh_every: int = config.PRIORITY_REFRESH_EPISODES,
+                 local_missions: Optional[np.ndarray] = None):
+        if stats is not None and stats.shape[0] != n_missions:
+            raise ValueError(f"Le tableau de statistiques couvre {stats.shape[0]} missions, "
+                             f"l'environnement en a {n_missions} (missions.json a changé ?).")
+        self.n_missions = n_missions
+        self.stats = stats
+        if stats is not None:
+            self.table = stats.array
+        else:
+            # Statistiques propres à cet environnement (évaluation, balayage, serveur distant...) :
+            # un tableau ordinaire suffit, sans segment de mémoire partagée à libérer.
+            self.table = np.empty((n_missions, 3), dtype=np.float32)
+            _reset_stats(self.table)
+        self.exploration_floor = exploration_floor
+        self.ema = ema
+        self.regret_weight = regret_weight
+        self.refresh_every = refresh_every
+        # Missions locales du worker (src/partition.py) : fixes, leur distribution est recalculée avec l'autre.
+        self.local_missions = local_missions
+        self._cumulative: Optional[np.ndarray] = None
+        self._local_cumulative: Optional[np.ndarray] = None
+        self._episodes_since_refresh = 0
+
+    def _refresh(self) -> None:
+        table = self.table
+        priority = table[:, FAILURE] + self.regret_weight * table[:, REGRET]
+        total = float(priority.sum())
+        uniform = 1.0 / self.n_missions
+        if total <= 0:
+            probabilities = np.full(self.n_missions, uniform)
+        else:
+            probabilities = (1 - self.exploration_floor) * priority / total + self.exploration_floor * uniform
+        self._cumulative = np.cumsum(probabilities, dtype=np.float64)
+        self._cumulative[-1] = 1.0
+        if self.local_missions is not None:
+            self._local_cumulative = np.cumsum(probabilities[self.local_missions], dtype=np.float64)
+            self._local_cumulative /= self._local_cumulative[-1]
+            self._local_cumulative[-1] = 1.0
+        self._episodes_since_refresh = 0
+
+    def sample(self, rng: np.random.Generator, local: bool = False) -> int:
+        """Tire une mission ; avec `local`, le tirage est restreint aux missions locales du worker."""
+        if self._cumulative is None or self._episodes_since_refresh >= self.refresh_every:
+            self._refresh()
+        if not local or self.local_missions is None:
+            return int(np.searchsorted(self._cumulative, rng.random(), side="right"))
+        position = int(np.searchsorted(self._local_cumulative, rng.random(), side="right"))
+        return int(self.local_missions[position])
+
+    def record(self, index: int, success: bool, clicks: int, distance: int) -> None:
+        """Met à jour les moyennes mobiles de la mission après une partie."""
+        if success:
+            regret = min(max(clicks - distance, 0) / max(distance, 1), 1.0)
+        else:
+            regret = 1.0
+        row = self.table[index]
+        row[VISITS] += 1
+        row[FAILURE] += self.ema * (float(not success) - row[FAILURE])
+        row[REGRET] += self.ema * (regret - row[REGRET])
+        self._episodes_since_refresh += 1
@@ -0,0 +1,76 @@
+# src/node_table.py (Table des nœuds : identifiants stables + embeddings figés)
+import json
+import os
+from typing import Optional
+
+import numpy as np
+from neo4j import Driver
+from tqdm import tqdm
+
+from . import config
+
+TITLES_FILE = "titles.json"
+VECTORS_FILE = "vectors.npy"
+
+
+def build_node_table(driver: Driver, path: str = config.NODE_TABLE_PATH, batch_size: int = 1024) -> int:
+    """
+    Attribue un identifiant à chaque page du graphe et pré-calcule son vecteur MiniLM.
+    L'identifiant 0 est réservé à "aucune page" (vecteur nul), comme `_get_page_vector(None)`.
+    Les pages sont numérotées par score décroissant à partir de 1, ou dans l'ordre du placement
+    par communautés s'il existe (scripts/01f_partition_graph.py) : les lignes lues ensemble par
+    un worker à missions locales sont alors voisines sur le disque.
+    """
+    from sentence_transformers import SentenceTransformer
+    from .environment import MODEL_NAME, VECTOR_SIZE
+    from .partition import load_partition
+
+    with driver.session(database="neo4j") as session:
+        result = session.run("MATCH (p:Page) RETURN p.title AS title ORDER BY p.score DESC, p.title")
+        titles = [record["title"] for record in result]
+    partition = load_partition()
+    if partition is not None:
+        # Tri stable : les pages absentes du placement restent à la fin, par score décroissant.
+        titles.sort(key=lambda title: partition.position.get(title, len(partition.titles)))
+    print(f"{len(titles)} pages à encoder.")
+
+    os.makedirs(path, exist_ok=True)
+    model = SentenceTransformer(MODEL_NAME)
+    vectors = np.lib.format.open_memmap(os.path.join(path, VECTORS_FILE), mode="w+",
+                                        dtype=np.float32, shape=(len(titles) + 1, VECTOR_SIZE))
+    vectors[0] = 0.0
+    for i in tqdm(range(0, len(titles), batch_size), desc="Encodage des pages"):
+        batch = titles[i:i + batch_size]
+        vectors[i + 1:i + 1 + len(batch)] = model.encode(batch, convert_to_numpy=True)
+    vectors.flush()
+    del vectors
+
+    with open(os.path.join(path, TITLES_FILE), "w", encoding="utf-8") as f:
+        json.dump(titles, f, ensure_ascii=False)
+    return len(titles)
+
+
+class NodeTable:
+    """Accès en lecture à la table des nœuds (les vecteurs restent mappés en mémoire)."""
+
+    def __init__(self, path: str = config.NODE_TABLE_PATH):
+        with open(os.path.join(path, TITLES_FILE), "r", encoding="utf-8") as f:
+            self.titles: list[str] = json.load(f)
+        self.title_to_id = {title: i + 1 for i, title in enumerate(self.titles)}
+        self.vectors: np.ndarray = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r")
+
+    def __len__(self) -> int:
+        # Nombre de lignes de la table, ligne 0 ("aucune page") comprise.
+        return len(self.titles) + 1
+
+    def id_of(self, title: Optional[str]) -> int:
+        if title is None:
+            return 0
+        try:
+            return self.title_to_id[title]
+        except KeyError:
+            raise KeyError(f"La page '{title}' est absente de la table des nœuds. "
+                           f"Relancez scripts/01b_build_node_table.py après l'importation.")
+
+    def title_of(self, node_id: int) -> Optional[str]:
+        return None if node_id == 0 else self.titles[node_id - 1]
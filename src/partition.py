@@ -0,0 +1,232 @@
+# src/partition.py (Communautés de liens, placement contigu et missions locales par worker)
+import heapq
+import json
+import os
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from tqdm import tqdm
+
+from . import config
+
+TITLES_FILE = "titles.json"
+BOUNDS_FILE = "bounds.npy"
+META_FILE = "meta.json"
+
+# Fonction qui parcourt le graphe par blocs de pages consécutives : (pages, voisins), chaque page
+# d'un bloc y apparaissant une fois par voisin (liens sortants et entrants).
+NeighborBlocks = Callable[[], Iterator[Tuple[np.ndarray, np.ndarray]]]
+
+
+def csr_neighbor_blocks(sources: np.ndarray, targets: np.ndarray, n_nodes: int,
+                        block_nodes: int = 1 << 16) -> NeighborBlocks:
+    """Voisins d'un graphe tenu en mémoire (ex. le bac à sable Neo4j)."""
+    ones = np.ones(2 * len(sources), dtype=np.float32)
+    adjacency = sp.csr_matrix((ones, (np.r_[sources, targets], np.r_[targets, sources])), shape=(n_nodes, n_nodes))
+
+    def blocks():
+        for first in range(0, n_nodes, block_nodes):
+            last = min(first + block_nodes, n_nodes)
+            rows = adjacency[first:last]
+            yield np.repeat(np.arange(first, last), np.diff(rows.indptr)), rows.indices.astype(np.int64)
+
+    return blocks
+
+
+def compressed_neighbor_blocks(graph, block_nodes: int = 1 << 16) -> NeighborBlocks:
+    """Voisins d'un graphe compressé (src/compressed_graph.py), décodés bloc par bloc."""
+
+    def blocks():
+        adjacencies = [graph.forward] + ([graph.reverse] if graph.reverse is not None else [])
+        for first in range(0, len(graph), block_nodes):
+            nodes = np.arange(first, min(first + block_nodes, len(graph)), dtype=np.int64)
+            pages, neighbors = [], []
+            for adjacency in adjacencies:
+                ids, counts = adjacency.neighbors_many(nodes)
+                pages.append(np.repeat(nodes, counts))
+                neighbors.append(ids)
+            yield np.concatenate(pages), np.concatenate(neighbors)
+
+    return blocks
+
+
+def _majority_labels(pages: np.ndarray, labels: np.ndarray,
+                     rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Étiquette la plus fréquente parmi les voisins de chaque page (égalités départagées au hasard)."""
+    order = np.lexsort((labels, pages))
+    pages, labels = pages[order], labels[order]
+    runs = np.flatnonzero(np.r_[True, (pages[1:] != pages[:-1]) | (labels[1:] != labels[:-1])])
+    counts = np.diff(np.r_[runs, len(pages)])
+    pages, labels = pages[runs], labels[runs]
+    order = np.lexsort((-(counts + 0.5 * rng.random(len(counts))), pages))
+    pages, labels = pages[order], labels[order]
+    first = np.r_[True, pages[1:] != pages[:-1]]
+    return pages[first], labels[first]
+
+
+def label_propagation(blocks: NeighborBlocks, n_nodes: int, iterations: int = config.PARTITION_ITERATIONS,
+                      tolerance: float = config.PARTITION_TOLERANCE, seed: int = 0) -> np.ndarray:
+    """
+    Communautés par propagation d'étiquettes : chaque page adopte l'étiquette majoritaire de
+    ses voisins, jusqu'à ce que moins de `tolerance` des pages aient une autre étiquette
+    majoritaire que la leur. Une moitié de ces pages, tirée au hasard, change à chaque passe,
+    ce qui évite les oscillations de la version synchrone. Une passe = une lecture du graphe
+    par blocs. Renvoie des identifiants de communauté consécutifs.
+    """
+    rng = np.random.default_rng(seed)
+    labels = np.arange(n_nodes, dtype=np.int64)
+    for iteration in range(1, iterations + 1):
+        new_labels = labels.copy()
+        unstable = 0
+        for pages, neighbors in blocks():
+            if not len(pages):
+                continue
+            nodes, best = _majority_labels(pages, labels[neighbors], rng)
+            moving = best != labels[nodes]
+            unstable += int(np.count_nonzero(moving))
+            update = moving & (rng.random(len(nodes)) < 0.5)
+            new_labels[nodes[update]] = best[update]
+        labels = new_labels
+        print(f"Propagation {iteration}/{iterations} : {unstable} pages hors de leur communauté majoritaire.")
+        if unstable <= tolerance * n_nodes:
+            break
+    return np.unique(labels, return_inverse=True)[1]
+
+
+def balance_partitions(communities: np.ndarray, n_partitions: int, scores: np.ndarray) -> np.ndarray:
+    """
+    Répartit les communautés en `n_partitions` partitions de tailles proches : la plus grande
+    communauté restante va dans la partition la moins remplie. Une communauté plus grande
+    qu'une partition est découpée en tranches, par score décroissant.
+    """
+    n_nodes = len(communities)
+    sizes = np.bincount(communities)
+    capacity = max(int(np.ceil(n_nodes / n_partitions)), 1)
+    loads = [(0, p) for p in range(n_partitions)]
+    partitions = np.empty(n_nodes, dtype=np.int64)
+    community_partition = np.full(len(sizes), -1, dtype=np.int64)
+    for community in np.argsort(-sizes, kind="stable").tolist():
+        size = int(sizes[community])
+        if size > capacity:
+            nodes = np.flatnonzero(communities == community)
+            nodes = nodes[np.argsort(-scores[nodes], kind="stable")]
+            for start in range(0, size, capacity):
+                load, p = heapq.heappop(loads)
+                partitions[nodes[start:start + capacity]] = p
+                heapq.heappush(loads, (load + len(nodes[start:start + capacity]), p))
+        else:
+            load, p = heapq.heappop(loads)
+            community_partition[community] = p
+            heapq.heappush(loads, (load + size, p))
+    grouped = community_partition[communities] >= 0
+    partitions[grouped] = community_partition[communities[grouped]]
+    return partitions
+
+
+def edge_locality(blocks: NeighborBlocks, partitions: np.ndarray) -> float:
+    """Part des liens dont les deux extrémités sont dans la même partition."""
+    internal, total = 0, 0
+    for pages, neighbors in blocks():
+        internal += int(np.count_nonzero(partitions[pages] == partitions[neighbors]))
+        total += len(pages)
+    return internal / total if total else 1.0
+
+
+def partition_graph(blocks: NeighborBlocks, titles: List[str], scores: np.ndarray, source: str,
+                    n_partitions: int = config.PARTITION_COUNT, path: str = config.PARTITION_PATH) -> Tuple[np.ndarray, Dict]:
+    """
+    Détecte les communautés, les répartit en partitions équilibrées et écrit le placement :
+    pages rangées par partition, puis par communauté, puis par score décroissant.
+    Renvoie (ordre des pages, méta-données) ; `order` sert à renuméroter le graphe compressé.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    communities = label_propagation(blocks, len(titles))
+    partitions = balance_partitions(communities, n_partitions, scores)
+    order = np.lexsort((-scores, communities, partitions))
+    bounds = np.r_[0, np.cumsum(np.bincount(partitions, minlength=n_partitions))]
+    locality = edge_locality(blocks, partitions)
+
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, TITLES_FILE), "w", encoding="utf-8") as f:
+        json.dump([titles[i] for i in order.tolist()], f, ensure_ascii=False)
+    np.save(os.path.join(path, BOUNDS_FILE), bounds)
+    meta = {"partitions": n_partitions, "communities": int(communities.max(initial=-1)) + 1,
+            "pages": len(titles), "edge_locality": locality, "source": source,
+            "version": time.strftime("%Y%m%d-%H%M%S")}
+    with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=4)
+    return order, meta
+
+
+def partition_from_neo4j(driver, n_partitions: int = config.PARTITION_COUNT,
+                         path: str = config.PARTITION_PATH) -> Tuple[np.ndarray, Dict]:
+    """Partitionne le graphe chargé dans Neo4j (le bac à sable), tenu en mémoire."""
+    with driver.session(database="neo4j") as session:
+        records = list(session.run("MATCH (p:Page) RETURN p.title AS title, p.score AS score"))
+        titles = [r["title"] for r in records]
+        scores = np.array([r["score"] or 0.0 for r in records], dtype=np.float64)
+        ids = {title: i for i, title in enumerate(titles)}
+        sources, targets = [], []
+        result = session.run("MATCH (a:Page)-[:LINKS_TO]->(b:Page) RETURN a.title AS a, b.title AS b")
+        for record in tqdm(result, desc="Lecture des liens"):
+            sources.append(ids[record["a"]])
+            targets.append(ids[record["b"]])
+    blocks = csr_neighbor_blocks(np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64), len(titles))
+    return partition_graph(blocks, titles, scores, "neo4j", n_partitions, path)
+
+
+def partition_from_compressed(graph, n_partitions: int = config.PARTITION_COUNT,
+                              path: str = config.PARTITION_PATH) -> Tuple[np.ndarray, Dict]:
+    """
+    Partitionne un graphe compressé (graphe complet) : les voisins sont décodés par blocs à
+    chaque passe, seules les étiquettes (un entier par page) restent en mémoire.
+    `order` est exprimé dans les identifiants actuels du graphe (voir `relayout_compressed_graph`).
+    """
+    blocks = compressed_neighbor_blocks(graph)
+    return partition_graph(blocks, graph.titles, np.asarray(graph.scores), "compressed", n_partitions, path)
+
+
+class Partition:
+    """Placement écrit par `partition_graph` : partition p = titres bounds[p]:bounds[p + 1]."""
+
+    def __init__(self, path: str = config.PARTITION_PATH):
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(os.path.join(path, TITLES_FILE), "r", encoding="utf-8") as f:
+            self.titles: List[str] = json.load(f)
+        self.bounds = np.load(os.path.join(path, BOUNDS_FILE))
+        self.n_partitions = len(self.bounds) - 1
+        self.position = {title: i for i, title in enumerate(self.titles)}
+
+    def partition_of(self, title: str) -> int:
+        """Partition d'une page (-1 si elle est absente du placement)."""
+        position = self.position.get(title)
+        if position is None:
+            return -1
+        return int(np.searchsorted(self.bounds, position, side="right")) - 1
+
+
+def load_partition(path: str = config.PARTITION_PATH) -> Optional[Partition]:
+    if not os.path.exists(os.path.join(path, META_FILE)):
+        return None
+    return Partition(path)
+
+
+def local_mission_indices(missions: List[Dict], worker_index: int,
+                          path: str = config.PARTITION_PATH) -> Optional[np.ndarray]:
+    """
+    Missions dont la page de départ est dans la partition du worker (index du worker modulo le
+    nombre de partitions). None si le placement est absent ou si la partition n'a aucune mission.
+    """
+    partition = load_partition(path)
+    if partition is None:
+        print(f"ATTENTION: aucun placement dans '{path}' (scripts/01f_partition_graph.py), "
+              f"les missions sont tirées dans tout le graphe.")
+        return None
+    home = worker_index % partition.n_partitions
+    indices = np.array([i for i, mission in enumerate(missions) if partition.partition_of(mission["start"]) == home],
+                       dtype=np.int64)
+    print(f"Worker {worker_index} : partition {home}/{partition.n_partitions}, {len(indices)} missions locales.")
+    return indices if len(indices) else None
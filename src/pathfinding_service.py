@@ -0,0 +1,284 @@
+# src/pathfinding_service.py (Service de recherche de chemins par lots autour de la politique entraînée)
+import json
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from . import config
+from .compressed_graph import get_compressed_graph
+from .environment import order_actions
+from .graph import Neo4jGraph
+from .inference import ObservationBuilder, load_policy, observation_mode_of, structural_features_of
+from .search import GuidedSearch
+
+
+class _Job:
+    """Lot de missions soumis par un client ; `done` est signalé quand toutes ses parties sont finies."""
+
+    def __init__(self, missions: List[Tuple[str, str]]):
+        self.missions = missions
+        self.results: List[Optional[Dict]] = [None] * len(missions)
+        self.remaining = len(missions)
+        self.done = threading.Event()
+
+
+class _Game:
+    def __init__(self, job: _Job, index: int, start: str, target: str):
+        self.job = job
+        self.index = index
+        self.target = target
+        self.path = [start]
+        self.visited = {start}
+        self.candidates: List[str] = []
+
+
+class PathfindingService:
+    """
+    Joue de nombreuses parties simultanément avec un seul modèle, un seul graphe (connexion
+    Neo4j ou graphe compressé, selon `GRAPH_BACKEND`) et un seul encodeur, chargés une fois pour toutes.
+
+    Un thread unique fait avancer toutes les parties actives d'un même pas : une lecture
+    des voisins de toutes les pages courantes, un appel à l'encodeur pour les
+    titres jamais vus et un seul `predict` pour le lot. Les missions des différents clients
+    rejoignent le lot dès le pas suivant leur arrivée.
+    """
+
+    def __init__(self, model_path: str, max_steps: int = config.PATHFINDING_MAX_STEPS,
+                 max_batch: int = config.PATHFINDING_MAX_BATCH, max_actions: int = 100,
+                 embedding_cache_size: int = config.PATHFINDING_EMBEDDING_CACHE_SIZE):
+        # Même source des liens que WikiEnv (voir `GRAPH_BACKEND`).
+        self.graph = get_compressed_graph() if config.GRAPH_BACKEND == "COMPRESSED" else Neo4jGraph()
+        self.model = load_policy(model_path)
+        self.observation_mode = observation_mode_of(self.model)
+        self.structural_features = structural_features_of(self.model)
+        self.max_steps = max_steps
+        self.max_batch = max_batch
+        self.max_actions = max_actions
+        self.observations = ObservationBuilder(self.observation_mode, embedding_cache_size,
+                                               structural=self.structural_features)
+
+        # Mode "search" : recherche guidée, une mission à la fois (voir src/search.py).
+        self.searcher = GuidedSearch(self.model, self.graph,
+                                     ObservationBuilder(self.observation_mode, structural=self.structural_features),
+                                     max_depth=max_steps, max_actions=max_actions)
+        self._search_lock = threading.Lock()
+
+        self._jobs: "queue.Queue[_Job]" = queue.Queue()
+        self._waiting: List[_Game] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # --- API ---
+
+    def find_paths(self, missions: List[Tuple[str, str]], timeout: Optional[float] = None) -> List[Dict]:
+        """Résout un lot de missions (départ, cible) et renvoie le chemin complet de chacune."""
+        if not missions:
+            return []
+        job = _Job(missions)
+        self._jobs.put(job)
+        if not job.done.wait(timeout):
+            raise TimeoutError("Les missions n'ont pas été résolues dans le délai imparti.")
+        return job.results
+
+    def search_paths(self, missions: List[Tuple[str, str]], expansion_budget: Optional[int] = None) -> List[Dict]:
+        """Résout les missions par recherche guidée (meilleur chemin trouvé dans le budget)."""
+        results = []
+        invalid = self.invalid_titles([title for mission in missions for title in mission])
+        with self._search_lock:
+            for start, target in missions:
+                error = _unknown_error(start, target, invalid)
+                if error is None:
+                    try:
+                        result = self.searcher.search(start, target, expansion_budget)
+                    except Exception as e:
+                        error = str(e)
+                if error is not None:
+                    result = {"path": None, "success": False, "clicks": None, "error": error}
+                results.append({"start": start, "target": target, **result})
+        return results
+
+    def invalid_titles(self, titles: List[str]) -> Set[str]:
+        """Pages absentes du graphe, ou de la table des nœuds quand le modèle en a besoin."""
+        return self.graph.missing(titles) | self.observations.unknown(titles)
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.graph.close()
+
+    # --- Boucle de jeu ---
+
+    def _observations(self, games: List[_Game]) -> np.ndarray:
+        return self.observations.build([g.path[-1] for g in games], [g.target for g in games],
+                                       [g.path[-2] if len(g.path) >= 2 else None for g in games])
+
+    def _finish(self, game: _Game, success: bool, error: Optional[str] = None) -> None:
+        job = game.job
+        if job.results[game.index] is not None:
+            return
+        job.results[game.index] = {
+            "start": game.path[0],
+            "target": game.target,
+            "path": game.path,
+            "success": success,
+            "clicks": len(game.path) - 1,
+        }
+        if error is not None:
+            job.results[game.index]["error"] = error
+        job.remaining -= 1
+        if job.remaining == 0:
+            job.done.set()
+
+    def _admit_jobs(self, block: bool) -> None:
+        try:
+            job = self._jobs.get(timeout=0.1) if block else self._jobs.get_nowait()
+            while True:
+                self._admit(job)
+                job = self._jobs.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _admit(self, job: _Job) -> None:
+        """Les missions d'un lot dont une page est inconnue sont terminées tout de suite, en échec."""
+        games = [_Game(job, i, start, target) for i, (start, target) in enumerate(job.missions)]
+        try:
+            invalid = self.invalid_titles([title for mission in job.missions for title in mission])
+        except Exception as e:
+            print(f"ERREUR du service de chemins : {e}")
+            for game in games:
+                self._finish(game, success=False, error=str(e))
+            return
+        for game in games:
+            error = _unknown_error(game.path[0], game.target, invalid)
+            if error is None:
+                self._waiting.append(game)
+            else:
+                self._finish(game, success=False, error=error)
+
+    def _run(self) -> None:
+        active: List[_Game] = []
+        while not self._stop.is_set():
+            self._admit_jobs(block=not active and not self._waiting)
+            while self._waiting and len(active) < self.max_batch:
+                game = self._waiting.pop(0)
+                if game.path[0] == game.target:
+                    self._finish(game, success=True)
+                else:
+                    active.append(game)
+            if not active:
+                continue
+
+            try:
+                self._step(active)
+            except Exception as e:
+                # Erreur sur le lot (Neo4j, page absente de la table...) : chaque partie est rejouée
+                # seule, et seules celles qui échouent encore sont terminées.
+                print(f"ERREUR du service de chemins : {e}")
+                for game in active:
+                    if game.job.results[game.index] is not None:
+                        continue
+                    try:
+                        self._step([game])
+                    except Exception as game_error:
+                        self._finish(game, success=False, error=str(game_error))
+            active = [g for g in active if g.job.results[g.index] is None]
+
+    def _step(self, active: List[_Game]) -> None:
+        neighbors = self.graph.neighbors_many([g.path[-1] for g in active])
+        playable = []
+        for game in active:
+            game.candidates = order_actions(neighbors.get(game.path[-1], {}), game.target,
+                                            game.visited, self.max_actions)
+            if game.candidates:
+                playable.append(game)
+            else:
+                self._finish(game, success=False)  # impasse
+        if not playable:
+            return
+
+        masks = np.zeros((len(playable), self.max_actions), dtype=bool)
+        for row, game in enumerate(playable):
+            masks[row, :len(game.candidates)] = True
+        actions, _ = self.model.predict(self._observations(playable), action_masks=masks, deterministic=True)
+
+        for game, action in zip(playable, np.atleast_1d(actions)):
+            next_title = game.candidates[int(action)]
+            game.path.append(next_title)
+            game.visited.add(next_title)
+            if next_title == game.target:
+                self._finish(game, success=True)
+            elif len(game.path) - 1 >= self.max_steps:
+                self._finish(game, success=False)
+
+
+def _unknown_error(start: str, target: str, invalid: Set[str]) -> Optional[str]:
+    unknown = [title for title in (start, target) if title in invalid]
+    return f"page(s) inconnue(s) : {', '.join(unknown)}" if unknown else None
+
+
+class _PathfindingHandler(BaseHTTPRequestHandler):
+    service: PathfindingService = None
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "observation_mode": self.service.observation_mode})
+        else:
+            self._send_json(404, {"error": "route inconnue"})
+
+    def do_POST(self):
+        if self.path != "/paths":
+            self._send_json(404, {"error": "route inconnue"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            missions = [(m["start"], m["target"]) for m in request["missions"]]
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {"error": 'corps attendu : {"missions": [{"start": ..., "target": ...}]}'})
+            return
+        budget = request.get("budget")
+        if budget is not None and (isinstance(budget, bool) or not isinstance(budget, int) or budget <= 0):
+            self._send_json(400, {"error": "`budget` doit être un entier strictement positif"})
+            return
+        try:
+            if request.get("mode", "greedy") == "search":
+                results = self.service.search_paths(missions, budget)
+            else:
+                results = self.service.find_paths(missions, timeout=config.PATHFINDING_TIMEOUT_SECONDS)
+        except TimeoutError as e:
+            self._send_json(504, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self._send_json(200, {"results": results})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(service: PathfindingService, host: str = config.PATHFINDING_HOST,
+          port: int = config.PATHFINDING_PORT) -> None:
+    """
+    API HTTP locale : POST /paths (lot de missions ; `"mode": "search"` et `"budget"` pour la
+    recherche guidée) et GET /health.
+    """
+    handler = type("PathfindingHandler", (_PathfindingHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"Service de chemins à l'écoute sur http://{host}:{port} (POST /paths)")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -0,0 +1,90 @@
+# src/prefetch.py (Préchargement spéculatif des requêtes du prochain clic)
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+import numpy as np
+
+from . import config
+
+
+class Prefetcher:
+    """
+    Cache borné (LRU) de résultats de requêtes, rempli à l'avance par un pool de threads.
+
+    Chaque type de requête ("neighbors", "embedding", "distance"...) est associé à une
+    fonction de chargement. `prefetch` lance le chargement en arrière-plan ; `get` renvoie
+    le résultat en cache, attend un chargement déjà lancé, ou charge directement.
+    """
+
+    def __init__(self, fetchers: Dict[str, Callable[..., Any]], cache_size: int = config.PREFETCH_CACHE_SIZE,
+                 max_workers: int = config.PREFETCH_WORKERS):
+        self.fetchers = fetchers
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._pending: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, key: Tuple, value: Any) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _load(self, key: Tuple) -> Any:
+        try:
+            value = self.fetchers[key[0]](*key[1:])
+        except Exception:
+            with self._lock:
+                self._pending.pop(key, None)
+            raise
+        self._store(key, value)
+        return value
+
+    def prefetch(self, kind: str, *args: Hashable) -> None:
+        key = (kind,) + args
+        with self._lock:
+            if key in self._cache or key in self._pending:
+                return
+            self._pending[key] = self._executor.submit(self._load, key)
+
+    def get(self, kind: str, *args: Hashable) -> Any:
+        key = (kind,) + args
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            future = self._pending.get(key)
+        if future is not None:
+            # Chargement déjà en cours : on attend la fin plutôt que de relancer la requête.
+            self.hits += 1
+            return future.result()
+        self.misses += 1
+        return self._load(key)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def top_k_candidates(probabilities: np.ndarray, candidates: List[str], k: int = config.PREFETCH_TOP_K) -> List[str]:
+    """Les `k` pages que la politique est la plus susceptible de choisir."""
+    order = np.argsort(-probabilities[:len(candidates)])[:k]
+    return [candidates[i] for i in order]
+
+
+def prefetch_likely_moves(env, policy, observation: np.ndarray, k: int = config.PREFETCH_TOP_K) -> None:
+    """Précharge, dans `env`, les pages que la politique a le plus de chances de choisir au prochain pas."""
+    from .inference import action_probabilities
+
+    if env.prefetcher is None or not env.available_actions:
+        return
+    mask = env.action_mask().astype(bool)[None]
+    probabilities = action_probabilities(policy, np.asarray(observation)[None], mask)[0]
+    env.prefetch(top_k_candidates(probabilities, env.available_actions, k))
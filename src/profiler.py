@@ -0,0 +1,169 @@
+# src/profiler.py (Profilage par échantillonnage des piles, à la demande)
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional, Set
+
+from . import config
+
+# Dossier de sortie transmis aux workers (les processus "spawn" héritent de l'environnement).
+PROFILE_DIR_ENV = "WIKIAI_PROFILE_DIR"
+# Sous-dossier où chaque worker profilable inscrit son pid : le learner ne relaie le signal qu'à eux.
+WORKERS_DIR = "workers"
+
+_sampler: Optional["StackSampler"] = None
+
+
+class StackSampler:
+    """
+    Échantillonne les piles d'appels de tous les threads du processus toutes les `interval`
+    secondes, pendant `duration` secondes, depuis un thread d'arrière-plan. Le résultat est
+    écrit au format "collapsed stacks" (une ligne `thread;f1;f2;... nombre`), lisible par
+    flamegraph.pl, speedscope ou inferno.
+
+    Hors des fenêtres d'échantillonnage, le coût est nul ; pendant une fenêtre, il se limite
+    à un parcours des piles toutes les `interval` secondes.
+    """
+
+    def __init__(self, output_dir: str, role: str, interval: float = config.PROFILE_INTERVAL_SECONDS,
+                 duration: float = config.PROFILE_DURATION_SECONDS):
+        self.output_dir = output_dir
+        self.role = role
+        self.interval = interval
+        self.duration = duration
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[object, str] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Lance une fenêtre d'échantillonnage ; sans effet (False) si une fenêtre est en cours."""
+        if self.running:
+            return False
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return True
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        counts: Counter = Counter()
+        samples = 0
+        deadline = time.monotonic() + self.duration
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                counts[";".join(reversed(stack))] += 1
+            samples += 1
+            time.sleep(self.interval)
+        self._write(counts, samples)
+
+    def _write(self, counts: Counter, samples: int) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.output_dir, f"profile-{self.role}-{os.getpid()}-{timestamp}.collapsed")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            for stack, count in sorted(counts.items()):
+                f.write(f"{stack} {count}\n")
+        os.replace(path + ".tmp", path)
+        print(f"Profil {self.role} (pid {os.getpid()}, {samples} échantillons) écrit dans : {path}")
+
+
+def _on_signal(signum, frame) -> None:
+    if _sampler is None:
+        return
+    _sampler.start()
+    # Le processus principal relaie le signal à ses workers : un seul `kill` profile toute la session.
+    # Seuls les enfants inscrits le reçoivent : pour les autres (ex. le cache des requêtes),
+    # l'action par défaut du signal est de les tuer.
+    if _sampler.role == "learner":
+        registered = _registered_workers(_sampler.output_dir)
+        for child in multiprocessing.active_children():
+            if child.pid not in registered:
+                continue
+            try:
+                os.kill(child.pid, signum)
+            except OSError:
+                pass
+
+
+def _registered_workers(output_dir: str) -> Set[int]:
+    try:
+        names = os.listdir(os.path.join(output_dir, WORKERS_DIR))
+    except OSError:
+        return set()
+    return {int(name) for name in names if name.isdigit()}
+
+
+def _register_worker(output_dir: str) -> None:
+    """Inscrit le pid du processus courant parmi ceux auxquels le learner relaie le signal."""
+    directory = os.path.join(output_dir, WORKERS_DIR)
+    os.makedirs(directory, exist_ok=True)
+    open(os.path.join(directory, str(os.getpid())), "w").close()
+
+
+def ignore_profile_signal() -> None:
+    """Ignore le signal de profilage (processus enfants qui n'installent pas le profileur)."""
+    signum = getattr(signal, config.PROFILE_SIGNAL, None)
+    if signum is not None:
+        signal.signal(signum, signal.SIG_IGN)
+
+
+def _periodic(every: float) -> None:
+    while True:
+        time.sleep(every)
+        _sampler.start()
+
+
+def install_profiler(output_dir: Optional[str] = None, role: str = "env") -> Optional[StackSampler]:
+    """
+    Installe le profileur dans le processus courant (une seule fois par processus) :
+
+    - le signal `PROFILE_SIGNAL` (SIGUSR1 par défaut) lance une fenêtre d'échantillonnage ;
+      reçu par le learner, il est relayé à ses workers qui ont installé le profileur ;
+    - avec `PROFILE_EVERY_SECONDS`, une fenêtre est lancée périodiquement.
+
+    Le learner passe le dossier de la session ; les workers le retrouvent dans la variable
+    d'environnement `WIKIAI_PROFILE_DIR`. Sans dossier, rien n'est installé.
+    """
+    global _sampler
+    if _sampler is not None:
+        return _sampler
+    if output_dir is None:
+        output_dir = os.environ.get(PROFILE_DIR_ENV)
+        if not output_dir:
+            return None
+    else:
+        os.environ[PROFILE_DIR_ENV] = output_dir
+
+    _sampler = StackSampler(output_dir, role)
+    signum = getattr(signal, config.PROFILE_SIGNAL, None)
+    if signum is not None and threading.current_thread() is threading.main_thread():
+        signal.signal(signum, _on_signal)
+        if role != "learner":
+            _register_worker(output_dir)
+        else:
+            print(f"Profilage à la demande : kill -{config.PROFILE_SIGNAL.replace('SIG', '')} {os.getpid()}")
+    if config.PROFILE_EVERY_SECONDS:
+        threading.Thread(target=_periodic, args=(config.PROFILE_EVERY_SECONDS,), name="profile-scheduler",
+                         daemon=True).start()
+    return _sampler
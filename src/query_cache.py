@@ -0,0 +1,208 @@
+# src/query_cache.py (Cache des requêtes Neo4j partagé par tous les processus)
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from multiprocessing.managers import BaseManager
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from neo4j import Driver
+
+from . import config
+from .graph import graph_version
+from .profiler import ignore_profile_signal
+
+# Surcoût approximatif d'une entrée (clé, structures de l'OrderedDict), en plus de la valeur.
+ENTRY_OVERHEAD_BYTES = 200
+# Adresse et clé du cache de la session, transmises aux workers (les processus "spawn" héritent
+# de l'environnement). La clé est tirée au hasard à chaque démarrage du cache.
+ADDRESS_ENV = "WIKIAI_QUERY_CACHE_ADDRESS"
+AUTHKEY_ENV = "WIKIAI_QUERY_CACHE_AUTHKEY"
+# Erreurs d'un cache injoignable ou arrêté en cours de route : la requête est alors faite directement.
+_CONNECTION_ERRORS = (ConnectionError, EOFError, BrokenPipeError)
+
+
+class _LRUStore:
+    """
+    Dictionnaire LRU borné par un budget mémoire, hébergé par le processus de cache.
+    Les valeurs sont stockées sérialisées : leur taille est connue exactement.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self.version: Optional[str] = None
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def set_version(self, version: str) -> bool:
+        """Adopte la version du graphe ; une version différente vide le cache (renvoie True)."""
+        with self._lock:
+            if version == self.version:
+                return False
+            self._entries.clear()
+            self._size = 0
+            self.version = version
+            return True
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: bytes) -> None:
+        size = len(value) + ENTRY_OVERHEAD_BYTES
+        if size > self.budget_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous) + ENTRY_OVERHEAD_BYTES
+            self._entries[key] = value
+            self._size += size
+            while self._size > self.budget_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted) + ENTRY_OVERHEAD_BYTES
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"version": self.version, "entries": len(self._entries), "bytes": self._size,
+                    "budget_bytes": self.budget_bytes, "hits": self.hits, "misses": self.misses}
+
+
+_store: Optional[_LRUStore] = None
+
+
+def _init_store(budget_bytes: int) -> None:
+    global _store
+    # Le learner relaie le signal de profilage à ses enfants : le cache ne doit pas en mourir.
+    ignore_profile_signal()
+    _store = _LRUStore(budget_bytes)
+
+
+def _get_store() -> _LRUStore:
+    return _store
+
+
+class _CacheManager(BaseManager):
+    pass
+
+
+_CacheManager.register("get_store", callable=_get_store)
+
+
+class QueryCache:
+    """
+    Client du cache partagé. Transmissible tel quel aux processus enfants : la connexion
+    au processus de cache est rouverte à la demande dans chaque processus (et chaque thread).
+    """
+
+    def __init__(self, address: Tuple[str, int], authkey: bytes):
+        self.address = tuple(address)
+        self.authkey = authkey
+        self._local = threading.local()
+
+    def __getstate__(self):
+        return {"address": self.address, "authkey": self.authkey}
+
+    def __setstate__(self, state):
+        self.__init__(state["address"], state["authkey"])
+
+    @property
+    def store(self):
+        store = getattr(self._local, "store", None)
+        if store is None:
+            manager = _CacheManager(address=self.address, authkey=self.authkey)
+            manager.connect()
+            store = self._local.store = manager.get_store()
+        return store
+
+    def get_or_fetch(self, kind: str, args: Tuple, fetch: Callable[..., Any]) -> Any:
+        """Renvoie le résultat en cache de `fetch(*args)`, ou l'exécute et le met en cache."""
+        key = (kind,) + tuple(args)
+        try:
+            value = self.store.get(key)
+        except _CONNECTION_ERRORS:
+            self._local.store = None
+            return fetch(*args)
+        if value is not None:
+            return pickle.loads(value)
+        result = fetch(*args)
+        try:
+            self.store.put(key, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        except _CONNECTION_ERRORS:
+            self._local.store = None
+        return result
+
+    def set_version(self, version: str) -> bool:
+        return self.store.set_version(version)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.store.stats()
+
+
+_server: Optional[_CacheManager] = None
+
+
+def _session_cache() -> Optional[QueryCache]:
+    """Client du cache de la session (adresse et clé héritées de l'environnement), ou None."""
+    address, authkey = os.environ.get(ADDRESS_ENV), os.environ.get(AUTHKEY_ENV)
+    if not address or not authkey:
+        return None
+    host, port = address.rsplit(":", 1)
+    return QueryCache((host, int(port)), bytes.fromhex(authkey))
+
+
+def start_query_cache(driver: Driver, budget_mb: int = config.QUERY_CACHE_MEMORY_MB) -> QueryCache:
+    """
+    Démarre le processus de cache (s'il ne tourne pas déjà pour cette session) et lui impose la
+    version actuelle du graphe. Le processus de cache s'arrête avec celui qui l'a démarré.
+    """
+    global _server
+    version = graph_version(driver)
+    cache = _session_cache()
+    try:
+        if cache is None:
+            raise ConnectionError
+        cache.stats()
+        print(f"Cache des requêtes Neo4j déjà actif sur {cache.address[0]}:{cache.address[1]}.")
+    except (ConnectionError, OSError):
+        authkey = os.urandom(32)
+        _server = _CacheManager(address=config.QUERY_CACHE_ADDRESS, authkey=authkey)
+        _server.start(initializer=_init_store, initargs=(budget_mb * 1024 * 1024,))
+        cache = QueryCache(_server.address, authkey)
+        os.environ[ADDRESS_ENV] = f"{cache.address[0]}:{cache.address[1]}"
+        os.environ[AUTHKEY_ENV] = authkey.hex()
+        print(f"Cache des requêtes Neo4j démarré ({budget_mb} Mo) sur {cache.address[0]}:{cache.address[1]}.")
+    if cache.set_version(version):
+        print(f"Cache des requêtes Neo4j vidé pour la version {version} du graphe.")
+    return cache
+
+
+def connect_query_cache(driver: Optional[Driver] = None) -> Optional[QueryCache]:
+    """
+    Se rattache au cache démarré par le processus principal (None si le cache est désactivé
+    ou injoignable). Avec `driver`, un cache construit sur une autre version du graphe est ignoré.
+    """
+    if not config.QUERY_CACHE_ENABLED:
+        return None
+    cache = _session_cache()
+    if cache is None:
+        return None
+    try:
+        stats = cache.stats()
+    except (ConnectionError, EOFError, OSError):
+        return None
+    version = graph_version(driver) if driver is not None else stats["version"]
+    if stats["version"] != version:
+        print(f"ATTENTION: le cache des requêtes porte sur la version {stats['version']} du graphe "
+              f"(base : {version}), il est ignoré.")
+        return None
+    return cache
@@ -0,0 +1,383 @@
+# src/remote_env.py (Environnements hébergés sur d'autres machines)
+import pickle
+import socket
+import struct
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import gymnasium as gym
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import VecEnvIndices, VecEnvStepReturn
+
+from . import config
+
+# Protocole : chaque message est un tuple (commande, données) sérialisé avec pickle et précédé
+# de sa longueur sur 4 octets. Pickle exécute du code à la désérialisation : les serveurs ne
+# doivent être joignables que depuis le réseau privé des machines d'entraînement.
+_HEADER = struct.Struct("!I")
+
+
+def _send_msg(sock: socket.socket, message: Any) -> None:
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = bytearray()
+    while len(chunks) < size:
+        chunk = sock.recv(size - len(chunks))
+        if not chunk:
+            raise ConnectionError("Connexion fermée par le pair.")
+        chunks.extend(chunk)
+    return bytes(chunks)
+
+
+def _recv_msg(sock: socket.socket) -> Any:
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return pickle.loads(_recv_exact(sock, size))
+
+
+def parse_endpoint(endpoint: str) -> Tuple[str, int]:
+    host, port = endpoint.rsplit(":", 1)
+    return host, int(port)
+
+
+# --- Côté serveur ---
+class EnvServer:
+    """
+    Héberge plusieurs WikiEnv derrière un socket TCP. Un seul learner est servi à la fois ;
+    s'il se tait plus longtemps que `heartbeat_timeout`, la connexion est abandonnée et le
+    serveur attend qu'il se reconnecte. Les environnements survivent aux déconnexions.
+    """
+
+    def __init__(self, host: str, port: int, env_fns: List[Callable[[], gym.Env]],
+                 vec_env_type: str = "SHARED_MEMORY",
+                 heartbeat_timeout: float = config.REMOTE_HEARTBEAT_TIMEOUT):
+        from .vec_env import build_vec_env
+        self.host = host
+        self.port = port
+        self.heartbeat_timeout = heartbeat_timeout
+        self.vec_env = build_vec_env(env_fns, vec_env_type)
+        self.running = True
+
+    def _handle(self, command: str, data: Any) -> Any:
+        env = self.vec_env
+        if command == "hello":
+            return {"num_envs": env.num_envs, "observation_space": env.observation_space,
+                    "action_space": env.action_space}
+        if command == "ping":
+            return "pong"
+        if command == "reset":
+            for index, (seed, options) in enumerate(data):
+                env._seeds[index] = seed
+                env._options[index] = options
+            obs = env.reset()
+            return obs, list(env.reset_infos), np.stack(env.env_method("action_masks"))
+        if command == "step":
+            obs, rewards, dones, infos = env.step(data)
+            # Les masques partent avec le pas : le learner n'a pas besoin d'un second aller-retour.
+            return obs, rewards, dones, list(infos), np.stack(env.env_method("action_masks"))
+        if command == "env_method":
+            name, args, kwargs, indices = data
+            return env.env_method(name, *args, indices=indices, **kwargs)
+        if command == "get_attr":
+            return env.get_attr(data[0], indices=data[1])
+        if command == "set_attr":
+            return env.set_attr(data[0], data[1], indices=data[2])
+        if command == "has_attr":
+            return env.has_attr(data)
+        if command == "is_wrapped":
+            return env.env_is_wrapped(data[0], indices=data[1])
+        raise NotImplementedError(f"Commande inconnue : {command}")
+
+    def _serve_client(self, conn: socket.socket, address) -> None:
+        conn.settimeout(self.heartbeat_timeout)
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        print(f"Learner connecté depuis {address}.")
+        try:
+            while True:
+                command, data = _recv_msg(conn)
+                if command == "close":
+                    break
+                if command == "shutdown":
+                    self.running = False
+                    break
+                try:
+                    _send_msg(conn, ("ok", self._handle(command, data)))
+                except Exception:
+                    _send_msg(conn, ("error", traceback.format_exc()))
+        except socket.timeout:
+            print(f"Aucun battement de cœur depuis {self.heartbeat_timeout}s : déconnexion de {address}.")
+        except (ConnectionError, OSError) as e:
+            print(f"Connexion perdue avec {address} : {e}")
+        finally:
+            conn.close()
+
+    def serve_forever(self) -> None:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server.bind((self.host, self.port))
+            server.listen(1)
+            server.settimeout(1.0)
+            print(f"Serveur d'environnements ({self.vec_env.num_envs} envs) à l'écoute sur {self.host}:{self.port}.")
+            try:
+                while self.running:
+                    try:
+                        conn, address = server.accept()
+                    except socket.timeout:
+                        continue
+                    self._serve_client(conn, address)
+            finally:
+                self.vec_env.close()
+
+
+# --- Côté learner ---
+class _RemoteEndpoint:
+    """Connexion à un serveur, avec reconnexion automatique et sérialisation des requêtes."""
+
+    def __init__(self, endpoint: str, timeout: float, reconnect_attempts: int):
+        self.endpoint = endpoint
+        self.address = parse_endpoint(endpoint)
+        self.timeout = timeout
+        self.reconnect_attempts = reconnect_attempts
+        self.lock = threading.Lock()
+        self.sock: Optional[socket.socket] = None
+        self.last_activity = time.monotonic()
+        self.num_envs = 0
+        self.offset = 0
+
+    def connect(self) -> dict:
+        delay = 0.5
+        for attempt in range(1, self.reconnect_attempts + 1):
+            try:
+                sock = socket.create_connection(self.address, timeout=self.timeout)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self.sock = sock
+                hello = self._request_unlocked("hello", None)
+                self.num_envs = hello["num_envs"]
+                return hello
+            except OSError as e:
+                self._drop()
+                print(f"Connexion à {self.endpoint} impossible (tentative {attempt}/{self.reconnect_attempts}) : {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, 10.0)
+        raise ConnectionError(f"Serveur d'environnements injoignable : {self.endpoint}")
+
+    def _drop(self) -> None:
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+
+    def _socket(self) -> socket.socket:
+        # Connexion abandonnée (ex. ping du battement de cœur en échec) : même erreur qu'une coupure.
+        if self.sock is None:
+            raise ConnectionError(f"Connexion absente avec {self.endpoint}.")
+        return self.sock
+
+    def send(self, command: str, data: Any) -> None:
+        _send_msg(self._socket(), (command, data))
+        self.last_activity = time.monotonic()
+
+    def receive(self) -> Any:
+        status, payload = _recv_msg(self._socket())
+        self.last_activity = time.monotonic()
+        if status == "error":
+            raise RuntimeError(f"Erreur sur le serveur {self.endpoint} :\n{payload}")
+        return payload
+
+    def _request_unlocked(self, command: str, data: Any) -> Any:
+        self.send(command, data)
+        return self.receive()
+
+    def request(self, command: str, data: Any) -> Any:
+        with self.lock:
+            # Les environnements survivent aux déconnexions côté serveur : on peut se reconnecter avant d'envoyer.
+            if self.sock is None:
+                self.connect()
+            return self._request_unlocked(command, data)
+
+    def close(self) -> None:
+        with self.lock:
+            if self.sock is not None:
+                try:
+                    _send_msg(self.sock, ("close", None))
+                except OSError:
+                    pass
+            self._drop()
+
+
+class RemoteVecEnv(VecEnv):
+    """
+    Environnement vectorisé dont les WikiEnv tournent sur des serveurs distants
+    (scripts/02b_env_server.py). Un pas envoie un seul message groupé par serveur ; les
+    serveurs travaillent en parallèle. Un thread envoie des battements de cœur aux
+    connexions inactives. Si un serveur tombe, on s'y reconnecte et ses épisodes en cours
+    sont terminés comme des troncatures.
+    """
+
+    def __init__(self, endpoints: Sequence[str],
+                 timeout: float = config.REMOTE_HEARTBEAT_TIMEOUT,
+                 heartbeat_interval: float = config.REMOTE_HEARTBEAT_INTERVAL,
+                 reconnect_attempts: int = config.REMOTE_RECONNECT_ATTEMPTS):
+        self.endpoints = [_RemoteEndpoint(e, timeout, reconnect_attempts) for e in endpoints]
+        observation_space, action_space = None, None
+        offset = 0
+        for endpoint in self.endpoints:
+            hello = endpoint.connect()
+            endpoint.offset = offset
+            offset += endpoint.num_envs
+            observation_space, action_space = hello["observation_space"], hello["action_space"]
+            print(f"Serveur {endpoint.endpoint} : {endpoint.num_envs} environnements.")
+
+        super().__init__(offset, observation_space, action_space)
+        self._last_obs = np.zeros((self.num_envs,) + observation_space.shape, dtype=observation_space.dtype)
+        self._masks = np.ones((self.num_envs, int(action_space.n)), dtype=bool)
+        self._actions: Optional[np.ndarray] = None
+        self.closed = False
+
+        self._heartbeat_interval = heartbeat_interval
+        self._stop_heartbeat = threading.Event()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="remote-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop_heartbeat.wait(self._heartbeat_interval / 2):
+            for endpoint in self.endpoints:
+                if time.monotonic() - endpoint.last_activity < self._heartbeat_interval:
+                    continue
+                # Si un pas est en cours, la connexion est active : inutile d'attendre le verrou.
+                if not endpoint.lock.acquire(blocking=False):
+                    continue
+                try:
+                    if endpoint.sock is not None:
+                        endpoint._request_unlocked("ping", None)
+                except (OSError, ConnectionError):
+                    endpoint._drop()
+                finally:
+                    endpoint.lock.release()
+
+    def _slice(self, endpoint: _RemoteEndpoint) -> slice:
+        return slice(endpoint.offset, endpoint.offset + endpoint.num_envs)
+
+    def _recover(self, endpoint: _RemoteEndpoint) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[dict]]:
+        """Se reconnecte à un serveur tombé et clôt ses épisodes en cours comme des troncatures."""
+        print(f"Connexion perdue avec {endpoint.endpoint}, reconnexion...")
+        endpoint._drop()
+        endpoint.connect()
+        terminal_obs = self._last_obs[self._slice(endpoint)].copy()
+        obs, reset_infos, masks = endpoint._request_unlocked("reset", [(None, None)] * endpoint.num_envs)
+        self._masks[self._slice(endpoint)] = masks
+        infos = [{"terminal_observation": terminal_obs[i], "TimeLimit.truncated": True, "remote_reset": True}
+                 for i in range(endpoint.num_envs)]
+        rewards = np.zeros(endpoint.num_envs, dtype=np.float32)
+        dones = np.ones(endpoint.num_envs, dtype=bool)
+        return obs, rewards, dones, infos
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._actions = np.asarray(actions)
+        # Les verrous restent pris jusqu'à `step_wait` (qui les rend), pour que le battement de
+        # cœur ne lise pas la réponse du pas. Sur une erreur imprévue, il n'y aura pas de
+        # `step_wait` : les verrous déjà pris sont rendus ici.
+        acquired = []
+        try:
+            for endpoint in self.endpoints:
+                endpoint.lock.acquire()
+                acquired.append(endpoint)
+                try:
+                    endpoint.send("step", self._actions[self._slice(endpoint)])
+                except (OSError, ConnectionError):
+                    endpoint._drop()
+        except BaseException:
+            for endpoint in acquired:
+                endpoint.lock.release()
+            raise
+
+    def step_wait(self) -> VecEnvStepReturn:
+        all_obs, all_rewards, all_dones, all_infos = [], [], [], []
+        for endpoint in self.endpoints:
+            try:
+                try:
+                    if endpoint.sock is None:
+                        raise ConnectionError("Connexion absente.")
+                    obs, rewards, dones, infos, masks = endpoint.receive()
+                    self._masks[self._slice(endpoint)] = masks
+                except (OSError, ConnectionError):
+                    obs, rewards, dones, infos = self._recover(endpoint)
+            finally:
+                endpoint.lock.release()
+            all_obs.append(obs)
+            all_rewards.append(rewards)
+            all_dones.append(dones)
+            all_infos.extend(infos)
+        self._last_obs = np.concatenate(all_obs)
+        return self._last_obs.copy(), np.concatenate(all_rewards), np.concatenate(all_dones), all_infos
+
+    def reset(self):
+        all_obs, self.reset_infos = [], []
+        for endpoint in self.endpoints:
+            seeds = [(self._seeds[i], self._options[i]) for i in range(endpoint.offset, endpoint.offset + endpoint.num_envs)]
+            with endpoint.lock:
+                try:
+                    obs, reset_infos, masks = endpoint._request_unlocked("reset", seeds)
+                except (OSError, ConnectionError):
+                    endpoint._drop()
+                    endpoint.connect()
+                    obs, reset_infos, masks = endpoint._request_unlocked("reset", seeds)
+            self._masks[self._slice(endpoint)] = masks
+            all_obs.append(obs)
+            self.reset_infos.extend(reset_infos)
+        self._reset_seeds()
+        self._reset_options()
+        self._last_obs = np.concatenate(all_obs)
+        return self._last_obs.copy()
+
+    def _dispatch(self, indices: VecEnvIndices) -> Dict[_RemoteEndpoint, List[int]]:
+        """Regroupe des indices globaux par serveur (en indices locaux)."""
+        grouped: Dict[_RemoteEndpoint, List[int]] = {}
+        for index in self._get_indices(indices):
+            for endpoint in self.endpoints:
+                if endpoint.offset <= index < endpoint.offset + endpoint.num_envs:
+                    grouped.setdefault(endpoint, []).append(index - endpoint.offset)
+                    break
+        return grouped
+
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> List[Any]:
+        if method_name == "action_masks" and not method_args and not method_kwargs:
+            return [self._masks[i].copy() for i in self._get_indices(indices)]
+        results = []
+        for endpoint, local in self._dispatch(indices).items():
+            results.extend(endpoint.request("env_method", (method_name, method_args, method_kwargs, local)))
+        return results
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> List[Any]:
+        results = []
+        for endpoint, local in self._dispatch(indices).items():
+            results.extend(endpoint.request("get_attr", (attr_name, local)))
+        return results
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        for endpoint, local in self._dispatch(indices).items():
+            endpoint.request("set_attr", (attr_name, value, local))
+
+    def has_attr(self, attr_name: str) -> bool:
+        return all(endpoint.request("has_attr", attr_name) for endpoint in self.endpoints)
+
+    def env_is_wrapped(self, wrapper_class, indices: VecEnvIndices = None) -> List[bool]:
+        results = []
+        for endpoint, local in self._dispatch(indices).items():
+            results.extend(endpoint.request("is_wrapped", (wrapper_class, local)))
+        return results
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self._stop_heartbeat.set()
+        for endpoint in self.endpoints:
+            endpoint.close()
+        self.closed = True
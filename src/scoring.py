@@ -0,0 +1,135 @@
+# src/scoring.py (Scores de notoriété des pages, calculés sur tout le graphe des liens)
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from . import config
+
+
+def _link_indices(page_ids: np.ndarray, all_links: List[Tuple[int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Convertit les liens (ID source, ID cible) en indices de lignes dans `page_ids` (trié)."""
+    links = np.array(all_links, dtype=np.int64).reshape(-1, 2)
+    return np.searchsorted(page_ids, links[:, 0]), np.searchsorted(page_ids, links[:, 1])
+
+
+def linear_scores(in_degrees: np.ndarray, out_degrees: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Mélange pondéré des degrés entrant, sortant et de la longueur, chacun normalisé par son maximum."""
+    max_in = max(in_degrees.max(initial=0), 1)
+    max_out = max(out_degrees.max(initial=0), 1)
+    max_len = max(lengths.max(initial=0), 1)
+    return (in_degrees / max_in * config.SCORE_WEIGHT_INDEGREE +
+            out_degrees / max_out * config.SCORE_WEIGHT_OUTDEGREE +
+            lengths / max_len * config.SCORE_WEIGHT_PAGELENGTH)
+
+
+def pagerank(sources: np.ndarray, targets: np.ndarray, n_pages: int, damping: float = config.PAGERANK_DAMPING,
+             tolerance: float = config.PAGERANK_TOLERANCE, max_iterations: int = config.PAGERANK_MAX_ITERATIONS,
+             threads: int = config.PAGERANK_THREADS) -> np.ndarray:
+    """
+    PageRank par itération de la puissance sur la matrice de transition creuse (CSR, une
+    ligne par page cible). La masse des pages sans lien sortant est redistribuée uniformément.
+    Le produit matrice-vecteur est découpé en blocs de lignes calculés en parallèle (scipy
+    libère le GIL). S'arrête quand la variation L1 passe sous `tolerance`.
+    """
+    out_degrees = np.bincount(sources, minlength=n_pages).astype(np.float64)
+    weights = 1.0 / out_degrees[sources]
+    transition = sp.csr_matrix((weights, (targets, sources)), shape=(n_pages, n_pages))
+    dangling = out_degrees == 0
+
+    threads = max(threads or os.cpu_count() or 1, 1)
+    bounds = np.linspace(0, n_pages, threads + 1, dtype=np.int64)
+    blocks = [(start, stop, transition[start:stop]) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        def step(ranks, new_ranks):
+            def multiply(block):
+                start, stop, rows = block
+                new_ranks[start:stop] = rows @ ranks
+            list(executor.map(multiply, blocks))
+
+        return _power_iteration(step, dangling, n_pages, damping, tolerance, max_iterations)
+
+
+def pagerank_streaming(links, out_degrees: np.ndarray, n_pages: int, damping: float = config.PAGERANK_DAMPING,
+                       tolerance: float = config.PAGERANK_TOLERANCE,
+                       max_iterations: int = config.PAGERANK_MAX_ITERATIONS) -> np.ndarray:
+    """
+    PageRank sans matrice en mémoire : chaque itération relit les liens triés sur disque
+    (`LinkFile`, indices de pages) bloc par bloc. Seuls les vecteurs de scores (n_pages) restent
+    en mémoire, pour les dumps dont les liens ne tiennent pas en RAM.
+    """
+    inverse_out = np.divide(1.0, out_degrees, out=np.zeros(n_pages), where=out_degrees > 0)
+
+    def step(ranks, new_ranks):
+        contributions = ranks * inverse_out
+        new_ranks[:] = 0.0
+        for sources, targets in links.iter_blocks():
+            new_ranks += np.bincount(targets, weights=contributions[sources], minlength=n_pages)
+
+    return _power_iteration(step, out_degrees == 0, n_pages, damping, tolerance, max_iterations)
+
+
+def _power_iteration(step: Callable[[np.ndarray, np.ndarray], None], dangling: np.ndarray, n_pages: int,
+                     damping: float, tolerance: float, max_iterations: int) -> np.ndarray:
+    """Itération de la puissance ; `step(ranks, new_ranks)` écrit le produit par la matrice de transition."""
+    ranks = np.full(n_pages, 1.0 / n_pages)
+    new_ranks = np.empty_like(ranks)
+    delta = 0.0
+    for iteration in range(1, max_iterations + 1):
+        step(ranks, new_ranks)
+        teleport = (1.0 - damping + damping * ranks[dangling].sum()) / n_pages
+        new_ranks *= damping
+        new_ranks += teleport
+        delta = np.abs(new_ranks - ranks).sum()
+        ranks, new_ranks = new_ranks, ranks
+        if delta < tolerance:
+            print(f"PageRank convergé en {iteration} itérations (variation L1 : {delta:.2e}).")
+            break
+    else:
+        print(f"ATTENTION: PageRank non convergé après {max_iterations} itérations (variation L1 : {delta:.2e}).")
+    return ranks
+
+
+def compute_page_scores(page_data: Dict[int, dict], all_links: List[Tuple[int, int]],
+                        mode: str = config.SCORE_MODE) -> Dict[int, float]:
+    """
+    Score de notoriété de chaque page, utilisé pour choisir les graines de la boule de neige
+    et pour ordonner les actions. "LINEAR" : mélange pondéré des degrés et de la longueur.
+    "PAGERANK" : PageRank du graphe complet des liens, ramené à un maximum de 1.
+    """
+    page_ids = np.fromiter(page_data.keys(), dtype=np.int64, count=len(page_data))
+    page_ids.sort()
+    sources, targets = _link_indices(page_ids, all_links)
+    n_pages = len(page_ids)
+
+    if mode == "LINEAR":
+        lengths = np.fromiter((page_data[pid]["length"] for pid in page_ids), dtype=np.float64, count=n_pages)
+        scores = linear_scores(np.bincount(targets, minlength=n_pages), np.bincount(sources, minlength=n_pages),
+                               np.maximum(lengths, 0))
+    elif mode == "PAGERANK":
+        scores = pagerank(sources, targets, n_pages)
+        scores /= max(scores.max(initial=0), 1e-300)
+    else:
+        raise ValueError(f"Mode de score inconnu: {mode}")
+    return dict(zip(page_ids.tolist(), scores.tolist()))
+
+
+def compute_page_scores_streaming(links, lengths: np.ndarray, mode: str = config.SCORE_MODE) -> np.ndarray:
+    """
+    Équivalent de `compute_page_scores` pour les liens triés sur disque (`LinkFile`, indices de
+    pages) : les degrés et le PageRank sont calculés par passes successives sur le fichier.
+    Renvoie un tableau de scores indexé comme `lengths`.
+    """
+    from .external_links import streaming_degrees
+
+    n_pages = len(lengths)
+    in_degrees, out_degrees = streaming_degrees(links, n_pages)
+    if mode == "LINEAR":
+        return linear_scores(in_degrees, out_degrees, np.maximum(np.asarray(lengths, dtype=np.float64), 0))
+    if mode == "PAGERANK":
+        scores = pagerank_streaming(links, out_degrees, n_pages)
+        return scores / max(scores.max(initial=0), 1e-300)
+    raise ValueError(f"Mode de score inconnu: {mode}")
@@ -0,0 +1,186 @@
+# src/search.py (Recherche de chemin guidée par la politique, avec budget d'expansions)
+import heapq
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import config
+from .environment import order_actions
+from .inference import ObservationBuilder, action_probabilities, observation_mode_of, structural_features_of
+
+
+class _Node:
+    __slots__ = ("title", "parent", "cost", "depth")
+
+    def __init__(self, title: str, parent: Optional["_Node"], cost: float, depth: int):
+        self.title = title
+        self.parent = parent
+        self.cost = cost
+        self.depth = depth
+
+    def path(self) -> List[str]:
+        titles, node = [], self
+        while node is not None:
+            titles.append(node.title)
+            node = node.parent
+        return titles[::-1]
+
+
+def _result(path: Optional[List[str]], expansions: int, start_time: float, bound_expansions: int = 0) -> Dict:
+    # `expansions` compte aussi les pages lues par le parcours inverse de la borne.
+    return {
+        "path": path,
+        "success": path is not None,
+        "clicks": len(path) - 1 if path else None,
+        "expansions": expansions + bound_expansions,
+        "bound_expansions": bound_expansions,
+        "latency_s": time.perf_counter() - start_time,
+    }
+
+
+class GuidedSearch:
+    """
+    Recherche meilleur-d'abord dont la priorité est le coût -log P du chemin sous la
+    politique (le produit des probabilités des clics), éventuellement augmenté d'une borne
+    inférieure de la distance restante pondérée par `bound_weight`.
+
+    La borne vient d'un parcours inverse depuis la cible : les pages à au plus
+    `bound_depth` clics ont leur distance exacte, les autres au moins un clic de plus que le
+    dernier niveau parcouru. Le parcours est limité à `bound_max_pages` pages, gardé en
+    mémoire pour les `bound_cache_size` dernières cibles, et compté dans les expansions.
+    Le budget limite le nombre de pages développées ; `batch_expansions` pages sont
+    développées ensemble (une requête Neo4j et un appel au modèle pour le lot).
+    """
+
+    def __init__(self, policy, graph, observations: Optional[ObservationBuilder] = None,
+                 expansion_budget: int = config.SEARCH_EXPANSION_BUDGET,
+                 bound_weight: float = config.SEARCH_BOUND_WEIGHT,
+                 bound_depth: int = config.SEARCH_BOUND_DEPTH,
+                 bound_max_pages: int = config.SEARCH_BOUND_MAX_PAGES,
+                 bound_cache_size: int = config.SEARCH_BOUND_CACHE_SIZE,
+                 batch_expansions: int = config.SEARCH_BATCH_EXPANSIONS,
+                 max_depth: int = 25, max_actions: int = 100):
+        self.policy = policy
+        self.graph = graph
+        self.observations = observations or ObservationBuilder(observation_mode_of(policy),
+                                                               structural=structural_features_of(policy))
+        self.expansion_budget = expansion_budget
+        self.bound_weight = bound_weight
+        self.bound_depth = bound_depth
+        self.bound_max_pages = bound_max_pages
+        self.bound_cache_size = bound_cache_size
+        self._bounds: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self.batch_expansions = batch_expansions
+        self.max_depth = max_depth
+        self.max_actions = max_actions
+
+    def _distance_bound(self, target: str) -> Tuple[Callable[[str], int], int]:
+        """Borne inférieure de la distance à `target`, et pages lues pour la calculer (0 si en cache)."""
+        if self.bound_weight <= 0:
+            return (lambda title: 0), 0
+        distances = self._bounds.get(target)
+        expanded = 0
+        if distances is None:
+            distances, expanded = self.graph.predecessors_within(target, self.bound_depth, self.bound_max_pages)
+            self._bounds[target] = distances
+            if len(self._bounds) > self.bound_cache_size:
+                self._bounds.popitem(last=False)
+        else:
+            self._bounds.move_to_end(target)
+        beyond = max(distances.values()) + 1
+        return (lambda title: distances.get(title, beyond)), expanded
+
+    def search(self, start: str, target: str, expansion_budget: Optional[int] = None) -> Dict:
+        start_time = time.perf_counter()
+        budget = expansion_budget or self.expansion_budget
+        if start == target:
+            return _result([start], 0, start_time)
+
+        bound, bound_expansions = self._distance_bound(target)
+        counter = 0
+        frontier = [(0.0, counter, _Node(start, None, 0.0, 0))]
+        closed = set()
+        expansions = 0
+
+        while frontier and expansions < budget:
+            batch: List[_Node] = []
+            while frontier and len(batch) < min(self.batch_expansions, budget - expansions):
+                _, _, node = heapq.heappop(frontier)
+                if node.title not in closed and node.depth < self.max_depth:
+                    closed.add(node.title)
+                    batch.append(node)
+            if not batch:
+                continue
+            expansions += len(batch)
+
+            neighbors = self.graph.neighbors_many([node.title for node in batch])
+            expandable, candidates = [], []
+            for node in batch:
+                path = node.path()
+                actions = order_actions(neighbors.get(node.title, {}), target, set(path), self.max_actions)
+                if actions and actions[0] == target:
+                    return _result(path + [target], expansions, start_time, bound_expansions)
+                if actions:
+                    expandable.append(node)
+                    candidates.append(actions)
+            if not expandable:
+                continue
+
+            observations = self.observations.build(
+                [node.title for node in expandable], [target] * len(expandable),
+                [node.parent.title if node.parent else None for node in expandable])
+            masks = np.zeros((len(expandable), self.max_actions), dtype=bool)
+            for row, actions in enumerate(candidates):
+                masks[row, :len(actions)] = True
+            probabilities = action_probabilities(self.policy, observations, masks)
+
+            for node, actions, probs in zip(expandable, candidates, probabilities):
+                for action, title in enumerate(actions):
+                    if title in closed:
+                        continue
+                    cost = node.cost - math.log(max(float(probs[action]), 1e-12))
+                    counter += 1
+                    child = _Node(title, node, cost, node.depth + 1)
+                    heapq.heappush(frontier, (cost + self.bound_weight * bound(title), counter, child))
+
+        return _result(None, expansions, start_time, bound_expansions)
+
+
+def bfs_search(graph, start: str, target: str, expansion_budget: int = config.SEARCH_EXPANSION_BUDGET,
+               batch_expansions: int = config.SEARCH_BATCH_EXPANSIONS) -> Dict:
+    """Parcours en largeur de référence : chemin le plus court si la cible est atteinte dans le budget."""
+    start_time = time.perf_counter()
+    if start == target:
+        return _result([start], 0, start_time)
+    parents = {start: None}
+    layer = [start]
+    expansions = 0
+
+    def path_to(title: str) -> List[str]:
+        titles = []
+        while title is not None:
+            titles.append(title)
+            title = parents[title]
+        return titles[::-1]
+
+    while layer and expansions < expansion_budget:
+        next_layer = []
+        for i in range(0, len(layer), batch_expansions):
+            chunk = layer[i:i + min(batch_expansions, expansion_budget - expansions)]
+            if not chunk:
+                break
+            expansions += len(chunk)
+            neighbors = graph.neighbors_many(chunk)
+            for title in chunk:
+                for next_title in neighbors.get(title, {}):
+                    if next_title in parents:
+                        continue
+                    parents[next_title] = title
+                    if next_title == target:
+                        return _result(path_to(next_title), expansions, start_time)
+                    next_layer.append(next_title)
+        layer = next_layer
+    return _result(None, expansions, start_time)
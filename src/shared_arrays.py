@@ -0,0 +1,50 @@
+# src/shared_arrays.py (Tableaux numpy en mémoire partagée entre processus)
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+class SharedArray:
+    """
+    Tableau numpy adossé à un segment de mémoire partagée.
+    Le processus qui le crée en est propriétaire (il le détruit à la fermeture) ; les autres
+    s'y rattachent par son nom, ce qui rend l'objet transmissible tel quel aux processus enfants.
+    """
+
+    def __init__(self, shape: Sequence[int], dtype, name: Optional[str] = None):
+        self.shape = tuple(int(n) for n in shape)
+        self.dtype = np.dtype(dtype)
+        self._owner = name is None
+        size = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+        self._shm = SharedMemory(name=name, create=self._owner, size=size)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)
+        if self._owner:
+            self.array.fill(0)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def __reduce__(self):
+        # Seul le nom du segment voyage : le processus receveur s'y rattache sans copie.
+        return SharedArray, (self.shape, self.dtype.str, self._shm.name)
+
+    def __getitem__(self, item):
+        return self.array[item]
+
+    def __setitem__(self, item, value):
+        self.array[item] = value
+
+    def close(self) -> None:
+        if self._shm is None:
+            return
+        self.array = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # Une vue numpy est encore utilisée ailleurs : le segment sera libéré avec elle.
+            pass
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
@@ -1,50 +1,206 @@
 # stats.py
+import argparse
+import glob
+import json
+import os
+
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
-STATS_LOG_PATH = "training_stats_offline_test.jsonl"
+from . import config
+
+STATE_FILE = "stats_state.json"
+COLUMNS = ["success", "steps", "reward", "distance", "total_timesteps"]
+# Sommes tenues à jour pour chaque fenêtre de pas de temps.
+AGGREGATES = ["episodes", "successes", "steps", "steps_success", "reward", "gap", "gap_count"]
+
+
+def latest_episodes_dir() -> str:
+    """Dossier d'épisodes de la session d'entraînement la plus récente (logs/<nom>/episodes)."""
+    candidates = glob.glob(os.path.join(config.LOGS_PATH, "*", "episodes"))
+    return max(candidates, key=os.path.getmtime) if candidates else ""
+
+
+class IncrementalStats:
+    """
+    Agrégats des épisodes par fenêtre de `window` pas de temps, mis à jour de façon
+    incrémentale : les positions déjà lues de chaque fichier sont mémorisées dans
+    `stats_state.json`, et seul ce qui a été ajouté depuis est lu, par morceaux.
+    La mémoire utilisée ne dépend pas de la taille des journaux.
+    """
+
+    def __init__(self, log_path: str, window: int = config.STATS_WINDOW_TIMESTEPS, chunk_lines: int = 100_000):
+        self.log_path = log_path
+        self.chunk_lines = chunk_lines
+        state_dir = log_path if os.path.isdir(log_path) else os.path.dirname(log_path) or "."
+        self.state_path = os.path.join(state_dir, STATE_FILE)
+        self.state = {"window": window, "offsets": {}, "windows": {}}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            # Un changement de taille de fenêtre oblige à tout relire.
+            if state.get("window") == window:
+                self.state = state
+        self.window = window
+
+    def reset(self) -> None:
+        self.state = {"window": self.window, "offsets": {}, "windows": {}}
+
+    def _files(self):
+        if os.path.isfile(self.log_path):
+            return [self.log_path]
+        return sorted(glob.glob(os.path.join(self.log_path, "episodes-*.jsonl")) +
+                      glob.glob(os.path.join(self.log_path, "episodes-*.parquet")))
+
+    def _add(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        df = df.reindex(columns=COLUMNS)
+        df["success"] = df["success"].fillna(False).astype(bool)
+        steps_success = df["steps"].where(df["success"], 0)
+        # Écart à l'optimal : clics en trop sur les parties réussies dont la distance est connue.
+        has_gap = df["success"] & df["distance"].notna() & (df["distance"] > 0)
+        gap = (df["steps"] - df["distance"]).where(has_gap, 0)
+        grouped = pd.DataFrame({
+            "window": (df["total_timesteps"] // self.window).astype(np.int64),
+            "episodes": 1,
+            "successes": df["success"].astype(int),
+            "steps": df["steps"],
+            "steps_success": steps_success,
+            "reward": df["reward"],
+            "gap": gap,
+            "gap_count": has_gap.astype(int),
+        }).groupby("window").sum()
+
+        windows = self.state["windows"]
+        for window, row in grouped.iterrows():
+            entry = windows.setdefault(str(window), {name: 0 for name in AGGREGATES})
+            for name in AGGREGATES:
+                entry[name] += float(row[name])
+
+    def _update_jsonl(self, path: str) -> int:
+        offset = self.state["offsets"].get(path, 0)
+        new_rows = 0
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while True:
+                lines = f.readlines(self.chunk_lines * 200)
+                if not lines:
+                    break
+                # Une dernière ligne sans "\n" est en cours d'écriture : elle sera lue au prochain passage.
+                if not lines[-1].endswith(b"\n"):
+                    f.seek(-len(lines[-1]), os.SEEK_CUR)
+                    lines = lines[:-1]
+                    if not lines:
+                        break
+                rows = [json.loads(line) for line in lines if line.strip()]
+                self._add(pd.DataFrame.from_records(rows, columns=COLUMNS))
+                new_rows += len(rows)
+                offset = f.tell()
+        self.state["offsets"][path] = offset
+        return new_rows
 
-def analyze_stats():
-    try:
-        # Lire le fichier jsonl ligne par ligne dans un DataFrame pandas
-        df = pd.read_json(STATS_LOG_PATH, lines=True)
-    except FileNotFoundError:
-        print(f"Le fichier de log '{STATS_LOG_PATH}' n'a pas été trouvé. Lancez d'abord l'entraînement.")
+    def _update_parquet(self, path: str) -> int:
+        import pyarrow.parquet as pq
+
+        try:
+            parquet_file = pq.ParquetFile(path)
+        except Exception:
+            return 0  # Fichier encore ouvert par l'enregistreur (pied de page absent).
+        done = self.state["offsets"].get(path, 0)
+        new_rows = 0
+        for group in range(done, parquet_file.num_row_groups):
+            df = parquet_file.read_row_group(group, columns=COLUMNS).to_pandas()
+            self._add(df)
+            new_rows += len(df)
+        self.state["offsets"][path] = parquet_file.num_row_groups
+        return new_rows
+
+    def update(self) -> int:
+        """Lit les épisodes ajoutés depuis le dernier passage et renvoie leur nombre."""
+        new_rows = 0
+        for path in self._files():
+            if path.endswith(".parquet"):
+                new_rows += self._update_parquet(path)
+            else:
+                new_rows += self._update_jsonl(path)
+        with open(self.state_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(self.state_path + ".tmp", self.state_path)
+        return new_rows
+
+    def windows(self) -> pd.DataFrame:
+        """Une ligne par fenêtre de pas de temps, avec les métriques dérivées des sommes."""
+        if not self.state["windows"]:
+            return pd.DataFrame(columns=AGGREGATES)
+        df = pd.DataFrame.from_dict(self.state["windows"], orient="index")
+        df.index = df.index.astype(int) * self.window
+        df.index.name = "timesteps"
+        return df.sort_index()
+
+
+def summarize(df: pd.DataFrame) -> pd.DataFrame:
+    episodes = df["episodes"].replace(0, np.nan)
+    return pd.DataFrame({
+        "episodes": df["episodes"].astype(int),
+        "success_rate": df["successes"] / episodes * 100,
+        "mean_clicks": df["steps"] / episodes,
+        "mean_clicks_success": df["steps_success"] / df["successes"].replace(0, np.nan),
+        "mean_reward": df["reward"] / episodes,
+        "optimality_gap": df["gap"] / df["gap_count"].replace(0, np.nan),
+    })
+
+
+def analyze_stats(log_path: str = None, window: int = config.STATS_WINDOW_TIMESTEPS, reset: bool = False,
+                  plot: bool = False):
+    log_path = log_path or latest_episodes_dir()
+    if not log_path or not os.path.exists(log_path):
+        print(f"Le journal d'épisodes '{log_path}' n'a pas été trouvé. Lancez d'abord l'entraînement.")
         return
-    except ValueError:
-        print("Le fichier de log est vide ou mal formé.")
+
+    stats = IncrementalStats(log_path, window)
+    if reset:
+        stats.reset()
+    new_rows = stats.update()
+    windows = stats.windows()
+    if windows.empty:
+        print("Le journal d'épisodes est vide.")
         return
 
-    print("--- Statistiques Générales ---")
-    total_episodes = len(df)
-    print(f"Nombre total de parties jouées : {total_episodes}")
-
-    success_rate = (df['success'].sum() / total_episodes) * 100 if total_episodes > 0 else 0
-    print(f"Taux de réussite : {success_rate:.2f}%")
-
-    avg_steps = df['steps'].mean()
-    print(f"Nombre de clics moyen (toutes parties) : {avg_steps:.2f}")
-
-    avg_steps_success = df[df['success']]['steps'].mean()
-    print(f"Nombre de clics moyen (parties réussies) : {avg_steps_success:.2f}")
-
-    print("\n--- Analyse des Progrès ---")
-    # On groupe les résultats par tranche de 10% de l'entraînement
-    df['training_chunk'] = pd.cut(df['total_timesteps'], bins=10)
-    progress = df.groupby('training_chunk')['success'].mean() * 100
-    print("Taux de réussite par phase d'entraînement :")
-    print(progress)
-
-    # Créer un graphique
-    plt.figure(figsize=(12, 6))
-    progress.plot(kind='bar', color='skyblue')
-    plt.title("Progression du Taux de Réussite de l'IA")
-    plt.xlabel("Phase d'entraînement (pas de temps)")
-    plt.ylabel("Taux de Réussite (%)")
-    plt.xticks(rotation=45)
-    plt.grid(axis='y', linestyle='--')
-    plt.tight_layout()
-    plt.show()
+    totals = summarize(windows.sum().to_frame().T).iloc[0]
+    print(f"--- Statistiques Générales ({log_path}, {new_rows} nouveaux épisodes lus) ---")
+    print(f"Nombre total de parties jouées : {int(totals['episodes'])}")
+    print(f"Taux de réussite : {totals['success_rate']:.2f}%")
+    print(f"Nombre de clics moyen (toutes parties) : {totals['mean_clicks']:.2f}")
+    print(f"Nombre de clics moyen (parties réussies) : {totals['mean_clicks_success']:.2f}")
+    print(f"Récompense moyenne : {totals['mean_reward']:.2f}")
+    print(f"Écart moyen au plus court chemin (parties réussies) : {totals['optimality_gap']:.2f}")
+
+    print(f"\n--- Analyse des Progrès (fenêtres de {window} pas) ---")
+    progress = summarize(windows)
+    print(progress.round(2).to_string())
+
+    if plot:
+        import matplotlib.pyplot as plt
+
+        # Créer un graphique
+        plt.figure(figsize=(12, 6))
+        progress["success_rate"].plot(kind='bar', color='skyblue')
+        plt.title("Progression du Taux de Réussite de l'IA")
+        plt.xlabel("Phase d'entraînement (pas de temps)")
+        plt.ylabel("Taux de Réussite (%)")
+        plt.xticks(rotation=45)
+        plt.grid(axis='y', linestyle='--')
+        plt.tight_layout()
+        plt.show()
+
 
 if __name__ == "__main__":
-    analyze_stats()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Analyse incrémentale des épisodes d'entraînement.")
+    parser.add_argument("log_path", nargs="?", help="Dossier logs/<nom>/episodes ou fichier .jsonl "
+                                                    "(par défaut : la session la plus récente).")
+    parser.add_argument("--window", type=int, default=config.STATS_WINDOW_TIMESTEPS)
+    parser.add_argument("--reset", action="store_true", help="Ignore l'état mémorisé et relit tout.")
+    parser.add_argument("--plot", action="store_true")
+    args = parser.parse_args()
+    analyze_stats(args.log_path, args.window, args.reset, args.plot)
@@ -0,0 +1,110 @@
+# src/structure.py (Embeddings structurels des pages : position dans le graphe des liens)
+import os
+from typing import List, Optional
+
+import numpy as np
+import scipy.sparse as sp
+from neo4j import Driver
+from scipy.sparse.linalg import svds
+from tqdm import tqdm
+
+from . import config
+from .node_table import NodeTable
+
+STRUCTURE_FILE = "structure.npy"
+
+
+def spectral_embeddings(sources: np.ndarray, targets: np.ndarray, n_nodes: int,
+                        dim: int = config.STRUCTURAL_DIM) -> np.ndarray:
+    """
+    SVD tronquée de la matrice d'adjacence normalisée D_out^-1/2 A D_in^-1/2 (la normalisation
+    empêche les pages très liées d'écraser les autres composantes). Chaque page reçoit
+    2 x `dim` valeurs : sa position comme source (U·√S) puis comme cible (V·√S), chaque
+    colonne ramenée à une variance unité pour servir directement d'entrée au réseau.
+    """
+    adjacency = sp.csr_matrix((np.ones(len(sources), dtype=np.float64), (sources, targets)),
+                              shape=(n_nodes, n_nodes))
+    adjacency.data[:] = 1.0  # Liens en double sommés par scipy : on revient à 0/1.
+    out_degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+    in_degrees = np.asarray(adjacency.sum(axis=0)).ravel()
+    scale_out = np.divide(1.0, np.sqrt(out_degrees), out=np.zeros(n_nodes), where=out_degrees > 0)
+    scale_in = np.divide(1.0, np.sqrt(in_degrees), out=np.zeros(n_nodes), where=in_degrees > 0)
+    normalized = sp.diags(scale_out) @ adjacency @ sp.diags(scale_in)
+
+    embeddings = np.zeros((n_nodes, 2 * dim), dtype=np.float32)
+    k = min(dim, n_nodes - 1)
+    if k < 1 or normalized.nnz == 0:
+        return embeddings
+    # Vecteur de départ fixé : deux constructions sur le même graphe donnent les mêmes embeddings.
+    u, s, vt = svds(normalized, k=k, v0=np.ones(n_nodes) / np.sqrt(n_nodes))
+    order = np.argsort(-s)
+    u, s, v = u[:, order], s[order], vt[order].T
+    # Le signe d'un vecteur singulier est arbitraire : la plus grande composante est rendue positive.
+    signs = np.sign(u[np.abs(u).argmax(axis=0), np.arange(k)])
+    signs[signs == 0] = 1.0
+    u, v = u * signs, v * signs
+
+    roots = np.sqrt(s)
+    embeddings[:, :k] = u * roots
+    embeddings[:, dim:dim + k] = v * roots
+    std = embeddings.std(axis=0)
+    embeddings /= np.where(std > 0, std, 1.0)
+    return embeddings
+
+
+def build_structural_embeddings(driver: Driver, path: str = config.NODE_TABLE_PATH,
+                                dim: int = config.STRUCTURAL_DIM) -> int:
+    """
+    Calcule les embeddings structurels de toutes les pages du bac à sable et les écrit dans
+    la table des nœuds (`structure.npy`, mêmes identifiants que `vectors.npy`, ligne 0 nulle).
+    """
+    table = NodeTable(path)
+    with driver.session(database="neo4j") as session:
+        result = session.run("MATCH (a:Page)-[:LINKS_TO]->(b:Page) RETURN a.title AS a, b.title AS b")
+        sources, targets = [], []
+        for record in tqdm(result, desc="Lecture des liens"):
+            sources.append(table.id_of(record["a"]))
+            targets.append(table.id_of(record["b"]))
+    print(f"{len(sources)} liens entre {len(table) - 1} pages.")
+
+    # Les identifiants de la table commencent à 1 : la ligne 0 ("aucune page") n'a aucun lien.
+    embeddings = spectral_embeddings(np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64),
+                                     len(table), dim)
+    embeddings[0] = 0.0
+    output = os.path.join(path, STRUCTURE_FILE)
+    with open(output + ".tmp", "wb") as f:
+        np.save(f, embeddings)
+    os.replace(output + ".tmp", output)
+    return len(table) - 1
+
+
+def load_structure(path: str = config.NODE_TABLE_PATH) -> np.ndarray:
+    """Embeddings structurels, mappés en mémoire (une ligne par identifiant de la table des nœuds)."""
+    output = os.path.join(path, STRUCTURE_FILE)
+    if not os.path.exists(output):
+        raise FileNotFoundError(f"'{output}' introuvable. Lancez scripts/01e_build_structural_embeddings.py "
+                                f"après la table des nœuds.")
+    return np.load(output, mmap_mode="r")
+
+
+class StructuralFeatures:
+    """
+    Accès par titre aux embeddings structurels, pour les observations en mode "VECTOR" :
+    une lecture de lignes dans le fichier mappé, aucun calcul par pas.
+    """
+
+    def __init__(self, path: str = config.NODE_TABLE_PATH):
+        self.node_table = NodeTable(path)
+        self.vectors = load_structure(path)
+        if len(self.vectors) != len(self.node_table):
+            raise ValueError(f"'{STRUCTURE_FILE}' ({len(self.vectors)} lignes) ne correspond pas à la table des "
+                             f"nœuds ({len(self.node_table)} lignes). Relancez scripts/01e_build_structural_embeddings.py.")
+
+    @property
+    def size(self) -> int:
+        return self.vectors.shape[1]
+
+    def of(self, titles: List[Optional[str]]) -> np.ndarray:
+        """Concaténation des vecteurs des pages données (vecteur nul pour None)."""
+        ids = [self.node_table.id_of(title) for title in titles]
+        return np.asarray(self.vectors[ids], dtype=np.float32).reshape(-1)
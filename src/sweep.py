@@ -0,0 +1,185 @@
+# src/sweep.py (Balayage d'hyperparamètres PPO par successive halving)
+import csv
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from . import config
+
+RESULTS_FILE = "results.csv"
+TRIALS_FILE = "trials.json"
+METRIC_COLUMNS = ["success_rate", "mean_clicks", "mean_clicks_success", "optimality_gap"]
+
+
+def sample_hyperparameters(space: Dict, rng: random.Random) -> Dict:
+    """Tire un jeu d'hyperparamètres dans l'espace de recherche (voir `SWEEP_SPACE`)."""
+    params = {}
+    for name, spec in space.items():
+        if isinstance(spec, tuple) and spec[0] == "log":
+            params[name] = math.exp(rng.uniform(math.log(spec[1]), math.log(spec[2])))
+        elif isinstance(spec, tuple) and spec[0] == "uniform":
+            params[name] = rng.uniform(spec[1], spec[2])
+        else:
+            params[name] = rng.choice(list(spec))
+    return params
+
+
+def trial_score(metrics: Dict) -> Tuple[float, float]:
+    """Clé de classement : taux de réussite, puis moins de clics."""
+    if not metrics or "success_rate" not in metrics:
+        return -1.0, 0.0
+    return metrics["success_rate"], -metrics["mean_clicks"]
+
+
+def _run_trial(trial_id: int, params: Dict, timesteps: int, directory: str, missions: List[Dict],
+               threads: int, n_envs: int) -> Dict:
+    """
+    Exécuté dans un processus du pool : prolonge l'entraînement de l'essai jusqu'à
+    `timesteps` pas cumulés (reprise depuis son modèle du palier précédent), puis l'évalue.
+    Les environnements tournent dans le processus de l'essai : chaque essai occupe `threads` cœurs.
+    """
+    import torch
+    from sb3_contrib import MaskablePPO
+    from stable_baselines3.common.vec_env import DummyVecEnv
+
+    from .environment import WikiEnv
+    from .evaluation import play_missions, summarize_results
+    from .training import create_model
+    from .vec_env import make_env
+
+    torch.set_num_threads(threads)
+    model_path = os.path.join(directory, f"trial_{trial_id:03d}.zip")
+    env = DummyVecEnv([make_env] * n_envs)
+    try:
+        if os.path.exists(model_path):
+            model = MaskablePPO.load(model_path, env=env, device="cpu")
+        else:
+            model = create_model(env, tensorboard_log=os.path.join(directory, "tensorboard"), verbose=0,
+                                 hyperparameters=params)
+        start_time = time.perf_counter()
+        remaining = timesteps - model.num_timesteps
+        if remaining > 0:
+            model.learn(total_timesteps=remaining, reset_num_timesteps=False, tb_log_name=f"trial_{trial_id:03d}")
+        train_seconds = time.perf_counter() - start_time
+        model.save(model_path)
+    finally:
+        env.close()
+
+    envs = [WikiEnv() for _ in range(n_envs)]
+    try:
+        start_time = time.perf_counter()
+        metrics = summarize_results(play_missions(model, envs, missions), time.perf_counter() - start_time)
+    finally:
+        for eval_env in envs:
+            eval_env.close()
+    return {"trial": trial_id, "timesteps": int(model.num_timesteps), "train_seconds": train_seconds, **metrics}
+
+
+class _ResultsTable:
+    """Table des résultats (un essai par palier et par ligne), écrite au fil de l'eau."""
+
+    def __init__(self, path: str, param_names: List[str]):
+        self.path = path
+        self.columns = ["trial", "rung", "timesteps"] + param_names + METRIC_COLUMNS + ["train_seconds", "status"]
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow(self.columns)
+
+    def append(self, row: Dict) -> None:
+        with open(self.path, "a", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow([row.get(column, "") for column in self.columns])
+
+
+def run_sweep(trials: int = config.SWEEP_TRIALS, eta: int = config.SWEEP_ETA,
+              min_timesteps: int = config.SWEEP_MIN_TIMESTEPS, rungs: int = config.SWEEP_RUNGS,
+              cores_per_trial: int = config.SWEEP_CORES_PER_TRIAL, envs_per_trial: int = config.SWEEP_ENVS_PER_TRIAL,
+              eval_missions: int = config.SWEEP_EVAL_MISSIONS, seed: int = config.SWEEP_SEED,
+              space: Optional[Dict] = None, path: str = config.SWEEP_PATH) -> List[Dict]:
+    """
+    Successive halving : tous les essais s'entraînent `min_timesteps` pas et sont évalués sur
+    le même jeu de validation (tiré avec `seed` parmi les missions d'entraînement : le jeu
+    d'évaluation reste réservé à la mesure finale du modèle retenu) ; le meilleur 1/`eta` continue jusqu'à `min_timesteps * eta`
+    pas cumulés, et ainsi de suite sur `rungs` paliers. Chaque palier répartit ses essais sur
+    un pool de `cœurs // cores_per_trial` processus.
+    Renvoie le classement final (meilleur palier atteint par chaque essai).
+    """
+    from .environment import load_training_missions
+    from .evaluation import select_eval_missions
+
+    space = space or config.SWEEP_SPACE
+    directory = os.path.join(path, time.strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(directory, exist_ok=True)
+
+    rng = random.Random(seed)
+    candidates = [{"trial": i, "params": sample_hyperparameters(space, rng)} for i in range(trials)]
+    with open(os.path.join(directory, TRIALS_FILE), "w", encoding="utf-8") as f:
+        json.dump({"seed": seed, "eta": eta, "min_timesteps": min_timesteps, "rungs": rungs,
+                   "space": {k: list(v) for k, v in space.items()}, "trials": candidates}, f, indent=4)
+
+    # Réserve le jeu d'évaluation (exclu de l'entraînement des essais) avant d'en tirer la validation.
+    select_eval_missions()
+    training_missions = load_training_missions()
+    missions = random.Random(seed).sample(training_missions, min(eval_missions, len(training_missions)))
+    parallel = max((os.cpu_count() or 1) // cores_per_trial, 1)
+    table = _ResultsTable(os.path.join(directory, RESULTS_FILE), list(space))
+    print(f"Balayage : {trials} essais, {rungs} paliers (eta={eta}), {parallel} essais en parallèle "
+          f"de {cores_per_trial} cœurs, {len(missions)} missions de validation. Résultats : {directory}")
+
+    latest: Dict[int, Dict] = {}
+    alive = candidates
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=parallel, mp_context=ctx) as pool:
+        for rung in range(rungs):
+            timesteps = min_timesteps * eta ** rung
+            print(f"\n--- Palier {rung + 1}/{rungs} : {len(alive)} essais, {timesteps} pas cumulés ---")
+            futures = {pool.submit(_run_trial, c["trial"], c["params"], timesteps, directory, missions,
+                                   cores_per_trial, envs_per_trial): c for c in alive}
+            for future in as_completed(futures):
+                candidate = futures[future]
+                row = {"trial": candidate["trial"], "rung": rung, **candidate["params"]}
+                try:
+                    row.update(future.result(), status="ok")
+                except Exception as e:
+                    # Un essai qui échoue (ex. hyperparamètres instables) est éliminé sans arrêter le balayage.
+                    print(f"ATTENTION: l'essai {candidate['trial']} a échoué : {e!r}")
+                    row.update(timesteps=timesteps, status=f"erreur: {type(e).__name__}")
+                table.append(row)
+                latest[candidate["trial"]] = row
+                if row["status"] == "ok":
+                    print(f"Essai {row['trial']:>3} | réussite {row['success_rate'] * 100:6.2f}% | "
+                          f"clics {row['mean_clicks']:5.2f} | {row['train_seconds']:.0f} s")
+
+            ranked = sorted(alive, key=lambda c: trial_score(latest[c["trial"]]), reverse=True)
+            if rung < rungs - 1:
+                alive = [c for c in ranked[:max(len(ranked) // eta, 1)] if latest[c["trial"]]["status"] == "ok"]
+                if not alive:
+                    print("ERREUR: tous les essais ont échoué, arrêt du balayage.")
+                    break
+
+    leaderboard = sorted(latest.values(), key=lambda row: (row["rung"], trial_score(row)), reverse=True)
+    print_leaderboard(leaderboard, list(space))
+    with open(os.path.join(directory, "leaderboard.json"), "w", encoding="utf-8") as f:
+        json.dump(leaderboard, f, indent=4)
+    return leaderboard
+
+
+def print_leaderboard(leaderboard: List[Dict], param_names: List[str]) -> None:
+    header = f"{'Essai':>5} {'Palier':>6} {'Pas':>9} " + " ".join(f"{n:>14}" for n in param_names)
+    print(f"\n{header} {'Réussite':>9} {'Clics':>7} {'Écart opt.':>11}")
+    for row in leaderboard:
+        values = " ".join(f"{row[n]:>14.6g}" if isinstance(row[n], float) else f"{row[n]:>14}" for n in param_names)
+        if row["status"] != "ok":
+            print(f"{row['trial']:>5} {row['rung'] + 1:>6} {row['timesteps']:>9} {values} {row['status']}")
+            continue
+        print(f"{row['trial']:>5} {row['rung'] + 1:>6} {row['timesteps']:>9} {values} "
+              f"{row['success_rate'] * 100:>8.2f}% {row['mean_clicks']:>7.2f} {row['optimality_gap']:>11.2f}")
+
+    best = next((row for row in leaderboard if row["status"] == "ok"), None)
+    if best is not None:
+        print("\nMeilleur essai, à reporter dans src/config.py :")
+        for name in param_names:
+            print(f"PPO_{name.upper()} = {best[name]!r}")
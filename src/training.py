@@ -0,0 +1,32 @@
+# src/training.py (Création des modèles MaskablePPO)
+from typing import Dict, Optional
+
+from sb3_contrib import MaskablePPO
+
+from . import config
+from .evaluation import eval_split_id
+from .features import NodeEmbeddingExtractor
+
+
+def create_model(env, tensorboard_log: Optional[str] = None, verbose: int = 1,
+                 hyperparameters: Optional[Dict] = None) -> MaskablePPO:
+    """
+    Crée un nouveau modèle avec les hyperparamètres du projet. Utilisé par l'entraînement
+    et par le pré-entraînement par imitation, pour que les deux produisent le même réseau.
+    `hyperparameters` remplace une partie des valeurs `PPO_*` (balayage, voir src/sweep.py).
+    """
+    params = dict(n_steps=config.PPO_N_STEPS, batch_size=config.PPO_BATCH_SIZE, gamma=config.PPO_GAMMA,
+                  learning_rate=config.PPO_LEARNING_RATE)
+    params.update(hyperparameters or {})
+    policy_kwargs = None
+    if config.OBSERVATION_MODE == "INDEX":
+        # Les identifiants reçus sont convertis en vecteurs à l'intérieur de la politique.
+        policy_kwargs = dict(features_extractor_class=NodeEmbeddingExtractor,
+                             features_extractor_kwargs=dict(table_path=config.NODE_TABLE_PATH,
+                                                            structural=config.STRUCTURAL_FEATURES))
+    model = MaskablePPO("MlpPolicy", env, verbose=verbose, tensorboard_log=tensorboard_log, device='cpu',
+                        policy_kwargs=policy_kwargs, **params)
+    # Empreinte du jeu d'évaluation exclu de l'entraînement, sauvegardée avec le modèle :
+    # 04_evaluate.py refuse les modèles créés sans ce jeu (ou avec un autre).
+    model.eval_split = eval_split_id()
+    return model
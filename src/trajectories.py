@@ -0,0 +1,174 @@
+# src/trajectories.py (Enregistrement et relecture des trajectoires jouées)
+import json
+import os
+import uuid
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import gymnasium as gym
+import numpy as np
+
+from . import config
+from .node_table import NodeTable
+
+CHUNK_METADATA_FILE = "chunk.json"
+
+# Colonnes d'un chunk : un fichier .npy par colonne, une ligne par transition.
+# Les pages sont désignées par leur identifiant dans la table des nœuds (0 = aucune page).
+COLUMNS = {
+    "current": np.int32,
+    "target": np.int32,
+    "previous": np.int32,
+    "next": np.int32,
+    "action": np.int16,
+    "mask": np.uint8,  # masque d'action compacté en bits (np.packbits)
+    "reward": np.float32,
+    "terminated": np.bool_,
+    "truncated": np.bool_,
+    "episode_start": np.bool_,
+}
+
+
+def unpack_masks(bits: np.ndarray, n_actions: int) -> np.ndarray:
+    """Reconstruit les masques booléens (lot, n_actions) à partir de leur forme compactée."""
+    return np.unpackbits(bits, axis=-1, count=n_actions).astype(bool)
+
+
+class TrajectoryRecorder(gym.Wrapper):
+    """
+    Enregistre les transitions de WikiEnv dans des chunks de fichiers colonnes.
+    Les transitions sont accumulées en mémoire puis écrites par chunk de `chunk_size` lignes ;
+    chaque processus écrit dans son propre sous-dossier, ce qui permet d'envelopper tous les
+    environnements d'un SubprocVecEnv sans coordination.
+    """
+
+    def __init__(self, env: gym.Env, path: str = config.TRAJECTORIES_PATH,
+                 chunk_size: int = config.TRAJECTORY_CHUNK_SIZE, node_table: Optional[NodeTable] = None):
+        super().__init__(env)
+        self.node_table = node_table or NodeTable(config.NODE_TABLE_PATH)
+        self.chunk_size = chunk_size
+        self.n_actions = int(env.action_space.n)
+        self.directory = os.path.join(path, f"{os.getpid()}-{uuid.uuid4().hex[:8]}")
+        self._rows: Dict[str, List] = {name: [] for name in COLUMNS}
+        self._chunk_index = 0
+        self._episode_start = False
+
+    def reset(self, **kwargs):
+        observation, info = self.env.reset(**kwargs)
+        self._episode_start = True
+        return observation, info
+
+    def step(self, action):
+        wiki_env = self.env.unwrapped
+        ids = self.node_table.id_of
+        current = ids(wiki_env.current_page_title)
+        previous = ids(wiki_env.previous_page_title)
+        mask = np.packbits(wiki_env.action_mask().astype(bool))
+
+        observation, reward, terminated, truncated, info = self.env.step(action)
+
+        rows = self._rows
+        rows["current"].append(current)
+        rows["target"].append(ids(wiki_env.target_page_title))
+        rows["previous"].append(previous)
+        rows["next"].append(ids(wiki_env.current_page_title))
+        rows["action"].append(int(action))
+        rows["mask"].append(mask)
+        rows["reward"].append(reward)
+        rows["terminated"].append(terminated)
+        rows["truncated"].append(truncated)
+        rows["episode_start"].append(self._episode_start)
+        self._episode_start = False
+
+        if len(rows["action"]) >= self.chunk_size:
+            self.flush()
+        return observation, reward, terminated, truncated, info
+
+    def flush(self) -> None:
+        """Écrit les transitions en attente dans un nouveau chunk (écriture atomique par renommage)."""
+        n_rows = len(self._rows["action"])
+        if n_rows == 0:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        chunk_name = f"chunk_{self._chunk_index:05d}"
+        tmp_path = os.path.join(self.directory, f".{chunk_name}.tmp")
+        os.makedirs(tmp_path, exist_ok=True)
+        for name, dtype in COLUMNS.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), np.asarray(self._rows[name], dtype=dtype))
+        with open(os.path.join(tmp_path, CHUNK_METADATA_FILE), "w", encoding="utf-8") as f:
+            json.dump({"rows": n_rows, "n_actions": self.n_actions}, f)
+        os.replace(tmp_path, os.path.join(self.directory, chunk_name))
+
+        self._rows = {name: [] for name in COLUMNS}
+        self._chunk_index += 1
+
+    def close(self):
+        self.flush()
+        return super().close()
+
+
+class TrajectoryStore:
+    """
+    Lecture des trajectoires enregistrées : chaque colonne de chaque chunk est mappée en
+    mémoire, seules les lignes demandées sont effectivement lues sur le disque.
+    """
+
+    def __init__(self, path: str = config.TRAJECTORIES_PATH):
+        self.path = path
+        self.chunks: List[Dict[str, np.ndarray]] = []
+        self.n_actions: Optional[int] = None
+        for recorder_dir in sorted(os.listdir(path)) if os.path.exists(path) else []:
+            recorder_path = os.path.join(path, recorder_dir)
+            if not os.path.isdir(recorder_path):
+                continue
+            for chunk_name in sorted(os.listdir(recorder_path)):
+                chunk_path = os.path.join(recorder_path, chunk_name)
+                # Les chunks en cours d'écriture (".tmp") sont ignorés.
+                if not os.path.exists(os.path.join(chunk_path, CHUNK_METADATA_FILE)):
+                    continue
+                with open(os.path.join(chunk_path, CHUNK_METADATA_FILE), "r", encoding="utf-8") as f:
+                    self.n_actions = json.load(f)["n_actions"]
+                self.chunks.append({name: np.load(os.path.join(chunk_path, f"{name}.npy"), mmap_mode="r")
+                                    for name in COLUMNS})
+        self._offsets = np.cumsum([0] + [len(chunk["action"]) for chunk in self.chunks])
+
+    def __len__(self) -> int:
+        return int(self._offsets[-1])
+
+    def _gather(self, name: str, indices: np.ndarray) -> np.ndarray:
+        # Forme et type de la colonne lus dans le premier chunk : un lot vide a aussi la bonne forme.
+        column = self.chunks[0][name] if self.chunks else np.empty(0, dtype=COLUMNS[name])
+        result = np.empty((len(indices),) + column.shape[1:], dtype=column.dtype)
+        chunk_ids = np.searchsorted(self._offsets, indices, side="right") - 1
+        for chunk_id in np.unique(chunk_ids):
+            positions = np.nonzero(chunk_ids == chunk_id)[0]
+            result[positions] = self.chunks[chunk_id][name][indices[positions] - self._offsets[chunk_id]]
+        return result
+
+    def get(self, indices: Sequence[int], columns: Optional[Sequence[str]] = None,
+            unpack_mask: bool = True) -> Dict[str, np.ndarray]:
+        """Lit les transitions d'indices globaux donnés (tous chunks confondus)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        batch = {name: self._gather(name, indices) for name in (columns or COLUMNS)}
+        if unpack_mask and "mask" in batch:
+            batch["mask"] = unpack_masks(batch["mask"], self.n_actions)
+        return batch
+
+    def iter_batches(self, batch_size: int = 4096, columns: Optional[Sequence[str]] = None,
+                     shuffle: bool = False, unpack_mask: bool = True,
+                     seed: Optional[int] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Parcourt toutes les transitions par lots. Sans `shuffle`, les lots suivent l'ordre
+        d'enregistrement et sont lus chunk par chunk (accès séquentiel au disque).
+        """
+        if shuffle:
+            order = np.random.default_rng(seed).permutation(len(self))
+            for start in range(0, len(order), batch_size):
+                yield self.get(order[start:start + batch_size], columns, unpack_mask)
+            return
+
+        for chunk in self.chunks:
+            for start in range(0, len(chunk["action"]), batch_size):
+                batch = {name: np.asarray(chunk[name][start:start + batch_size]) for name in (columns or COLUMNS)}
+                if unpack_mask and "mask" in batch:
+                    batch["mask"] = unpack_masks(batch["mask"], self.n_actions)
+                yield batch
@@ -1,13 +1,17 @@
 # ui.py
+import os
+from typing import Optional
 
+from textual import work
 from textual.app import App, ComposeResult
 from textual.widgets import Header, Footer, Static, SelectionList, Markdown
 from textual.containers import VerticalScroll
 from textual.binding import Binding
 
 # On importe nos deux autres modules
-from api import WikipediaService
-from ia import Agent
+from . import config
+from .agent import Agent
+from .api import Article, ArticleService, AsyncArticleLoader, get_article_service
 
 
 class WikiGameApp(App):
@@ -17,12 +21,15 @@ class WikiGameApp(App):
     SUB_TITLE = "L'IA cherche le chemin le plus court !"
     BINDINGS = [Binding(key="q", action="quit", description="Quitter")]
 
-    def __init__(self, start_page: str, target_page: str, model_path: str):
+    def __init__(self, start_page: str, target_page: str, model_path: str,
+                 article_service: Optional[ArticleService] = None):
         """
         Initialise l'application avec la mission et le chemin du modèle entraîné.
+        Les articles viennent par défaut du stock local (voir `config.ARTICLE_SOURCE`).
         """
         super().__init__()
-        self.wiki_service = WikipediaService(language='fr')
+        # Les articles sont chargés hors du thread de l'interface, qui ne bloque jamais.
+        self.articles = AsyncArticleLoader(article_service or get_article_service())
 
         # On crée l'agent IA en lui passant le chemin du modèle et sa mission
         self.agent = Agent(model_path=model_path, target_page=target_page)
@@ -61,14 +68,25 @@ class WikiGameApp(App):
         self.query_one("#current_page_title", Static).update(f"📍 Actuel : [b]{page_title}[/b]")
         path_str = " -> ".join(self.path)
         self.query_one("#path_display", Static).update(f"👣 Chemin ({len(self.path) - 1} clics) : {path_str}")
+        self.query_one("#summary", Markdown).update("Chargement du résumé...")
 
-        page = self.wiki_service.get_page(page_title)
+        self.load_page(page_title)
+
+    @work(thread=True, exclusive=True, group="page")
+    def load_page(self, page_title: str) -> None:
+        """Charge l'article en arrière-plan puis confie l'affichage au thread de l'interface."""
+        page = self.articles.load(page_title).result()
+        self.call_from_thread(self.show_page, page_title, page)
+
+    def show_page(self, page_title: str, page: Optional[Article]) -> None:
+        if page_title != self.current_page_title:
+            return  # Réponse périmée : l'IA a déjà changé de page.
 
         if page:
-            summary = self.wiki_service.get_page_summary(page)
+            summary = self.articles.service.get_page_summary(page)
             self.query_one("#summary", Markdown).update(summary)
 
-            links = self.wiki_service.get_page_links(page)
+            links = self.articles.service.get_page_links(page)
             link_list = self.query_one("#links_list", SelectionList)
             link_list.clear_options()
             link_list.add_options([(link, link) for link in links])
@@ -84,15 +102,14 @@ class WikiGameApp(App):
             self.query_one("#ai_status").update("🤖 L'IA est bloquée.")
             self.game_over = True
 
+    @work(thread=True, exclusive=True, group="ai")
     def run_ai_turn(self) -> None:
-        """Exécute un tour de jeu de l'IA."""
-        # On récupère la liste des liens actuellement affichés sur la page
-        link_list_widget = self.query_one("#links_list", SelectionList)
-        available_links = [str(option.prompt) for option in link_list_widget._options]
-
+        """Exécute un tour de jeu de l'IA (Neo4j et le modèle travaillent hors du thread de l'interface)."""
         # On demande à l'agent de choisir un lien en lui donnant son état actuel
         chosen_link = self.agent.choose_next_link(self.current_page_title)
+        self.call_from_thread(self.apply_ai_choice, chosen_link)
 
+    def apply_ai_choice(self, chosen_link: Optional[str]) -> None:
         if chosen_link is None:
             self.query_one("#ai_status").update("🤖 L'IA est dans une impasse (aucun lien) !")
             self.game_over = True
@@ -109,4 +126,14 @@ class WikiGameApp(App):
             self.query_one("#ai_status").update("🏆 Mission accomplie !")
         else:
             # Sinon, on charge la page suivante, ce qui continue la boucle
-            self.update_page_display(chosen_link)
\ No newline at end of file
+            self.update_page_display(chosen_link)
+
+    def on_unmount(self) -> None:
+        self.articles.close()
+
+
+if __name__ == "__main__":
+    # python -m src.ui
+    app = WikiGameApp(config.DEFAULT_START_PAGE, config.DEFAULT_TARGET_PAGE,
+                      os.path.join(config.MODELS_PATH, config.DEFAULT_MODEL_NAME))
+    app.run()
@@ -0,0 +1,206 @@
+# src/vec_env.py (Création des environnements vectorisés)
+import multiprocessing as mp
+from typing import Any, Callable, Dict, List, Optional
+
+import gymnasium as gym
+import numpy as np
+from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.vec_env import SubprocVecEnv, VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnvIndices, VecEnvStepReturn
+from stable_baselines3.common.vec_env.patch_gym import _patch_env
+
+from . import config
+from .shared_arrays import SharedArray
+
+
+def make_env(mission_stats: Optional[SharedArray] = None, worker_metrics: Optional[SharedArray] = None,
+             worker_index: int = 0):
+    from src.environment import WikiEnv
+    from src.profiler import install_profiler
+    from sb3_contrib.common.wrappers import ActionMasker
+    install_profiler(role="env")
+    env = WikiEnv(mission_stats=mission_stats, worker_index=worker_index)
+    if worker_metrics is not None:
+        from src.metrics import WorkerMetrics
+        env = WorkerMetrics(env, worker_metrics, worker_index)
+    if config.RECORD_TRAJECTORIES:
+        from src.trajectories import TrajectoryRecorder
+        env = TrajectoryRecorder(env)
+    env = Monitor(env)
+    return ActionMasker(env, action_mask_fn=lambda e: e.unwrapped.action_mask())
+
+
+def _get_action_mask(env: gym.Env, n_actions: int) -> np.ndarray:
+    try:
+        return env.get_wrapper_attr("action_masks")()
+    except AttributeError:
+        return np.ones(n_actions, dtype=bool)
+
+
+def _shared_memory_worker(remote, parent_remote, env_fn_wrapper: CloudpickleWrapper, send_step_infos: bool) -> None:
+    """
+    Boucle d'un worker : les observations, récompenses, fins d'épisode et masques d'action sont
+    écrits directement dans les tableaux partagés ; le pipe ne transporte que les commandes
+    et les `info` des fins d'épisode.
+    """
+    from stable_baselines3.common.env_util import is_wrapped
+
+    parent_remote.close()
+    env = _patch_env(env_fn_wrapper.var())
+    index, buffers = None, None
+    while True:
+        try:
+            cmd, data = remote.recv()
+            if cmd == "attach":
+                index, buffers = data
+                remote.send(True)
+            elif cmd == "step":
+                observation, reward, terminated, truncated, info = env.step(buffers["actions"][index])
+                done = terminated or truncated
+                info["TimeLimit.truncated"] = truncated and not terminated
+                info.pop("action_mask", None)
+                reset_info = None
+                if done:
+                    buffers["terminal_obs"][index] = observation
+                    observation, reset_info = env.reset()
+                    reset_info.pop("action_mask", None)
+                buffers["obs"][index] = observation
+                buffers["rewards"][index] = reward
+                buffers["dones"][index] = done
+                buffers["masks"][index] = _get_action_mask(env, buffers["masks"].shape[1])
+                remote.send((info if (done or send_step_infos) else None, reset_info))
+            elif cmd == "reset":
+                maybe_options = {"options": data[1]} if data[1] else {}
+                observation, reset_info = env.reset(seed=data[0], **maybe_options)
+                reset_info.pop("action_mask", None)
+                buffers["obs"][index] = observation
+                buffers["masks"][index] = _get_action_mask(env, buffers["masks"].shape[1])
+                remote.send(reset_info)
+            elif cmd == "close":
+                env.close()
+                remote.close()
+                break
+            elif cmd == "get_spaces":
+                remote.send((env.observation_space, env.action_space))
+            elif cmd == "env_method":
+                method = env.get_wrapper_attr(data[0])
+                remote.send(method(*data[1], **data[2]))
+            elif cmd == "get_attr":
+                remote.send(env.get_wrapper_attr(data))
+            elif cmd == "has_attr":
+                try:
+                    env.get_wrapper_attr(data)
+                    remote.send(True)
+                except AttributeError:
+                    remote.send(False)
+            elif cmd == "set_attr":
+                remote.send(setattr(env, data[0], data[1]))
+            elif cmd == "is_wrapped":
+                remote.send(is_wrapped(env, data))
+            else:
+                raise NotImplementedError(f"`{cmd}` n'est pas géré par le worker")
+        except (EOFError, KeyboardInterrupt):
+            break
+
+
+class SharedMemoryVecEnv(SubprocVecEnv):
+    """
+    Variante de `SubprocVecEnv` où les données de chaque pas transitent par des tableaux
+    pré-alloués en mémoire partagée (observations, récompenses, fins d'épisode, masques
+    d'action). Le coût d'un pas ne dépend plus de la taille des observations.
+
+    Les `info` des pas intermédiaires ne sont pas transmis (sauf `send_step_infos=True`) :
+    seules les fins d'épisode renvoient les statistiques du Monitor et le chemin parcouru.
+    Les masques d'action sont lus dans le tableau partagé par `env_method("action_masks")`.
+    """
+
+    def __init__(self, env_fns: List[Callable[[], gym.Env]], start_method: str = "spawn",
+                 send_step_infos: bool = False):
+        self.waiting = False
+        self.closed = False
+        n_envs = len(env_fns)
+        ctx = mp.get_context(start_method)
+
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in range(n_envs)])
+        self.processes = []
+        for work_remote, remote, env_fn in zip(self.work_remotes, self.remotes, env_fns):
+            args = (work_remote, remote, CloudpickleWrapper(env_fn), send_step_infos)
+            process = ctx.Process(target=_shared_memory_worker, args=args, daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        self.remotes[0].send(("get_spaces", None))
+        observation_space, action_space = self.remotes[0].recv()
+        assert isinstance(observation_space, gym.spaces.Box), "Seuls les espaces Box sont pris en charge."
+        assert isinstance(action_space, gym.spaces.Discrete), "Seuls les espaces Discrete sont pris en charge."
+
+        self._buffers: Dict[str, SharedArray] = {
+            "obs": SharedArray((n_envs,) + observation_space.shape, observation_space.dtype),
+            "terminal_obs": SharedArray((n_envs,) + observation_space.shape, observation_space.dtype),
+            "rewards": SharedArray((n_envs,), np.float32),
+            "dones": SharedArray((n_envs,), np.bool_),
+            "masks": SharedArray((n_envs, int(action_space.n)), np.bool_),
+            "actions": SharedArray((n_envs,), np.int64),
+        }
+        for index, remote in enumerate(self.remotes):
+            remote.send(("attach", (index, self._buffers)))
+        for remote in self.remotes:
+            remote.recv()
+
+        VecEnv.__init__(self, n_envs, observation_space, action_space)
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._buffers["actions"].array[:] = actions
+        for remote in self.remotes:
+            remote.send(("step", None))
+        self.waiting = True
+
+    def step_wait(self) -> VecEnvStepReturn:
+        results = [remote.recv() for remote in self.remotes]
+        self.waiting = False
+        dones = self._buffers["dones"].array.copy()
+        infos: List[Dict[str, Any]] = []
+        for index, (info, reset_info) in enumerate(results):
+            info = info or {}
+            if dones[index]:
+                info["terminal_observation"] = self._buffers["terminal_obs"].array[index].copy()
+                self.reset_infos[index] = reset_info or {}
+            infos.append(info)
+        # Copies obligatoires : les workers réécrivent les tableaux dès le pas suivant.
+        return self._buffers["obs"].array.copy(), self._buffers["rewards"].array.copy(), dones, infos
+
+    def reset(self):
+        for env_idx, remote in enumerate(self.remotes):
+            remote.send(("reset", (self._seeds[env_idx], self._options[env_idx])))
+        self.reset_infos = [remote.recv() for remote in self.remotes]
+        self._reset_seeds()
+        self._reset_options()
+        return self._buffers["obs"].array.copy()
+
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> List[Any]:
+        if method_name == "action_masks" and not method_args and not method_kwargs:
+            masks = self._buffers["masks"].array
+            return [masks[i].copy() for i in self._get_indices(indices)]
+        return super().env_method(method_name, *method_args, indices=indices, **method_kwargs)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        super().close()
+        for buffer in self._buffers.values():
+            buffer.close()
+
+
+def build_vec_env(env_fns: List[Callable[[], gym.Env]], vec_env_type: Optional[str] = None) -> VecEnv:
+    """Crée l'environnement vectorisé demandé par `config.VEC_ENV_TYPE`."""
+    vec_env_type = vec_env_type or config.VEC_ENV_TYPE
+    if vec_env_type == "SUBPROC":
+        return SubprocVecEnv(env_fns, start_method='spawn')
+    if vec_env_type == "SHARED_MEMORY":
+        return SharedMemoryVecEnv(env_fns, start_method='spawn')
+    if vec_env_type == "REMOTE":
+        # Les environnements sont créés par les serveurs : `env_fns` n'est pas utilisé ici.
+        from .remote_env import RemoteVecEnv
+        return RemoteVecEnv(config.REMOTE_ENV_ENDPOINTS)
+    raise ValueError(f"Type d'environnement vectorisé inconnu: {vec_env_type}")
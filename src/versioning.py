@@ -0,0 +1,75 @@
+# src/versioning.py (Nommage et versioning des modèles)
+import os
+import re
+
+
+def find_latest_version(path, base_name):
+    """Trouve la dernière version d'un modèle (ex: base_name-3)."""
+    if not os.path.exists(path):
+        return 0, None
+
+    # Regex pour trouver les extensions de version (ex: "-1", "-2", etc.)
+    pattern = re.compile(f"^{re.escape(base_name)}(?:-(\d+))?\.zip$")
+
+    latest_version = 0
+    latest_file = f"{base_name}.zip"  # Défaut si aucune version "-X" n'est trouvée
+    found_base = False
+
+    for f in os.listdir(path):
+        match = pattern.match(f)
+        if match:
+            if match.group(1):  # Si une extension de version est trouvée
+                version = int(match.group(1))
+                if version >= latest_version:
+                    latest_version = version
+                    latest_file = f
+            else:  # Fichier de base sans extension (ex: "modele.zip")
+                found_base = True
+
+    # Si on trouve un fichier de base mais aucune version, le fichier de base est la version 0
+    if found_base and latest_version == 0:
+        return 0, latest_file
+
+    return latest_version, latest_file
+
+
+def get_next_model_name(path, base_name):
+    """Génère le nom pour un tout nouvel entraînement (ex: base_name_3)."""
+    if not os.path.exists(path):
+        return f"{base_name}_1"
+
+    pattern = re.compile(f"^{re.escape(base_name)}_(\d+)(?:-\d+)?\.zip$")
+    max_num = 0
+    for f in os.listdir(path):
+        match = pattern.match(f)
+        if match:
+            num = int(match.group(1))
+            if num > max_num:
+                max_num = num
+    return f"{base_name}_{max_num + 1}"
+
+
+def find_latest_checkpoint(path):
+    """Trouve le checkpoint le plus avancé d'une session (ex: checkpoint_400000_steps.zip)."""
+    if not os.path.exists(path):
+        return None
+
+    pattern = re.compile(r"^checkpoint_(\d+)_steps\.zip$")
+    latest_steps = -1
+    latest_file = None
+    for f in os.listdir(path):
+        match = pattern.match(f)
+        if match and int(match.group(1)) > latest_steps:
+            latest_steps = int(match.group(1))
+            latest_file = os.path.join(path, f)
+    return latest_file
+
+
+def resolve_model_path(path, name):
+    """Retourne le fichier d'un modèle : chemin .zip existant, ou dernière version d'un nom de base."""
+    if name.endswith(".zip") and os.path.exists(name):
+        return name
+    _, filename = find_latest_version(path, name)
+    if filename is None or not os.path.exists(os.path.join(path, filename)):
+        return None
+    return os.path.join(path, filename)